@@ -33,6 +33,7 @@ from ..sourcefiles.srcfile import ParamFile, SourceFile, ManualFile
 from ..sourcefiles.sourcefileset import SourceFileSet
 from ..module.module import Module, ModuleArgs
 from ..sourcefiles import systemlibs
+from ..util import path as path_mod
 
 class Action(object):
 
@@ -42,11 +43,17 @@ class Action(object):
         super(Action, self).__init__()
         self.top_manifest = None
         self.all_manifests = []
+        # Index of the modules, the key is the normalised url.
+        self.modules_index = {}
         self.system_libs = set()
         self.parseable_fileset = SourceFileSet()
         self.privative_fileset = SourceFileSet()
         self.options = options
         self.top_library = None
+        # Optional cache of the parsed relations (see dep_solver.ParseCache)
+        self.parse_cache = None
+        # Graph of the relations, built by solve_file_set if not set.
+        self.graph = None
 
     def new_module(self, parent, url, source, fetchto):
         """Add new module to the pool.
@@ -55,13 +62,14 @@ class Action(object):
         Thanks to it the pool can easily control its content
         """
         # If the module is already present, do not create it.
-        for mod in self.all_manifests:
-            if mod.url == url:
-                return None
+        key = path_mod.url_key(url, source)
+        if key in self.modules_index:
+            return None
         args = ModuleArgs()
         args.set_args(parent, url, source, fetchto)
         res = Module(args, self)
         self.all_manifests.append(res)
+        self.modules_index[key] = res
         return res
 
     def add_system_lib(self, parent, url):
@@ -124,7 +132,10 @@ class Action(object):
             if tool is None:
                 raise Exception("'sim_tool' variable is not defined")
             self.tool = load_sim_tool(tool)
+            self.tool.system_modules = self.system_libs
+            sim_tops = top_dict.get("sim_tops") or []
             self.top_entity = top_dict.get("sim_top") \
+                or (sim_tops[0] if sim_tops else None) \
                 or top_dict.get("top_module")
             self.split_to_top_lib_and_entity()
             top_dict["sim_top_library"] = self.top_library
@@ -145,6 +156,8 @@ class Action(object):
         # Set default library
         if self.top_library is None:
             self.top_library = deflib
+        if action == "simulation" and top_dict.get("sim_tops"):
+            self.set_sim_tops(top_dict["sim_tops"])
         if deflib:
             for mod in self.all_manifests:
                 if mod.files is not None and mod.library is None:
@@ -192,8 +205,8 @@ class Action(object):
             logging.info("Detected %d supported files that can be parsed",
                          len(self.parseable_fileset))
 
-    def solve_file_set(self):
-        """Build file set with only those files required by the top entity"""
+    def _get_libs(self):
+        """Return the system libs and the standard libs of the tool"""
         libs = None
         system_libs = self.system_libs
         if self.tool is not None:
@@ -201,8 +214,21 @@ class Action(object):
             libs = self.tool.get_standard_libs()
             for l in self.tool.get_system_libs():
                 system_libs.add(l)
-        graph = dep_solver.AllRelations()
-        dep_solver.parse_source_files(graph, self.parseable_fileset)
+        return system_libs, libs
+
+    def _get_graph(self):
+        """Return the graph of the relations, parsing the sources if
+        not already done"""
+        if self.graph is None:
+            self.graph = dep_solver.AllRelations()
+            dep_solver.parse_source_files(self.graph, self.parseable_fileset,
+                                          self.parse_cache)
+        return self.graph
+
+    def solve_file_set(self):
+        """Build file set with only those files required by the top entity"""
+        system_libs, libs = self._get_libs()
+        graph = self._get_graph()
         if self.options.all_files:
             # If option -all is used, no need to compute dependencies.
             pass
@@ -210,6 +236,19 @@ class Action(object):
             logging.critical(
                     'Could not find a top level file because the top '
                     'module is undefined. Continuing with the full file set.')
+        elif (self.top_manifest.manifest_dict.get("action") == "simulation"
+              and self.top_manifest.manifest_dict.get("sim_tops")):
+            # Keep the files of all the simulation tops, so that they are
+            # compiled once.
+            tops = list(self.top_manifest.manifest_dict["sim_tops"])
+            top = "{}.{}".format(self.top_library, self.top_entity)
+            if top not in tops:
+                tops.insert(0, top)
+            fileset = SourceFileSet()
+            for _, top_fileset in self.solve_file_sets(tops):
+                fileset.add(top_fileset)
+            self.parseable_fileset = fileset
+            return
         else:
             # Only keep top_entity, extra_modules and their dependencies
             extra_modules = self.top_manifest.manifest_dict.get("extra_modules")
@@ -218,6 +257,43 @@ class Action(object):
                 self.top_library, self.top_entity, extra_modules)
         dep_solver.check_graph(graph, self.parseable_fileset, system_libs, libs)
 
+    def _split_top_name(self, name):
+        """Return the (library, entity) of a top given as [library.]entity"""
+        saved = (self.top_entity, self.top_library)
+        self.top_entity = name
+        self.split_to_top_lib_and_entity()
+        res = (self.top_library, self.top_entity)
+        self.top_entity, self.top_library = saved
+        return res
+
+    def set_sim_tops(self, tops):
+        """Set the sim_tops variable to :param tops:, each top given as
+        library.entity"""
+        res = []
+        for top in tops:
+            library, entity = self._split_top_name(top)
+            res.append("{}.{}".format(library or "work", entity))
+        self.top_manifest.manifest_dict["sim_tops"] = res
+
+    def solve_file_sets(self, tops):
+        """Build the file set of each top entity of :param tops:.  The
+        sources are parsed only once.  Return a list of (top, fileset)"""
+        system_libs, libs = self._get_libs()
+        graph = self._get_graph()
+        if self.options.all_files:
+            res = [(top, self.parseable_fileset) for top in tops]
+        else:
+            pairs = [self._split_top_name(top) for top in tops]
+            extra_modules = self.top_manifest.manifest_dict.get("extra_modules")
+            sets = dep_solver.make_dependency_sets(
+                graph, self.parseable_fileset, pairs, extra_modules)
+            res = [(top, sets[pair]) for top, pair in zip(tops, pairs)]
+        all_files = SourceFileSet()
+        for _, fileset in res:
+            all_files.add(fileset)
+        dep_solver.check_graph(graph, all_files, system_libs, libs)
+        return res
+
     def get_top_manifest(self):
         """Get the Top module from the pool"""
         return self.top_manifest
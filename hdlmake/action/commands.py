@@ -26,14 +26,15 @@ from __future__ import print_function
 import logging
 import os
 import os.path
+import sys
+import json
+import hashlib
 
 from ..sourcefiles import new_dep_solver as dep_solver
 from ..util import path as path_mod
-from ..fetch.svn import Svn
-from ..fetch.git import Git, GitSM
-from ..fetch.local import Local
+from ..sourcefiles.sourcefileset import SourceFileSet
+from ..sourcefiles.dep_file import DepRelation
 from .action import Action
-from .gen_edalize import Edalize
 
 class Commands(Action):
 
@@ -41,10 +42,26 @@ class Commands(Action):
 
     def __init__(self, *args):
         super(Commands, self).__init__(*args)
-        self.git_backend = Git()
-        self.gitsm_backend = GitSM()
-        self.svn_backend = Svn()
-        self.local_backend = Local()
+        # Fetch backends, created on first use (see _get_fetch_backend)
+        self.fetch_backends = {}
+
+    def _get_fetch_backend(self, source):
+        """Get the fetcher for :param source:, importing it only when
+        a module of that kind has to be fetched"""
+        backend = self.fetch_backends.get(source)
+        if backend is None:
+            if source == 'svn':
+                from ..fetch.svn import Svn
+                backend = Svn()
+            elif source == 'git':
+                from ..fetch.git import Git
+                backend = Git()
+            else:
+                assert source == 'gitsm'
+                from ..fetch.git import GitSM
+                backend = GitSM()
+            self.fetch_backends[source] = backend
+        return backend
 
     def _check_all_fetched(self):
         """Check if every module in the pool is fetched"""
@@ -63,13 +80,15 @@ class Commands(Action):
         self._check_all_fetched()
         self.build_file_set()
         self.solve_file_set()
-        combined_fileset = self.parseable_fileset
+        combined_fileset = SourceFileSet()
+        combined_fileset.add(self.parseable_fileset)
         combined_fileset.add(self.privative_fileset)
         self.tool.write_makefile(self.top_manifest,
                                  combined_fileset,
                                  filename=filename)
 
     def write_edalize(self):
+        from .gen_edalize import Edalize
         filename = "run.py"
         self._check_all_fetched()
         self.build_file_set()
@@ -85,13 +104,7 @@ class Commands(Action):
             """Fetch the given module from the remote origin"""
             new_modules = []
             logging.debug("Fetching module: %s", str(module))
-            if module.source == 'svn':
-                result = self.svn_backend.fetch(module)
-            elif module.source == 'git':
-                result = self.git_backend.fetch(module)
-            else:
-                assert module.source == 'gitsm'
-                result = self.gitsm_backend.fetch(module)
+            result = self._get_fetch_backend(module.source).fetch(module)
             if result is False:
                 raise Exception("Unable to fetch module {}".format(module.url))
             module.parse_manifest()
@@ -100,6 +113,9 @@ class Commands(Action):
             return new_modules
 
         fetch_queue = self.all_manifests[:] # Need a copy of the list
+        # Modules are unique in the pool (see new_module), so the set of
+        # queued modules is enough to avoid handling a module twice.
+        queued = set(fetch_queue)
 
         while len(fetch_queue) > 0:
             cur_mod = fetch_queue.pop()
@@ -109,7 +125,11 @@ class Commands(Action):
             else:
                 new_modules = _fetch_module(cur_mod)
             for mod in new_modules:
-                if not mod.isfetched:
+                if mod in queued:
+                    logging.debug("Already in fetch queue: "
+                                  + str(mod.url))
+                elif not mod.isfetched:
+                    queued.add(mod)
                     logging.debug("Appended to fetch queue: "
                                   + str(mod.url))
                     fetch_queue.append(mod)
@@ -182,7 +202,20 @@ class Commands(Action):
             print ('    {{ "file": "{file}", "language": "{lang}"}}'.format(
                 file=f.rel_path(cwd), lang=lang), end='')
         print()
-        print('  ]')
+        if not self.options.levels:
+            print('  ]')
+            print('}')
+            return
+        print('  ],')
+        levels = dep_solver.make_dependency_levels(self.parseable_fileset)
+        print('  "levels": [')
+        print(',\n'.join(
+            '    {{ "level": {}, "count": {}, "files": [{}]}}'.format(
+                n, len(level), ', '.join(
+                    '"{}"'.format(f.rel_path(cwd)) for f in level))
+            for n, level in enumerate(levels)))
+        print('  ],')
+        print('  "critical_path": {}'.format(len(levels)))
         print('}')
 
     def list_files(self):
@@ -192,20 +225,294 @@ class Commands(Action):
         for mod_aux in unfetched_modules:
             logging.warning(
                 "List incomplete, module %s has not been fetched!", mod_aux)
-        if self.options.top != None:
-            self.top_entity = self.options.top
+        if self.options.delimiter is None:
+            delimiter = "\n"
+        else:
+            delimiter = self.options.delimiter
+        tops = self.options.top
+        if tops is not None and len(tops) > 1:
+            # Several tops: the graph is built once for all of them.
+            self.build_file_set()
+            for top, fileset in self.solve_file_sets(tops):
+                print("# top: {}".format(top))
+                self._print_files(fileset, delimiter)
+            return
+        if tops is not None:
+            self.top_entity = tops[0]
         self.build_file_set()
         self.solve_file_set()
-        file_list = dep_solver.make_dependency_sorted_list(
-            self.parseable_fileset)
+        self._print_files(self.parseable_fileset, delimiter)
+
+    def _print_files(self, fileset, delimiter):
+        """Print the files of :param fileset:, grouped by level if
+        --levels"""
+        if not self.options.levels:
+            print(delimiter.join(self._sorted_paths(fileset)))
+            return
+        levels = list(enumerate(dep_solver.make_dependency_levels(fileset)))
+        if self.options.reverse is True:
+            levels.reverse()
+        for n, level in levels:
+            print("# level {}: {} files".format(n, len(level)))
+            print(delimiter.join(file_aux.path for file_aux in level))
+        print("# critical path: {} levels".format(len(levels)))
+
+    def _sorted_paths(self, fileset):
+        """Return the paths of :param fileset: in dependency order (or
+        reversed if --reverse)"""
+        file_list = dep_solver.make_dependency_sorted_list(fileset)
         files_str = [file_aux.path for file_aux in file_list]
         if self.options.reverse is True:
             files_str.reverse()
-        if self.options.delimiter is None:
-            delimiter = "\n"
+        return files_str
+
+    def _read_changed_files(self):
+        """Read the list of changed files (one per line) from the file
+        given by --changed-from, or from stdin if it is '-'"""
+        if self.options.changed_from == '-':
+            lines = sys.stdin.read().splitlines()
         else:
-            delimiter = self.options.delimiter
-        print(delimiter.join(files_str))
+            with open(self.options.changed_from, "r") as f:
+                lines = f.read().splitlines()
+        return [os.path.realpath(l.strip()) for l in lines if l.strip()]
+
+    def affected(self):
+        """List the tops that depend on the changed files, and their files"""
+        self._check_all_fetched()
+        changed = self._read_changed_files()
+        self.build_file_set()
+        graph = self._get_graph()
+        fileset = self.parseable_fileset
+        # Files affected by a path: the file itself, the files including
+        # it or all the files of a module if it is a manifest.
+        by_path = {}
+        for dep_file in fileset:
+            by_path.setdefault(os.path.realpath(dep_file.path), []).append(dep_file)
+            for inc in dep_file.included_files:
+                by_path.setdefault(os.path.realpath(inc), []).append(dep_file)
+        for mod in self.all_manifests:
+            if mod.manifest_file is not None and mod.files:
+                by_path.setdefault(os.path.realpath(mod.manifest_file), []).extend(
+                    f for f in mod.files if f in fileset)
+        changed_files = set()
+        for path in changed:
+            changed_files.update(by_path.get(path, []))
+        affected = dep_solver.make_reverse_dependency_set(fileset, changed_files)
+        # Candidate tops: from the command line or the root entities.
+        tops = []
+        if self.options.top is not None:
+            for name in self.options.top:
+                top_library, top_entity = self._split_top_name(name)
+                rel = graph.find_provider(DepRelation(
+                    top_entity, top_library, DepRelation.MODULE))
+                if rel is None or rel.provided_by is None:
+                    logging.warning("Could not find top %s (ignored)", name)
+                else:
+                    tops.append((name, rel.provided_by))
+        else:
+            for root, names in dep_solver.find_root_files(fileset):
+                tops.append((",".join(names), root))
+        logging.info("%d changed files, %d affected files",
+                     len(changed_files), len(affected))
+        extra_files = dep_solver._find_extra_files(
+            graph, self.top_library,
+            self.top_manifest.manifest_dict.get("extra_modules"))
+        for name, top_file in sorted(tops, key=lambda t: t[0]):
+            if top_file not in affected:
+                continue
+            if self.options.tops_only:
+                print(name)
+                continue
+            print("# top: {}".format(name))
+            for file_aux in dep_solver.make_dependency_sorted_list(
+                    dep_solver.make_dependency_closure([top_file] + extra_files)):
+                print(file_aux.path)
+
+    def _get_tool_options(self, prefixes=(), extra_keys=(), exclude=(),
+                          manifest_dict=None):
+        """Return the sorted list of (key, value as JSON) of the options of
+        the top manifest (or :param manifest_dict:) given to the tool: the
+        *_opt and include_dirs keys, the keys starting with
+        :param prefixes: and :param extra_keys:, but not :param exclude:"""
+        if manifest_dict is None:
+            manifest_dict = self.top_manifest.manifest_dict
+        res = []
+        for key in sorted(manifest_dict):
+            if key in exclude:
+                continue
+            if (key.endswith("_opt") or key == "include_dirs"
+                    or key.startswith(tuple(prefixes)) or key in extra_keys):
+                res.append((key, json.dumps(manifest_dict[key],
+                                            sort_keys=True, default=str)))
+        return res
+
+    def _fingerprint_entries(self, hash_index, fileset=None, exclude=()):
+        """Return the list of (kind, name, value) entries describing the
+        solved design (or :param fileset: of one of its tops), in a stable
+        order.  The top manifest options of :param exclude: are left out"""
+        from .._version import __version__
+        from ..tools.makefilesim import MakefileSim
+        top_dir = self.top_manifest.path
+        top_dict = self.top_manifest.manifest_dict
+        entries = [("hdlmake", "version", __version__)]
+        if self.tool is not None:
+            entries.append(("tool", top_dict.get("action"),
+                            self.tool.TOOL_INFO['id']))
+        entries.extend(("option", key, value) for key, value in
+                       self._get_tool_options(("syn_", "sim_"),
+                                              ("top_module", "extra_modules"),
+                                              exclude))
+        # The order of compilation matters, not the one of the other files.
+        if fileset is None:
+            fileset = self.parseable_fileset
+        files = dep_solver.make_dependency_sorted_list(fileset)
+        files.extend(sorted(self.privative_fileset, key=lambda f: f.path))
+        includes = set()
+        modules = set()
+        for file_aux in files:
+            value = "{} {}".format(file_aux.library,
+                                   hash_index.get(file_aux.path))
+            # The command includes the options of the module of the file.
+            if isinstance(self.tool, MakefileSim):
+                cmd = self.tool.get_compile_command(file_aux)
+                if cmd is not None:
+                    value += " " + cmd
+            entries.append(("file", path_mod.relpath(file_aux.path, top_dir),
+                            value))
+            includes.update(getattr(file_aux, "included_files", ()))
+            if file_aux.module is not None and file_aux.module.parent is not None:
+                modules.add(file_aux.module)
+        # Options set by the manifests of the sub-modules.
+        for module in sorted(modules, key=lambda m: m.path):
+            for key, value in self._get_tool_options(
+                    ("syn_", "sim_"), ("library",),
+                    manifest_dict=module.own_variables):
+                entries.append(("module", "{} {}".format(
+                    path_mod.relpath(module.path, top_dir), key), value))
+        for inc in sorted(includes):
+            entries.append(("include", path_mod.relpath(inc, top_dir),
+                            hash_index.get(inc)))
+        return entries
+
+    def fingerprint(self):
+        """Print a hash of the solved design: files, options and tool"""
+        from ..util.hashindex import HashIndex, INDEX_NAME
+        self._check_all_fetched()
+        self.build_file_set()
+        self.solve_file_set()
+        hash_index = HashIndex(os.path.join(self.top_manifest.path,
+                                            INDEX_NAME))
+        entries = self._fingerprint_entries(hash_index)
+        hash_index.save()
+        logging.debug("Hash index: %d hits, %d misses",
+                      hash_index.hits, hash_index.misses)
+        digest = hashlib.sha256()
+        for entry in entries:
+            line = "\t".join(entry)
+            digest.update((line + "\n").encode('utf-8'))
+            if self.options.details:
+                print(line)
+        print(digest.hexdigest())
+
+    def compile(self):
+        """Write the Makefile and compile the sources of the simulation with
+        parallel jobs, skipping the files whose inputs are unchanged"""
+        from ..tools.makefilesim import MakefileSim
+        from .scheduler import Compiler
+        if not isinstance(self.tool, MakefileSim):
+            raise Exception("The 'compile' command requires a simulation "
+                            "tool ('action' must be 'simulation')")
+        if self.top_manifest.manifest_dict.get("sim_batch_compile"):
+            raise Exception("The 'compile' command compiles the files one "
+                            "by one, it cannot be used with "
+                            "'sim_batch_compile' (use make instead)")
+        self.makefile()
+        files = dep_solver.make_dependency_sorted_list(self.parseable_fileset)
+        options_key = json.dumps([self.tool.TOOL_INFO['id']]
+                                 + self._get_tool_options())
+        compiler = Compiler(self.tool, files, options_key,
+                            self.options.filename or "Makefile",
+                            self.options.jobs)
+        failed = compiler.run(self.tool.get_compile_setup_targets())
+        if failed:
+            raise Exception("Compilation failed for: {}".format(
+                ", ".join(f.rel_path() for f in failed)))
+
+    def regress(self):
+        """Compile the sources shared by the simulation tops once, then run
+        the target of each top by parallel jobs.  A top is skipped if its
+        files, options and command are unchanged since its last passing
+        run"""
+        from ..tools.makefilesim import MakefileSim
+        from ..util.hashindex import HashIndex, INDEX_NAME
+        from .regress import (Regression, RESULTS_NAME, write_json,
+                              write_junit)
+        if not isinstance(self.tool, MakefileSim) or not self.tool.SIM_TOPS:
+            raise Exception("The 'regress' command requires a simulation "
+                            "tool supporting 'sim_tops'")
+        top_dict = self.top_manifest.manifest_dict
+        if self.options.tops:
+            self.set_sim_tops(self.options.tops)
+        tops = top_dict.get("sim_tops")
+        if not tops:
+            raise Exception("No test to run: give the tops on the command "
+                            "line or set 'sim_tops'")
+        if top_dict.get("sim_top") is None:
+            self.top_library, self.top_entity = tops[0].split('.', 1)
+            top_dict["sim_top_library"] = self.top_library
+            top_dict["sim_top"] = self.top_entity
+        self.makefile()
+        makefile = self.options.filename or "Makefile"
+        cached = self.tool.get_cached_libs()
+        targets = self.tool.get_compile_setup_targets() + [
+            self.tool.get_stamp_file(f)
+            for f in dep_solver.make_dependency_sorted_list(
+                self.parseable_fileset)
+            if self.tool.is_compiled(f)
+            and f.library not in cached]
+        hash_index = HashIndex(os.path.join(self.top_manifest.path,
+                                            INDEX_NAME))
+        filesets = dict(self.solve_file_sets(tops))
+        regression = Regression(makefile, [], self.options.jobs,
+                                self.options.timeout, self.options.logdir,
+                                os.path.join(self.top_manifest.path,
+                                             RESULTS_NAME))
+        for (target, library, module), top in zip(self.tool.get_sim_tops(),
+                                                  tops):
+            digest = hashlib.sha256()
+            # The key of a test does not depend on the other tops.
+            entries = self._fingerprint_entries(
+                hash_index, filesets[top],
+                ("sim_tops", "sim_top", "sim_top_library"))
+            entries.append(("command", target,
+                            " ".join(regression.get_command(target))))
+            for entry in entries:
+                digest.update(("\t".join(entry) + "\n").encode('utf-8'))
+            regression.tests.append((top, target, digest.hexdigest()))
+        hash_index.save()
+        regression.compile(targets)
+        results = regression.run(self.options.force)
+        if self.options.json:
+            write_json(results, self.options.json)
+        if self.options.junit:
+            write_junit(results, self.options.junit)
+        for res in results:
+            print("{:8} {:8.2f}s {}".format(res['status'], res['time'],
+                                            res['name']))
+        failed = [r['name'] for r in results
+                  if r['status'] not in ('passed', 'skipped')]
+        if failed:
+            raise Exception("{} of {} tests failed: {}".format(
+                len(failed), len(results), ", ".join(failed)))
+
+    def vendor_libs(self):
+        """Compile the simulation libraries of the vendors of the system
+        modules into sim_vendor_libs_dir, unless they are already there"""
+        from ..tools.makefilesim import MakefileSim
+        if not isinstance(self.tool, MakefileSim):
+            raise Exception("The 'vendor-libs' command requires a simulation "
+                            "tool ('action' must be 'simulation')")
+        self.tool.build_vendor_libs(self.top_manifest)
 
     def _print_comment(self, message):
         """Private method that prints a message to stdout if not terse"""
@@ -0,0 +1,176 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+#
+# Copyright (c) 2026 CERN
+#
+# This file is part of Hdlmake.
+#
+# Hdlmake is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Hdlmake is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with Hdlmake.  If not, see <http://www.gnu.org/licenses/>.
+
+"""Module providing the 'regress' command: the target of each simulation
+top is run by parallel jobs, with its own log file, once the sources
+shared by the tops have been compiled"""
+
+from __future__ import print_function
+from __future__ import absolute_import
+import os
+import json
+import time
+import logging
+
+# Name of the file keeping the key of the last passing run of each test,
+# created in the directory of the top manifest.
+RESULTS_NAME = ".hdlmake_regress.json"
+
+
+def run_command(cmd, log, timeout):
+    """Execute :param cmd: with its output written to the file :param log:.
+    Return 'passed', 'failed' or 'timeout' if it has been killed after
+    :param timeout: seconds (None for no limit)"""
+    import signal
+    import subprocess
+    with open(log, "w") as f:
+        proc = subprocess.Popen(cmd, stdout=f, stderr=subprocess.STDOUT,
+                                start_new_session=True)
+        try:
+            status = proc.wait(timeout=timeout)
+        except subprocess.TimeoutExpired:
+            # Also kill the simulator started by make.
+            if hasattr(os, "killpg"):
+                os.killpg(proc.pid, signal.SIGKILL)
+            else:
+                proc.kill()
+            proc.wait()
+            return 'timeout'
+    return 'passed' if status == 0 else 'failed'
+
+
+class Regression(object):
+
+    """Class running the tests of a regression.  A test is a make target,
+    skipped if its key is the one of its last passing run"""
+
+    def __init__(self, makefile, tests, jobs, timeout, logdir,
+                 results=RESULTS_NAME):
+        self.makefile = makefile
+        # List of (name, target, key)
+        self.tests = tests
+        self.jobs = jobs
+        self.timeout = timeout
+        self.logdir = logdir
+        self.results = results
+        self.passed = {}
+        if os.path.exists(results):
+            try:
+                with open(results, "r") as f:
+                    self.passed = json.load(f)
+            except (ValueError, IOError) as error:
+                logging.warning("Cannot read %s (ignored): %s",
+                                results, error)
+
+    def get_command(self, target):
+        """Return the command running the make :param target:"""
+        return ["make", "-f", self.makefile, target]
+
+    def _run_test(self, test):
+        """Run :param test:, return its result"""
+        name, target, _ = test
+        log = os.path.join(self.logdir, name + ".log")
+        start = time.time()
+        status = run_command(self.get_command(target), log, self.timeout)
+        duration = time.time() - start
+        if status == 'passed':
+            logging.info("Passed %s (%.2fs)", name, duration)
+        else:
+            logging.error("%s %s (%.2fs), see %s", status.capitalize(),
+                          name, duration, log)
+        return {'name': name, 'target': target, 'status': status,
+                'time': duration, 'log': log}
+
+    def compile(self, targets):
+        """Build the make :param targets: (the sources shared by the tests)
+        with parallel jobs"""
+        if not os.path.isdir(self.logdir):
+            os.makedirs(self.logdir)
+        log = os.path.join(self.logdir, "compile.log")
+        cmd = ["make", "-j", str(self.jobs), "-f", self.makefile] + targets
+        if run_command(cmd, log, None) != 'passed':
+            raise Exception("Compilation failed, see {}".format(log))
+
+    def run(self, force=False):
+        """Run the tests, unless unchanged since their last passing run
+        (if not :param force:).  Return the list of the results"""
+        from concurrent.futures import ThreadPoolExecutor
+        if not os.path.isdir(self.logdir):
+            os.makedirs(self.logdir)
+        results = {}
+        tests = []
+        for test in self.tests:
+            name, target, key = test
+            if not force and self.passed.get(name) == key:
+                results[name] = {'name': name, 'target': target,
+                                 'status': 'skipped', 'time': 0.0,
+                                 'log': None}
+            else:
+                tests.append(test)
+        logging.info("%d tests to run, %d unchanged", len(tests),
+                     len(self.tests) - len(tests))
+        try:
+            with ThreadPoolExecutor(max_workers=self.jobs) as pool:
+                for res in pool.map(self._run_test, tests):
+                    results[res['name']] = res
+        finally:
+            for name, _, key in tests:
+                if name not in results:
+                    continue
+                if results[name]['status'] == 'passed':
+                    self.passed[name] = key
+                else:
+                    self.passed.pop(name, None)
+            with open(self.results, "w") as f:
+                json.dump(self.passed, f, sort_keys=True, indent=1)
+        return [results[name] for name, _, _ in self.tests]
+
+
+def write_json(results, filename):
+    """Write the summary of :param results: as JSON"""
+    with open(filename, "w") as f:
+        json.dump({'tests': results}, f, sort_keys=True, indent=1)
+
+
+def write_junit(results, filename):
+    """Write the summary of :param results: as a JUnit XML report"""
+    from xml.etree import ElementTree as ET
+    suite = ET.Element("testsuite", {
+        'name': "hdlmake",
+        'tests': str(len(results)),
+        'failures': str(len([r for r in results if r['status'] != 'passed'
+                             and r['status'] != 'skipped'])),
+        'skipped': str(len([r for r in results
+                            if r['status'] == 'skipped'])),
+        'time': "{:.3f}".format(sum(r['time'] for r in results))})
+    for res in results:
+        case = ET.SubElement(suite, "testcase", {
+            'name': res['name'], 'classname': "regress",
+            'time': "{:.3f}".format(res['time'])})
+        if res['status'] == 'skipped':
+            ET.SubElement(case, "skipped",
+                          {'message': "unchanged since its last passing run"})
+        elif res['status'] != 'passed':
+            failure = ET.SubElement(case, "failure",
+                                    {'message': res['status']})
+            with open(res['log'], "r", errors="replace") as f:
+                failure.text = f.read()
+    ET.ElementTree(suite).write(filename, encoding="utf-8",
+                                xml_declaration=True)
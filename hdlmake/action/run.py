@@ -0,0 +1,83 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+#
+# Copyright (c) 2026 CERN
+#
+# This file is part of Hdlmake.
+#
+# Hdlmake is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Hdlmake is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with Hdlmake.  If not, see <http://www.gnu.org/licenses/>.
+
+"""Module providing the 'run' command: several commands executed on the
+same loaded and solved design"""
+
+from __future__ import print_function
+from __future__ import absolute_import
+import sys
+import shlex
+import logging
+
+from .server import DesignServer, SERVED_COMMANDS
+
+
+def split_command(spec):
+    """Split a 'CMD[:DEST]' or 'CMD -o DEST' specification into the
+    arguments of the command and its destination (None for the standard
+    output).  Only the last argument may end with ':DEST', so that the
+    other arguments can contain ':'"""
+    args = shlex.split(spec)
+    if len(args) >= 2 and args[-2] == '-o':
+        dest = args[-1]
+        return args[:-2], None if dest == '-' else dest
+    head, sep, dest = args[-1].partition(':') if args else ('', '', '')
+    if not sep or not dest:
+        # No destination, or a ':' argument.
+        return args, None
+    return args[:-1] + ([head] if head else []), dest
+
+
+def run_commands(options, global_args, parser):
+    """Execute the commands of :param options:.  Each command is parsed by
+    :param parser: with the :param global_args:"""
+    from ..main import _action_runner
+    commands = []
+    for spec in options.commands:
+        cmd_args, dest = split_command(spec)
+        cmd_options = parser.parse_args(global_args + cmd_args)
+        if cmd_options.command not in SERVED_COMMANDS:
+            raise Exception("Command '{}' cannot be used by 'run', use one "
+                            "of: {}".format(cmd_options.command,
+                                            ', '.join(SERVED_COMMANDS)))
+        if cmd_options.command == "makefile" and dest is not None:
+            cmd_options.filename = dest
+            dest = None
+        commands.append((cmd_options, dest))
+
+    design = DesignServer(options)
+    design.update()
+    graph = None
+    for cmd_options, dest in commands:
+        logging.debug("Run command: %s", cmd_options.command)
+        action = design.new_action(cmd_options)
+        # The sources are parsed only once, for the first command.
+        action.graph = graph
+        if dest is None:
+            _action_runner(action)
+        else:
+            prev_stdout = sys.stdout
+            try:
+                with open(dest, "w") as sys.stdout:
+                    _action_runner(action)
+            finally:
+                sys.stdout = prev_stdout
+        graph = action.graph
@@ -0,0 +1,225 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+#
+# Copyright (c) 2026 CERN
+#
+# This file is part of Hdlmake.
+#
+# Hdlmake is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Hdlmake is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with Hdlmake.  If not, see <http://www.gnu.org/licenses/>.
+
+"""Module providing the 'compile' command: the sources are compiled by
+parallel jobs, the files on the longest chain of dependencies first"""
+
+from __future__ import print_function
+from __future__ import absolute_import
+import os
+import json
+import time
+import heapq
+import hashlib
+import logging
+
+# Name of the file keeping the key and the duration of each compilation,
+# created in the directory of the top manifest.
+TIMES_NAME = ".hdlmake_compile_times.json"
+
+# Estimated duration of a compilation never done.
+DEFAULT_COST = 1.0
+
+
+def schedule(tasks, deps, costs, run, jobs):
+    """Execute :param run: for each task of :param tasks: (given in
+    dependency order) with at most :param jobs: tasks at a time.  A task
+    is started once the tasks of :param deps: are done, the ready task
+    with the most costly chain of dependent tasks first.  Return the list
+    of the failed tasks (no task is started after a failure)"""
+    from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+    dependents = dict((task, []) for task in tasks)
+    waiting = {}
+    for task in tasks:
+        waiting[task] = len(deps[task])
+        for dep in deps[task]:
+            dependents[dep].append(task)
+    priority = {}
+    for task in reversed(tasks):
+        priority[task] = costs[task] + max(
+            [priority[t] for t in dependents[task]] or [0])
+    order = dict((task, n) for n, task in enumerate(tasks))
+    ready = [(-priority[t], order[t], t) for t in tasks if waiting[t] == 0]
+    heapq.heapify(ready)
+    failed = []
+    running = {}
+    with ThreadPoolExecutor(max_workers=jobs) as pool:
+        while ready or running:
+            while ready and len(running) < jobs and not failed:
+                task = heapq.heappop(ready)[2]
+                running[pool.submit(run, task)] = task
+            if not running:
+                break
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in done:
+                task = running.pop(future)
+                if not future.result():
+                    failed.append(task)
+                    continue
+                for dependent in dependents[task]:
+                    waiting[dependent] -= 1
+                    if waiting[dependent] == 0:
+                        heapq.heappush(ready, (-priority[dependent],
+                                               order[dependent], dependent))
+    return failed
+
+
+class Compiler(object):
+
+    """Class compiling the files of a simulation Makefile by calling
+    make for each stamp file"""
+
+    def __init__(self, tool, files, options_key, makefile, jobs):
+        from ..util.hashindex import HashIndex, INDEX_NAME
+        self.tool = tool
+        self.makefile = makefile
+        self.jobs = jobs
+        self.hash_index = HashIndex(INDEX_NAME)
+        self.times = {}
+        if os.path.exists(TIMES_NAME):
+            try:
+                with open(TIMES_NAME, "r") as f:
+                    self.times = json.load(f)
+            except (ValueError, IOError) as error:
+                # Left by an interrupted run: everything is compiled again.
+                logging.warning("Cannot read %s (ignored): %s",
+                                TIMES_NAME, error)
+        # Files with a compile command, in dependency order.
+        self.commands = {}
+        self.files = []
+        # The libraries taken from the library cache are not compiled.
+        cached = tool.get_cached_libs()
+        for dep_file in files:
+            cmd = tool.get_compile_command(dep_file)
+            if cmd is not None and dep_file.library not in cached:
+                self.commands[dep_file] = cmd
+                self.files.append(dep_file)
+        self.keys = self._get_keys(options_key)
+        self.library_order = tool.get_library_order()
+
+    def _get_deps(self, dep_file):
+        """Return the compiled files :param dep_file: depends on"""
+        return [d for d in dep_file.depends_on
+                if d is not dep_file and d in self.commands]
+
+    def _get_task_deps(self, dep_file, tasks):
+        """Return the :param tasks: to be done before compiling
+        :param dep_file:, including the previous file of the library if
+        the files of a library are compiled one at a time"""
+        deps = [d for d in self._get_deps(dep_file) if d in tasks]
+        # The previous file of the library is an order-only prerequisite
+        # in the Makefile: make would compile it if not done.
+        prev = self.library_order.get(dep_file)
+        while prev is not None and prev not in tasks:
+            prev = self.library_order.get(prev)
+        if prev is not None and prev not in deps:
+            deps.append(prev)
+        return deps
+
+    def _get_keys(self, options_key):
+        """Return the key of each file: a hash of its command, its content,
+        the content of its included files and the keys of its
+        dependencies"""
+        keys = {}
+        for dep_file in self.files:
+            digest = hashlib.sha256()
+            for item in [options_key, self.commands[dep_file],
+                         dep_file.library, self.hash_index.get(dep_file.path)]:
+                digest.update((item + "\n").encode('utf-8'))
+            for inc in sorted(dep_file.included_files):
+                digest.update((self.hash_index.get(inc) + "\n").encode('utf-8'))
+            # A circular dependency may not have a key yet.
+            for dep in sorted(keys.get(d, "") for d in self._get_deps(dep_file)):
+                digest.update((dep + "\n").encode('utf-8'))
+            keys[dep_file] = digest.hexdigest()
+        return keys
+
+    def _make(self, args):
+        """Execute make, return its exit status and its output"""
+        import subprocess
+        proc = subprocess.Popen(["make", "-s", "-f", self.makefile] + args,
+                                stdout=subprocess.PIPE,
+                                stderr=subprocess.STDOUT)
+        output = proc.communicate()[0].decode('utf-8', 'replace')
+        return proc.returncode, output
+
+    def _compile(self, dep_file):
+        """Compile :param dep_file:, return True if successful"""
+        stamp = self.tool.get_stamp_file(dep_file)
+        start = time.time()
+        # -W: the stamp is rebuilt even if newer than the source.
+        status, output = self._make(["-W", dep_file.rel_path(), stamp])
+        duration = time.time() - start
+        if status != 0:
+            logging.error("Failed to compile %s:\n%s",
+                          dep_file.rel_path(), output)
+            return False
+        if output:
+            print(output, end='')
+        logging.info("Compiled %s (%.2fs)", dep_file.rel_path(), duration)
+        self.times[stamp] = {'key': self.keys[dep_file], 'time': duration}
+        return True
+
+    def run(self, setup_targets):
+        """Compile the files whose inputs have changed.  Return the list
+        of the files that failed to compile"""
+        if setup_targets:
+            status, output = self._make(setup_targets)
+            if status != 0:
+                raise Exception("Cannot prepare the compilation:\n" + output)
+        dirty = set()
+        for dep_file in self.files:
+            stamp = self.tool.get_stamp_file(dep_file)
+            entry = self.times.get(stamp)
+            if (entry is None or entry['key'] != self.keys[dep_file]
+                    or not os.path.exists(stamp)
+                    or any(d in dirty for d in self._get_deps(dep_file))):
+                dirty.add(dep_file)
+            else:
+                # Unchanged: the stamp must not look older than its
+                # prerequisites to make.  It is not touched otherwise, so
+                # that the elaboration is not done again.
+                prereqs = ([dep_file.path] + sorted(dep_file.included_files)
+                           + [self.tool.get_stamp_file(d)
+                              for d in self._get_deps(dep_file)])
+                newest = max(os.path.getmtime(p) for p in prereqs
+                             if os.path.exists(p))
+                if os.path.getmtime(stamp) < newest:
+                    os.utime(stamp, None)
+        tasks = [f for f in self.files if f in dirty]
+        logging.info("%d files to compile, %d unchanged", len(tasks),
+                     len(self.files) - len(tasks))
+        known = [e['time'] for e in self.times.values()]
+        default = sum(known) / len(known) if known else DEFAULT_COST
+        costs = {}
+        for dep_file in tasks:
+            entry = self.times.get(self.tool.get_stamp_file(dep_file))
+            costs[dep_file] = entry['time'] if entry else default
+        for dep_file in tasks:
+            self.times.pop(self.tool.get_stamp_file(dep_file), None)
+        try:
+            failed = schedule(
+                tasks, dict((f, self._get_task_deps(f, dirty)) for f in tasks),
+                costs, self._compile, self.jobs)
+        finally:
+            self.hash_index.save()
+            with open(TIMES_NAME, "w") as f:
+                json.dump(self.times, f, sort_keys=True, indent=1)
+        return failed
@@ -0,0 +1,286 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+#
+# Copyright (c) 2026 CERN
+#
+# This file is part of Hdlmake.
+#
+# Hdlmake is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Hdlmake is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with Hdlmake.  If not, see <http://www.gnu.org/licenses/>.
+
+"""Module providing the hdlmake daemon ('serve' command) and its client.
+
+The daemon keeps the module pool and the parsed relations of the sources
+in memory.  Before each request, the manifests are checked (modification
+time and size) and the pool is reloaded if one of them has changed; the
+sources are parsed again only if they have changed."""
+
+from __future__ import print_function
+from __future__ import absolute_import
+import os
+import io
+import sys
+import json
+import socket
+import logging
+
+from ..util import path as path_mod
+from ..util import shell
+
+# Name of the socket, created in the directory of the top manifest.
+SOCKET_NAME = ".hdlmake.sock"
+
+# Commands that can be answered by the daemon.
+SERVED_COMMANDS = ("makefile", "list-mods", "list-files", "list-json",
+                   "list-deps", "affected", "fingerprint")
+
+
+def _check_platform():
+    """Raise an exception if unix sockets are not available"""
+    if not hasattr(socket, 'AF_UNIX'):
+        raise Exception("The hdlmake daemon requires unix sockets, "
+                        "not available on this platform")
+
+
+def _find_socket():
+    """Return the path of the socket of the daemon serving the current
+    directory: the directory itself or, if it has no manifest, the closest
+    parent directory with a socket.  Return None if there is none"""
+    path = os.getcwd()
+    while True:
+        if os.path.exists(os.path.join(path, SOCKET_NAME)):
+            # Relative, as the length of a socket path is limited.
+            return os.path.relpath(os.path.join(path, SOCKET_NAME))
+        if any(os.path.exists(os.path.join(path, name))
+               for name in ("Manifest.py", "manifest.py")):
+            return None
+        parent = os.path.dirname(path)
+        if parent == path:
+            return None
+        path = parent
+
+
+def _send_request(request, sock_path=None):
+    """Send :param request: to the daemon listening on :param sock_path:
+    (by default, the one serving the current directory) and return its
+    reply, or None if there is no daemon running"""
+    if not hasattr(socket, 'AF_UNIX'):
+        return None
+    if sock_path is None:
+        sock_path = _find_socket()
+    if sock_path is None or not os.path.exists(sock_path):
+        return None
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        sock.connect(sock_path)
+        sock.sendall((json.dumps(request) + "\n").encode('utf-8'))
+        sock.shutdown(socket.SHUT_WR)
+        data = b""
+        while True:
+            chunk = sock.recv(65536)
+            if not chunk:
+                break
+            data += chunk
+    except socket.error as error:
+        logging.debug("Cannot talk to the hdlmake daemon: %s", error)
+        return None
+    finally:
+        sock.close()
+    if not data:
+        return None
+    return json.loads(data.decode('utf-8'))
+
+
+def forward_command(args):
+    """Run the command :param args: by the daemon, if there is one running.
+    Return the exit status of the command, or None if it has to be run
+    locally"""
+    reply = _send_request({'args': args})
+    if reply is None or reply.get('fallback'):
+        return None
+    logging.debug("Command executed by the hdlmake daemon")
+    for level, message in reply['log']:
+        logging.log(level, message)
+    sys.stdout.write(reply['stdout'])
+    sys.stdout.flush()
+    if reply['status'] != 0:
+        logging.critical(reply['error'])
+    return reply['status']
+
+
+class _LogCollector(logging.Handler):
+    """Logging handler that collects the records of a request, so that
+    they are displayed by the client"""
+
+    def __init__(self, level):
+        super(_LogCollector, self).__init__(level)
+        self.records = []
+
+    def emit(self, record):
+        self.records.append((record.levelno, record.getMessage()))
+
+
+class DesignServer(object):
+
+    """Class holding the design state between the requests"""
+
+    def __init__(self, options):
+        from ..sourcefiles.new_dep_solver import ParseCache
+        self.options = options
+        self.parse_cache = ParseCache()
+        self.design = None
+        self.pristine_dict = None
+        self.stamps = None
+
+    def _manifest_options(self, options):
+        """Return the options that change how manifests are parsed"""
+        return (options.prefix_code, options.suffix_code, options.fetchto)
+
+    def _get_stamps(self):
+        """Return a signature of the manifests and of the directories
+        whose content is listed by the manifests"""
+        stamps = {}
+        for mod in self.design.all_manifests:
+            if mod.manifest_file is not None:
+                stamps[mod.manifest_file] = path_mod.file_stamp(
+                    mod.manifest_file)
+            else:
+                # Not fetched (or no manifest): check if it is now.
+                stamps[mod.path] = (os.path.isdir(mod.path)
+                                    and len(os.listdir(mod.path)) > 0)
+            for dirname in mod.glob_dirs:
+                stamps[dirname] = path_mod.file_stamp(dirname)
+        return stamps
+
+    def _load(self):
+        """(Re)load the whole module pool"""
+        from .commands import Commands
+        logging.info("Loading the manifests")
+        design = Commands(self.options)
+        design.load_all_manifests()
+        self.design = design
+        # setup() and the tools modify the dictionary of the top manifest,
+        # keep a copy to restore it for every request.
+        self.pristine_dict = dict(design.top_manifest.manifest_dict)
+        self.stamps = self._get_stamps()
+
+    def update(self):
+        """Reload the pool if a manifest has changed"""
+        if self.design is None or self._get_stamps() != self.stamps:
+            self._load()
+
+    def new_action(self, options):
+        """Create the action for a request, using the loaded pool"""
+        from .commands import Commands
+        design = self.design
+        design.top_manifest.manifest_dict = dict(self.pristine_dict)
+        action = Commands(options)
+        action.top_manifest = design.top_manifest
+        action.all_manifests = design.all_manifests
+        action.modules_index = design.modules_index
+        action.system_libs = set(design.system_libs)
+        action.parse_cache = self.parse_cache
+        action.setup()
+        return action
+
+    def warm_up(self):
+        """Parse all the sources of the design, to fill the cache"""
+        from ..sourcefiles import new_dep_solver as dep_solver
+        action = self.new_action(self.options)
+        action.build_file_set()
+        dep_solver.parse_source_files(dep_solver.AllRelations(),
+                                      action.parseable_fileset,
+                                      self.parse_cache)
+
+    def handle(self, args):
+        """Execute the command :param args: and return the reply"""
+        from ..main import _get_parser, _action_runner
+        try:
+            options = _get_parser().parse_args(args)
+        except SystemExit:
+            return {'fallback': True}
+        if (options.command not in SERVED_COMMANDS
+                or options.__dict__.get('changed_from') == '-'
+                or (self._manifest_options(options)
+                    != self._manifest_options(self.options))):
+            return {'fallback': True}
+        collector = _LogCollector(getattr(logging, options.log.upper(),
+                                          logging.INFO))
+        root = logging.getLogger()
+        prev_level = root.level
+        root.addHandler(collector)
+        root.setLevel(min(prev_level, collector.level))
+        prev_stdout = sys.stdout
+        sys.stdout = io.StringIO()
+        status, error = 0, None
+        try:
+            shell.set_commands_os(options.__dict__.get('make') or 'auto')
+            self.update()
+            _action_runner(self.new_action(options))
+        except Exception as e:
+            status, error = 2, str(e)
+        finally:
+            stdout = sys.stdout.getvalue()
+            sys.stdout = prev_stdout
+            root.removeHandler(collector)
+            root.setLevel(prev_level)
+        logging.debug("Parse cache: %d hits, %d misses",
+                      self.parse_cache.hits, self.parse_cache.misses)
+        return {'status': status, 'error': error,
+                'stdout': stdout, 'log': collector.records}
+
+
+def serve(options):
+    """Start the daemon, or stop it with --stop"""
+    _check_platform()
+    if options.stop:
+        if _send_request({'stop': True}) is None:
+            logging.warning("No hdlmake daemon is running here")
+        return
+    if _send_request({'ping': True}, SOCKET_NAME) is not None:
+        raise Exception("An hdlmake daemon is already running here "
+                        "(use 'hdlmake serve --stop' to stop it)")
+    import socketserver
+
+    class _RequestHandler(socketserver.StreamRequestHandler):
+        def handle(self):
+            request = json.loads(self.rfile.readline().decode('utf-8'))
+            if request.get('stop'):
+                self.server.stopping = True
+                reply = {'status': 0}
+            elif request.get('ping'):
+                reply = {'status': 0}
+            else:
+                reply = self.server.design_server.handle(request['args'])
+            self.wfile.write((json.dumps(reply) + "\n").encode('utf-8'))
+
+    design_server = DesignServer(options)
+    design_server.update()
+    design_server.warm_up()
+    # In the directory of the top manifest, where the clients look for it.
+    sock_path = os.path.relpath(os.path.join(
+        design_server.design.top_manifest.path, SOCKET_NAME))
+    if os.path.exists(sock_path):
+        # Left by a daemon that was killed.
+        os.remove(sock_path)
+    server = socketserver.UnixStreamServer(sock_path, _RequestHandler)
+    server.design_server = design_server
+    server.stopping = False
+    logging.info("hdlmake daemon ready, listening on %s", sock_path)
+    try:
+        while not server.stopping:
+            server.handle_request()
+    finally:
+        server.server_close()
+        os.remove(sock_path)
+    logging.info("hdlmake daemon stopped")
@@ -0,0 +1,147 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+#
+# Copyright (c) 2026 CERN
+#
+# This file is part of Hdlmake.
+#
+# Hdlmake is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Hdlmake is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with Hdlmake.  If not, see <http://www.gnu.org/licenses/>.
+
+"""Module providing the 'watch' command: a command is executed again each
+time a manifest or a source file of the design changes"""
+
+from __future__ import print_function
+from __future__ import absolute_import
+import os
+import io
+import sys
+import time
+import logging
+
+from ..util import path as path_mod
+from ..sourcefiles import new_dep_solver as dep_solver
+from .server import DesignServer, SERVED_COMMANDS
+
+
+class Watcher(DesignServer):
+
+    """Class keeping the design and its dependency graph alive, and
+    updating them when files change"""
+
+    def __init__(self, options, cmd_options):
+        super(Watcher, self).__init__(options)
+        self.cmd_options = cmd_options
+        self.output = options.output
+        self.graph = None
+        self.fileset = None
+        self.source_stamps = {}
+        self.last_output = None
+
+    def _get_source_stamps(self, files):
+        """Return the stamps of :param files: and of their included files"""
+        stamps = {}
+        for dep_file in files:
+            paths = [dep_file.path] + sorted(dep_file.included_files)
+            stamps[dep_file] = [(p, path_mod.file_stamp(p)) for p in paths]
+        return stamps
+
+    def _load(self):
+        """Reload the pool and build again the graph"""
+        super(Watcher, self)._load()
+        action = self.new_action(self.cmd_options)
+        action.build_file_set()
+        self.fileset = action.parseable_fileset
+        self.graph = dep_solver.AllRelations()
+        dep_solver.parse_source_files(self.graph, self.fileset,
+                                      self.parse_cache)
+        self.source_stamps = self._get_source_stamps(self.fileset)
+
+    def _changed_files(self):
+        """Return the source files modified since the last step"""
+        return [f for f, stamps in self.source_stamps.items()
+                if any(path_mod.file_stamp(p) != s for p, s in stamps)]
+
+    def _run_command(self):
+        """Execute the command and return its standard output"""
+        from ..main import _action_runner
+        action = self.new_action(self.cmd_options)
+        action.graph = self.graph
+        prev_stdout = sys.stdout
+        sys.stdout = io.StringIO()
+        try:
+            _action_runner(action)
+            return sys.stdout.getvalue()
+        finally:
+            sys.stdout = prev_stdout
+
+    def _write_output(self, text):
+        """Write the output of the command, if it has changed"""
+        if text == self.last_output:
+            return False
+        self.last_output = text
+        if self.output is None:
+            sys.stdout.write(text)
+            sys.stdout.flush()
+            return True
+        if os.path.exists(self.output):
+            with open(self.output, "r") as f:
+                if f.read() == text:
+                    return False
+        with open(self.output, "w") as f:
+            f.write(text)
+        logging.info("%s updated", self.output)
+        return True
+
+    def step(self):
+        """Look for changes and execute again the command if needed.
+        Return True if the design has been updated"""
+        stamps = None if self.design is None else self._get_stamps()
+        if stamps is None or stamps != self.stamps:
+            self._load()
+        else:
+            changed = self._changed_files()
+            if not changed:
+                return False
+            logging.info("Changed: %s",
+                         ", ".join(path_mod.relpath(f.path) for f in changed))
+            dep_solver.update_source_files(self.graph, self.fileset, changed,
+                                           self.parse_cache)
+            self.source_stamps.update(self._get_source_stamps(changed))
+        self._write_output(self._run_command())
+        return True
+
+
+def watch(options, cmd_options):
+    """Execute the command each time the design is modified"""
+    if cmd_options.command not in SERVED_COMMANDS:
+        raise Exception("Command '{}' cannot be watched, use one of: {}".format(
+            cmd_options.command, ', '.join(SERVED_COMMANDS)))
+    if cmd_options.command == "makefile" and options.output is not None:
+        cmd_options.filename = options.output
+        options.output = None
+    watcher = Watcher(options, cmd_options)
+    logging.info("Watching the design (interval: %ss), press Ctrl-C to stop",
+                 options.interval)
+    try:
+        while True:
+            try:
+                watcher.step()
+            except Exception as e:
+                # Wait for the user to fix the design, and reload it.
+                logging.error(e)
+                watcher.design = None
+                watcher.last_output = None
+            time.sleep(options.interval)
+    except KeyboardInterrupt:
+        pass
@@ -25,13 +25,10 @@
 from __future__ import print_function
 from __future__ import absolute_import
 import argparse
+import os
 import sys
 import logging
 from .util import shell
-from .util.termcolor import colored
-
-from .manifest_parser.manifestparser import ManifestParser
-from .action.commands import Commands
 from ._version import __version__
 
 
@@ -63,6 +60,38 @@ def hdlmake(args):
         if make_value:
             shell.set_commands_os(make_value)
 
+        if options.command == "serve":
+            from .action.server import serve
+            serve(options)
+            return
+
+        if options.command == "run":
+            from .action.run import run_commands
+            run_commands(options, args[:args.index("run")], _get_parser())
+            return
+
+        if options.command == "watch":
+            from .action.watch import watch
+            # The watched command is parsed with the global options.
+            cmd_args = args[:args.index("watch")] + options.cmd_args
+            watch(options, _get_parser().parse_args(cmd_args))
+            return
+
+        # Let the daemon answer, if one is running for this design.
+        if not options.no_daemon:
+            from .action.server import SERVED_COMMANDS, forward_command
+            if options.command in SERVED_COMMANDS:
+                status = forward_command(args)
+                if status is not None:
+                    if status != 0:
+                        quit(status)
+                    return
+
+        # The commands (and with them the manifest parser, the dependency
+        # solver and the tools) are only loaded once the options are known,
+        # so that --help, --version and forwarded commands return quickly.
+        from .action.commands import Commands
+
         # Create a ModulePool object, this will become our workspace
         action = Commands(options)
 
@@ -88,6 +117,7 @@ def _action_runner(action):
     """Funtion that decodes and executed the action selected by the user"""
     cmd = action.options.command
     if cmd == "manifest-help":
+        from .manifest_parser.manifestparser import ManifestParser
         ManifestParser().print_help()
     elif cmd == "makefile" or cmd is None:
         action.makefile()
@@ -105,6 +135,16 @@ def _action_runner(action):
         action.list_json()
     elif cmd == "list-deps":
         action.list_deps()
+    elif cmd == "affected":
+        action.affected()
+    elif cmd == "compile":
+        action.compile()
+    elif cmd == "fingerprint":
+        action.fingerprint()
+    elif cmd == "vendor-libs":
+        action.vendor_libs()
+    elif cmd == "regress":
+        action.regress()
     elif cmd == "tree":
         action.generate_tree()
     else:
@@ -143,6 +183,51 @@ def _get_parser():
         "--windows", action='store_const', dest='make', const='windows',
         help="select a mingw/windows 'make' on windows platforms")
 
+    compile_cmd = subparsers.add_parser(
+        "compile",
+        help="write the Makefile and compile the simulation sources with "
+             "parallel jobs")
+    compile_cmd.add_argument(
+        "-j", "--jobs", default=os.cpu_count() or 1, type=int, dest="jobs",
+        help="number of parallel compilations (default: number of CPUs)")
+    compile_cmd.add_argument(
+        "-f", "--filename", default=None, dest="filename",
+        help="name for the Makefile file to be created")
+
+    regress = subparsers.add_parser(
+        "regress",
+        help="compile the simulation sources once and run the tests "
+             "(the simulation tops) with parallel jobs")
+    regress.add_argument(
+        "tops", nargs="*", metavar="TOP",
+        help="simulation top to run (default: the sim_tops variable)")
+    regress.add_argument(
+        "-j", "--jobs", default=os.cpu_count() or 1, type=int, dest="jobs",
+        help="number of parallel jobs (default: number of CPUs)")
+    regress.add_argument(
+        "--timeout", default=None, type=float, dest="timeout",
+        help="time in seconds after which a test is stopped and failed")
+    regress.add_argument(
+        "--logdir", default="regress_logs", dest="logdir",
+        help="directory of the log file of each test")
+    regress.add_argument(
+        "--json", default=None, dest="json", metavar="FILE",
+        help="write a JSON summary of the results")
+    regress.add_argument(
+        "--junit", default=None, dest="junit", metavar="FILE",
+        help="write a JUnit XML summary of the results")
+    regress.add_argument(
+        "--force", default=False, action="store_true", dest="force",
+        help="also run the tests unchanged since their last passing run")
+    regress.add_argument(
+        "-f", "--filename", default=None, dest="filename",
+        help="name for the Makefile file to be created")
+
+    subparsers.add_parser(
+        "vendor-libs",
+        help="compile the simulation libraries of the vendors of the system "
+             "modules into sim_vendor_libs_dir")
+
     subparsers.add_parser(
         "edalize",
         help="write a run.py file based on edalize")
@@ -175,13 +260,41 @@ def _get_parser():
         "--reverse", dest="reverse", default=False, action="store_true",
         help="reverse the order for the list of files")
     listfiles.add_argument(
-        "--top", dest="top", default=None,
-        help="print only those files required to build 'top'")
+        "--top", dest="top", default=None, action="append",
+        help="print only those files required to build 'top' (can be "
+             "repeated to list the files of several tops)")
+    listfiles.add_argument(
+        "--levels", default=False, action="store_true", dest="levels",
+        help="group the files by dependency level, the files of a level "
+             "can be compiled in parallel")
 
     subparsers.add_parser(
         "list-deps",
         help="print all dependencies")
 
+    affected = subparsers.add_parser(
+        "affected",
+        help="list the tops depending on changed files")
+    affected.add_argument(
+        "--changed-from", dest="changed_from", required=True,
+        metavar="FILE",
+        help="file with the list of changed files, one per line "
+             "('-' for stdin)")
+    affected.add_argument(
+        "--top", dest="top", default=None, action="append",
+        help="top to check (can be repeated), default is every entity "
+             "or module not instantiated by the design")
+    affected.add_argument(
+        "--tops-only", default=False, action="store_true", dest="tops_only",
+        help="print only the names of the affected tops")
+
+    fingerprint = subparsers.add_parser(
+        "fingerprint",
+        help="print a hash of the solved design, its options and its tool")
+    fingerprint.add_argument(
+        "--details", default=False, action="store_true", dest="details",
+        help="print the hashed entries before the hash")
+
     tree = subparsers.add_parser(
         "tree",
         help="generate a module hierarchy tree graph")
@@ -193,14 +306,47 @@ def _get_parser():
         help="set the working mode for the tree generator: "
              "(mods, dfs, bfs)")
 
-    subparsers.add_parser(
+    listjson = subparsers.add_parser(
         "list-json",
         help="list all the files using a JSON list")
+    listjson.add_argument(
+        "--levels", default=False, action="store_true", dest="levels",
+        help="add the files grouped by dependency level")
 
     subparsers.add_parser(
         "manifest-help",
         help="print manifest file variables description")
 
+    serve = subparsers.add_parser(
+        "serve",
+        help="run a daemon keeping the design in memory to answer the "
+             "makefile and list commands")
+    serve.add_argument(
+        "--stop", default=False, action="store_true", dest="stop",
+        help="stop the daemon running for this design")
+
+    run = subparsers.add_parser(
+        "run",
+        help="execute several commands on the same loaded design")
+    run.add_argument(
+        "commands", nargs="+", metavar="CMD[:DEST]",
+        help="command (with its arguments if quoted) and the file "
+             "receiving its output (default: stdout), also given by "
+             "'CMD -o DEST'")
+
+    watch = subparsers.add_parser(
+        "watch",
+        help="execute a command again each time the design changes")
+    watch.add_argument(
+        "--interval", default=0.5, type=float, dest="interval",
+        help="delay in seconds between two checks for changes")
+    watch.add_argument(
+        "--output", default=None, dest="output",
+        help="file receiving the output of the command (default: stdout)")
+    watch.add_argument(
+        "cmd_args", nargs=argparse.REMAINDER, metavar="COMMAND",
+        help="the command to execute, with its arguments")
+
     parser.add_argument(
         '-v', '--version', action='version',
         help="print the version of this program",
@@ -226,6 +372,9 @@ def _get_parser():
     parser.add_argument(
         "--fetchto", dest="fetchto", default=None,
         help="overrides the fetchto variable")
+    parser.add_argument(
+        "--no-daemon", default=False, action="store_true", dest="no_daemon",
+        help="do not forward the command to a running hdlmake daemon")
     return parser
 
 
@@ -236,6 +385,7 @@ def set_logging_level(options):
         raise Exception('Invalid log level: %s' % options.log)
 
     if not shell.check_windows_tools() and options.logfile == None:
+        from .util.termcolor import colored
         logging.basicConfig(
             format=colored(
                 "%(levelname)s",
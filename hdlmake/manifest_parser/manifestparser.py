@@ -193,7 +193,19 @@ class ManifestParser(ConfigParser):
             {'name': 'syn_jobs',
              'default': '2',
              'help': "Number of parallel threads to be used for synthesis (Vivado only)",
-             'type': ''}]
+             'type': ''},
+            {'name': 'syn_incremental',
+             'default': False,
+             'help': "Start the runs from the checkpoints of the last successful run (Vivado only)",
+             'type': False},
+            {'name': 'syn_cache_dir',
+             'default': None,
+             'help': "Directory of the cache of the synthesis outputs",
+             'type': ''},
+            {'name': 'syn_cache_files',
+             'default': None,
+             'help': "Files stored in the synthesis cache (default: files removed by mrproper)",
+             'type': []}]
         self.add_option_list(syn_options)
         self.add_delimiter()
         quartus_options = [
@@ -216,6 +228,10 @@ class ManifestParser(ConfigParser):
              'default': None,
              'help': "Top level module for simulation. Optionally prefixed with library, see top_module",
              'type': ''},
+            {'name': 'sim_tops',
+             'default': None,
+             'help': "Top level modules sharing the compilation of the design, each with its own target",
+             'type': []},
             {'name': 'sim_tool',
              'default': None,
              'help': "Simulation tool to be used (e.g. isim, vsim, iverilog)",
@@ -231,6 +247,22 @@ class ManifestParser(ConfigParser):
             {'name': 'sim_post_cmd',
              'default': None,
              'help': "Command to be executed after simulation",
+             'type': ''},
+            {'name': 'sim_batch_compile',
+             'default': False,
+             'help': "Compile the files of a library and dependency level by one command (Modelsim, Riviera, Vivado Sim)",
+             'type': False},
+            {'name': 'sim_lib_cache_dir',
+             'default': None,
+             'help': "Directory of the compiled libraries shared between projects (Modelsim, Riviera)",
+             'type': ''},
+            {'name': 'sim_vendor_libs_dir',
+             'default': None,
+             'help': "Directory of the compiled simulation libraries of the vendors (see 'vendor-libs')",
+             'type': ''},
+            {'name': 'sim_checkpoint',
+             'default': None,
+             'help': "Simulation time (or simulator commands) after which the checkpoint target saves the simulation (Modelsim)",
              'type': ''}]
         self.add_option_list(sim_options)
         self.add_delimiter()
@@ -254,6 +286,10 @@ class ManifestParser(ConfigParser):
             {'name': 'vmap_opt',
              'default': "",
              'help': "Additional options for vmap",
+             'type': ''},
+            {'name': 'qrun_opt',
+             'default': "",
+             'help': "Additional options for qrun",
              'type': ''}]
         self.add_option_list(modelsim_options)
         self.add_delimiter()
@@ -263,6 +299,29 @@ class ManifestParser(ConfigParser):
             help="Additional options for IVerilog",
             type='')
         self.add_delimiter()
+        verilator_options = [
+            {'name': 'verilator_opt',
+             'default': "",
+             'help': "Additional options for verilator",
+             'type': ''},
+            {'name': 'verilator_threads',
+             'default': None,
+             'help': "Number of threads of the Verilator model (--threads)",
+             'type': 0},
+            {'name': 'verilator_jobs',
+             'default': None,
+             'help': "Number of parallel jobs of verilator (-j)",
+             'type': 0},
+            {'name': 'verilator_build_jobs',
+             'default': None,
+             'help': "Number of parallel jobs building the Verilator model (--build-jobs)",
+             'type': 0},
+            {'name': 'verilator_objcache',
+             'default': None,
+             'help': "Compiler cache used to build the Verilator model (e.g. ccache)",
+             'type': ''}]
+        self.add_option_list(verilator_options)
+        self.add_delimiter()
         self.add_option(
             'ghdl_opt',
             default="",
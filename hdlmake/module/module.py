@@ -86,6 +86,9 @@ class Module(object):
         self.revision = None
         self.path = None                        # Relative path to the module.
         self.isfetched = False                  # True if the module exists on the file system.
+        self.manifest_file = None               # Path of the parsed manifest.
+        self.own_variables = {}                 # Variables set by the manifest, not inherited.
+        self.glob_dirs = []                     # Directories listed by the files (wildcards or dirs).
         self.init_config(module_args)
         self.module_args = module_args
 
@@ -160,6 +163,8 @@ class Module(object):
                 filepath + "\nOmitting.")
             return []
         filepath = path_mod.rel2abs(filepath, self.path)
+        if any(c in filepath for c in '*?['):
+            self.glob_dirs.append(os.path.dirname(filepath))
         files = glob(filepath)
         if not files:
             raise Exception(
@@ -219,6 +224,7 @@ class Module(object):
                                                       depends=depends))
             elif os.path.isdir(path):
                 # If a path is a dir, add all the files of that dir.
+                self.glob_dirs.append(path)
                 dir_ = os.listdir(path)
                 for f_dir in dir_:
                     f_dir = os.path.join(self.path, path, f_dir)
@@ -378,6 +384,7 @@ class Module(object):
         assert self.path is not None
 
         filename = self._search_for_manifest()
+        self.manifest_file = filename
         logging.debug("Parse manifest in: %s", filename)
 
         logging.debug("""
@@ -404,6 +411,9 @@ PARSE MANIFEST START: %s
             raise Exception(
                 "Error while parsing {0}:\n{1}: {2}.".format(
                     self.path, type(name_error), name_error))
+        self.own_variables = dict(
+            (key, val) for key, val in self.manifest_dict.items()
+            if key not in extra_context or extra_context[key] != val)
 
         # Process the parsed manifest_dict to assign the module properties
         # Also create the SourceFileSet
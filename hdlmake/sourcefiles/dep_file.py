@@ -171,6 +171,16 @@ class DepFile(File):
         self.included_files = set()
         self.dep_level = None
 
+    def clear_dependencies(self):
+        """Forget the relations and the dependencies found by a previous
+        parse, so that the file can be parsed again"""
+        self.provides = set()
+        self.requires = set()
+        self.depends_on = set()
+        self.top_depends_on = set()
+        self.included_files = set()
+        self.dep_level = None
+
     def satisfies(self, rel_b):
         """Check if any of the file object relations match any of the relations
         listed in the parameter (rel_b)"""
@@ -27,8 +27,9 @@ from __future__ import print_function
 from __future__ import absolute_import
 import logging
 
-from ..sourcefiles.dep_file import DepFile, DepRelation
+from ..sourcefiles.dep_file import DepFile, DepRelation, ManualFile
 from .systemlibs import all_system_libs
+from ..util import path as path_mod
 
 
 class DepParser(object):
@@ -79,9 +80,92 @@ class AllRelations(object):
     def find_provider(self, rel):
         return self.rels.get(rel)
 
+    def remove_file(self, file):
+        """Unlink :param file: from the relations of the graph.  Return the
+        relations that were provided by the file"""
+        provided = []
+        for rel in file.provides:
+            if rel.provided_by is file:
+                rel.provided_by = None
+                provided.append(rel)
+        for rel in file.requires:
+            rel.required_by.discard(file)
+        return provided
 
-def parse_source_files(graph, fileset):
-    """Parse source files to extract the graph dependencies"""
+
+class _RecordingRelations(object):
+    """Proxy of AllRelations used by ParseCache: forward the calls of a
+    parser to the graph and record them, so that they can be replayed"""
+
+    def __init__(self, graph):
+        self.graph = graph
+        self.calls = []
+
+    def _record(self, method, rel):
+        self.calls.append((method, rel.obj_name, rel.lib_name, rel.rel_type))
+
+    def add_require(self, file, rel):
+        self._record('add_require', rel)
+        self.graph.add_require(file, rel)
+
+    def add_provide(self, file, rel):
+        self._record('add_provide', rel)
+        self.graph.add_provide(file, rel)
+
+    def find_provider(self, rel):
+        return self.graph.find_provider(rel)
+
+
+class ParseCache(object):
+    """Cache of the relations found by the parsers.  A file is parsed
+    again only when it, or one of the files it includes, has changed
+    (according to their modification time and size)"""
+
+    def __init__(self):
+        # Dict of file key to (stamps, calls, included_files)
+        self.entries = {}
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def _key(dep_file):
+        return (dep_file.path, dep_file.library,
+                tuple(getattr(dep_file, 'include_dirs', [])))
+
+    def parse(self, dep_file, graph):
+        """Add the relations of :param dep_file: to :param graph:, parsing
+        the file only if needed"""
+        if isinstance(dep_file, ManualFile):
+            # Nothing to save, relations come from the manifest.
+            dep_file.parse(graph)
+            return
+        key = self._key(dep_file)
+        entry = self.entries.get(key)
+        if entry is not None:
+            stamps, calls, included_files = entry
+            if all(path_mod.file_stamp(p) == s for p, s in stamps):
+                self.hits += 1
+                for method, obj_name, lib_name, rel_type in calls:
+                    getattr(graph, method)(
+                        dep_file, DepRelation(obj_name, lib_name, rel_type))
+                dep_file.included_files = set(included_files)
+                return
+        self.misses += 1
+        # Stamp before parsing, so that a change during the parse is not lost.
+        stamp = path_mod.file_stamp(dep_file.path)
+        recorder = _RecordingRelations(graph)
+        dep_file.parse(recorder)
+        stamps = [(dep_file.path, stamp)]
+        stamps.extend((p, path_mod.file_stamp(p))
+                      for p in dep_file.included_files)
+        self.entries[key] = (stamps, recorder.calls,
+                             set(dep_file.included_files))
+
+
+def parse_source_files(graph, fileset, parse_cache=None):
+    """Parse source files to extract the graph dependencies.
+    If :param parse_cache: is given, it is used to avoid parsing again
+    the files that haven't changed"""
     from .sourcefileset import SourceFileSet
     assert isinstance(fileset, SourceFileSet)
 
@@ -91,7 +175,12 @@ def parse_source_files(graph, fileset):
     for investigated_file in fileset:
         assert isinstance(investigated_file, DepFile)
         logging.debug("PARSING SOURCE FILE: %s", investigated_file)
-        investigated_file.parse(graph)
+        # The file may have been parsed for a previous graph.
+        investigated_file.clear_dependencies()
+        if parse_cache is None:
+            investigated_file.parse(graph)
+        else:
+            parse_cache.parse(investigated_file, graph)
         if logging.root.level >= logging.DEBUG:
             for r in investigated_file.provides:
                 logging.debug("PROVIDE %s", r)
@@ -99,8 +188,15 @@ def parse_source_files(graph, fileset):
                 logging.debug("REQUIRE %s", r)
     logging.debug("PARSE SOURCE END: now the parsing is done")
 
-    # Compute file dependencies
-    for investigated_file in fileset:
+    _compute_file_dependencies(fileset)
+
+
+def _compute_file_dependencies(files):
+    """Compute the file dependencies of :param files: from the relations
+    they require"""
+    for investigated_file in files:
+        investigated_file.depends_on = set()
+        investigated_file.top_depends_on = set()
         for rel in investigated_file.requires:
             if rel.provided_by is None:
                 continue
@@ -116,6 +212,38 @@ def parse_source_files(graph, fileset):
                 investigated_file.depends_on.add(rel.provided_by)
 
 
+def update_source_files(graph, fileset, changed, parse_cache=None):
+    """Parse again the :param changed: files of :param fileset: (already
+    parsed to build :param graph:) and update the dependencies of the
+    affected files, instead of parsing the whole fileset"""
+    touched_rels = set()
+    for investigated_file in changed:
+        touched_rels.update(graph.remove_file(investigated_file))
+        investigated_file.clear_dependencies()
+    for investigated_file in changed:
+        logging.debug("PARSING AGAIN SOURCE FILE: %s", investigated_file)
+        if parse_cache is None:
+            investigated_file.parse(graph)
+        else:
+            parse_cache.parse(investigated_file, graph)
+        touched_rels.update(investigated_file.provides)
+    for rel in touched_rels:
+        if rel.provided_by is None:
+            # Maybe provided by another file (which was discarded).
+            for other in fileset:
+                if rel in other.provides:
+                    rel.provided_by = other
+                    break
+    # Files requiring a relation whose provider may have changed.
+    affected = set(changed)
+    for rel in touched_rels:
+        affected.update(rel.required_by)
+    _compute_file_dependencies(affected)
+    # Levels depend on the whole chain of dependencies.
+    for investigated_file in fileset:
+        investigated_file.dep_level = None
+
+
 def check_graph(graph, fileset, syslibs, standard_libs=None):
     """Check that each dependency of :param fileset: can be solved once or by
        a module from :param syslibs: or :param standard_libs:"""
@@ -191,31 +319,69 @@ def make_dependency_sorted_list(fileset):
     return fset
 
 
-def make_dependency_set(graph, fileset, top_library, top_entity, extra_modules=None):
-    """Create the set of all files required to build the named
-     top_level_entity."""
-    from ..sourcefiles.sourcefileset import SourceFileSet
-    from ..sourcefiles.dep_file import DepRelation
-    assert isinstance(fileset, SourceFileSet)
+def make_dependency_levels(fileset):
+    """Group the files by dependency level: the length of the longest chain
+    of dependencies below the file.  A file only depends on files of the
+    previous levels, so the files of a level can be compiled in parallel.
+    Return the list of the levels, each one a list of files"""
+    levels = []
+    for dep_file in make_dependency_sorted_list(fileset):
+        # Negative for a circular dependency
+        level = max(dep_file.get_dep_level(), 0)
+        while len(levels) <= level:
+            levels.append([])
+        levels[level].append(dep_file)
+    return [level for level in levels if level]
 
-    # Find top file
+
+def make_dependency_groups(fileset, key):
+    """Group the files by :param key: (a function of a file returning None
+    for the files to skip).  A group is split where it depends on another
+    group, so that the groups can be compiled one after the other.  Return
+    the list of the groups in dependency order, each one a tuple
+    (level, key, files)"""
+    num = {}
+    groups = {}
+    order = []
+    for dep_file in make_dependency_sorted_list(fileset):
+        group_key = key(dep_file)
+        if group_key is None:
+            continue
+        level = 0
+        for dep in dep_file.depends_on:
+            if dep is not dep_file and dep in num:
+                same = key(dep) == group_key
+                level = max(level, num[dep] + (0 if same else 1))
+        num[dep_file] = level
+        if (level, group_key) not in groups:
+            groups[(level, group_key)] = []
+            order.append((level, group_key))
+        groups[(level, group_key)].append(dep_file)
+    return [(level, group_key, groups[(level, group_key)])
+            for level, group_key in sorted(order, key=lambda k: k[0])]
+
+
+def _find_top_file(graph, top_library, top_entity):
+    """Return the file providing the top entity, or None"""
     rel = DepRelation(top_entity, top_library, DepRelation.MODULE)
     rel = graph.find_provider(rel)
-    if rel is None:
+    if rel is None or rel.provided_by is None:
         if top_library == '?':
             logging.warning(
                 'Experimental: Postpone finding top library, since top library is ?: '
                 'Top module: "%s.%s". Continuing with the full file set.',
                 top_library, top_entity)
-            return fileset
+            return None
         logging.critical(
             'Could not find a top level file that provides the '
             '"%s.%s" top module. Continuing with the full file set.',
             top_library, top_entity)
-        return fileset
-    top_file = rel.provided_by
+        return None
+    return rel.provided_by
 
-    # Add extra modules
+
+def _find_extra_files(graph, top_library, extra_modules):
+    """Return the files providing the extra modules"""
     extra_files = []
     if extra_modules is not None:
         for name in extra_modules:
@@ -227,12 +393,14 @@ def make_dependency_set(graph, fileset, top_library, top_entity, extra_modules=N
             else:
                 if rel.provided_by is not None:
                     extra_files.append(rel.provided_by)
+    return extra_files
 
-    # Collect only the files that the top level entity is dependant on, by
-    # walking the dependancy tree.
+
+def make_dependency_closure(files):
+    """Create the set of :param files: and of all the files they depend on"""
+    from ..sourcefiles.sourcefileset import SourceFileSet
     dep_file_set = SourceFileSet()
-    file_set = set(extra_files)
-    file_set.add(top_file)
+    file_set = set(files)
     while len(file_set) > 0:
         chk_file = file_set.pop()
         if chk_file not in dep_file_set:
@@ -241,6 +409,67 @@ def make_dependency_set(graph, fileset, top_library, top_entity, extra_modules=N
                 file_set.add(f)
             for f in chk_file.top_depends_on:
                 file_set.add(f)
+    return dep_file_set
+
+
+def make_reverse_dependency_set(fileset, files):
+    """Create the set of :param files: and of all the files of
+    :param fileset: that depend on them, directly or not"""
+    users = {}
+    for dep_file in fileset:
+        for dep in dep_file.depends_on | dep_file.top_depends_on:
+            users.setdefault(dep, []).append(dep_file)
+    res = set()
+    file_set = set(files)
+    while len(file_set) > 0:
+        chk_file = file_set.pop()
+        if chk_file not in res:
+            res.add(chk_file)
+            file_set.update(users.get(chk_file, []))
+    return res
+
+
+def find_root_files(fileset):
+    """Return the list of (file, entity names) of the entities or modules
+    of :param fileset: that no other unit requires: the candidate tops.
+    An architecture does not use the entity it belongs to"""
+    used = set()
+    for dep_file in fileset:
+        archs = set(rel.obj_name for rel in dep_file.provides
+                    if rel.rel_type == DepRelation.ARCHITECTURE)
+        for rel in dep_file.requires:
+            if (rel.rel_type == DepRelation.ENTITY
+                    and rel.provided_by not in (None, dep_file)
+                    and rel.obj_name not in archs):
+                used.add((rel.provided_by, rel.obj_name))
+    res = []
+    for dep_file in fileset:
+        names = sorted(rel.obj_name for rel in dep_file.provides
+                       if rel.rel_type == DepRelation.ENTITY
+                       and rel.provided_by is dep_file
+                       and (dep_file, rel.obj_name) not in used)
+        if names:
+            res.append((dep_file, names))
+    return res
+
+
+def make_dependency_set(graph, fileset, top_library, top_entity, extra_modules=None):
+    """Create the set of all files required to build the named
+     top_level_entity."""
+    from ..sourcefiles.sourcefileset import SourceFileSet
+    assert isinstance(fileset, SourceFileSet)
+
+    # Find top file
+    top_file = _find_top_file(graph, top_library, top_entity)
+    if top_file is None:
+        return fileset
+
+    # Add extra modules
+    extra_files = _find_extra_files(graph, top_library, extra_modules)
+
+    # Collect only the files that the top level entity is dependant on, by
+    # walking the dependancy tree.
+    dep_file_set = make_dependency_closure([top_file] + extra_files)
 
     hierarchy_drivers = [top_entity]
     if extra_modules is not None:
@@ -248,3 +477,119 @@ def make_dependency_set(graph, fileset, top_library, top_entity, extra_modules=N
     logging.info("Found %d files as dependencies of %s.",
                  len(dep_file_set), ", ".join(hierarchy_drivers))
     return dep_file_set
+
+
+def _strongly_connected_components(succ):
+    """Tarjan's algorithm (without recursion) on the graph whose successors
+    of node i are succ[i].  A component is returned after all of the
+    components it can reach"""
+    num = len(succ)
+    index = [None] * num
+    low = [0] * num
+    on_stack = [False] * num
+    stack = []
+    comps = []
+    counter = 0
+    for root in range(num):
+        if index[root] is not None:
+            continue
+        work = [(root, 0)]
+        while work:
+            node, i = work.pop()
+            if i == 0:
+                index[node] = low[node] = counter
+                counter += 1
+                stack.append(node)
+                on_stack[node] = True
+            recurse = False
+            while i < len(succ[node]):
+                nxt = succ[node][i]
+                i += 1
+                if index[nxt] is None:
+                    work.append((node, i))
+                    work.append((nxt, 0))
+                    recurse = True
+                    break
+                elif on_stack[nxt]:
+                    low[node] = min(low[node], index[nxt])
+            if recurse:
+                continue
+            if low[node] == index[node]:
+                comp = []
+                while True:
+                    nxt = stack.pop()
+                    on_stack[nxt] = False
+                    comp.append(nxt)
+                    if nxt == node:
+                        break
+                comps.append(comp)
+            if work:
+                parent = work[-1][0]
+                low[parent] = min(low[parent], low[node])
+    return comps
+
+
+class ReachabilityIndex(object):
+    """Index of the files required by each file of a fileset (following
+    depends_on and top_depends_on).  The sets are integer bitsets, computed
+    once on the strongly connected components of the graph, so that the
+    files required by a top are obtained by a simple union"""
+
+    def __init__(self, fileset):
+        self.files = sorted(fileset, key=lambda f: f.path)
+        self.index = dict((f, i) for i, f in enumerate(self.files))
+        succ = []
+        for dep_file in self.files:
+            deps = set(dep_file.depends_on) | set(dep_file.top_depends_on)
+            succ.append([self.index[d] for d in deps if d in self.index])
+        self.reach = [0] * len(self.files)
+        for comp in _strongly_connected_components(succ):
+            # The components reached by this one are already done.
+            bits = 0
+            for node in comp:
+                bits |= 1 << node
+            for node in comp:
+                for nxt in succ[node]:
+                    bits |= self.reach[nxt]
+            for node in comp:
+                self.reach[node] = bits
+
+    def reachable(self, files):
+        """Return the bitset of the files required by :param files:
+        (including themselves)"""
+        bits = 0
+        for dep_file in files:
+            bits |= self.reach[self.index[dep_file]]
+        return bits
+
+    def to_fileset(self, bits):
+        """Convert a bitset to a fileset"""
+        from ..sourcefiles.sourcefileset import SourceFileSet
+        res = SourceFileSet()
+        while bits:
+            low = bits & -bits
+            res.add(self.files[low.bit_length() - 1])
+            bits ^= low
+        return res
+
+
+def make_dependency_sets(graph, fileset, tops, extra_modules=None):
+    """Create the set of the files required by each top entity of
+    :param tops: (a list of (top_library, top_entity)).  Return a dict
+    indexed by the items of :param tops:"""
+    from ..sourcefiles.sourcefileset import SourceFileSet
+    assert isinstance(fileset, SourceFileSet)
+    index = ReachabilityIndex(fileset)
+    res = {}
+    for top_library, top_entity in tops:
+        top_file = _find_top_file(graph, top_library, top_entity)
+        if top_file is None:
+            res[(top_library, top_entity)] = fileset
+            continue
+        extra_files = _find_extra_files(graph, top_library, extra_modules)
+        dep_file_set = index.to_fileset(
+            index.reachable([top_file] + extra_files))
+        logging.info("Found %d files as dependencies of %s.",
+                     len(dep_file_set), top_entity)
+        res[(top_library, top_entity)] = dep_file_set
+    return res
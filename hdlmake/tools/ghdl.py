@@ -47,10 +47,26 @@ class ToolGHDL(MakefileSim):
     CLEAN_TARGETS = {'clean': ["*.cf", "*.o", "$(TOP_MODULE)", "work"],
                      'mrproper': ["*.vcd"]}
 
+    # The index of a library (.cf file) is rewritten by each analysis.
+    COMPILE_LIBRARY_LOCK = True
+
+    MODULE_OPTIONS = {'vhdl': 'ghdl_opt'}
+
+    SIM_TOPS = True
+
     SIMULATOR_CONTROLS = {'vlog': None,
                           'vhdl': '$(GHDL) -a --work={work} $(GHDL_OPT) $<',
                           'compiler': '$(GHDL) -e $(GHDL_OPT) $(TOP_LIBRARY).$(TOP_MODULE)'}
 
+    VERSION_COMMAND = ["ghdl", "--version"]
+
+    # The compile scripts provided with GHDL.
+    VENDOR_LIBS_COMMANDS = {
+        'xilinx': '{sim_path}/../lib/ghdl/vendors/compile-xilinx-vivado.sh '
+                  '--all --output {dir}',
+        'altera': '{sim_path}/../lib/ghdl/vendors/compile-intel.sh '
+                  '--all --output {dir}'}
+
     def __init__(self):
         super(ToolGHDL, self).__init__()
 
@@ -58,13 +74,14 @@ class ToolGHDL(MakefileSim):
         """Print the GHDL options to the Makefile"""
         self.writeln("GHDL := ghdl")
         ghdl_opt = self.manifest_dict.get("ghdl_opt", '')
+        for _, entry in sorted(self.get_mapped_vendor_libs().items()):
+            ghdl_opt = "{} -P{}".format(ghdl_opt, entry).lstrip()
         self.writeln("GHDL_OPT := {ghdl_opt}\n".format(ghdl_opt=ghdl_opt))
 
     def _makefile_sim_compilation(self):
         """Print the GDHL simulation compilation target"""
         libs = self.get_all_libs()
         self._makefile_sim_libs_variables(libs)
-        self.writeln("simulation: $(VERILOG_OBJ) $(VHDL_OBJ)")
-        self.writeln("\t\t" + self.SIMULATOR_CONTROLS['compiler'])
-        self.writeln('\n')
+        self._makefile_sim_elaboration()
+        self.writeln()
         self._makefile_sim_dep_files()
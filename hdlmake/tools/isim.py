@@ -58,6 +58,11 @@ class ToolISim(MakefileSim):
                                "isim_proj.*"],
                      'mrproper': ["*.vcd"]}
 
+    # The compilers update the library index.
+    COMPILE_LIBRARY_LOCK = True
+
+    MODULE_OPTIONS = {'vlog': 'vlog_opt', 'vhdl': 'vcom_opt'}
+
     def __init__(self):
         super(ToolISim, self).__init__()
 
@@ -126,10 +131,12 @@ class ToolISim(MakefileSim):
                 res += ' -i '
                 res += ' '.join(srcfile.include_dirs)
             res += " $<"
-            return res
+            return self.add_module_options(srcfile, 'vlog', res)
         elif isinstance(srcfile, VHDLFile):
-            return "vhpcomp $(VHPCOMP_FLAGS) -work {lib}=.{slash}{lib} $< ".format(
-                lib=srcfile.library, slash=shell.makefile_slash_char())
+            return self.add_module_options(
+                srcfile, 'vhdl',
+                "vhpcomp $(VHPCOMP_FLAGS) -work {lib}=.{slash}{lib} $< ".format(
+                    lib=srcfile.library, slash=shell.makefile_slash_char()))
         else:
             return None
 
@@ -2,60 +2,60 @@
 
 
 import logging
+import importlib
+
+# Registries of the supported tools.  The value is the module (relative to
+# this package) and the class implementing the tool, so that only the
+# selected tool is imported.
+SYN_TOOLS = {'ise': ('ise', 'ToolISE'),
+             'planahead': ('planahead', 'ToolPlanAhead'),
+             'vivado': ('vivado', 'ToolVivado'),
+             'vivado_np': ('vivado_np', 'ToolVivadoNP'),
+             'quartus': ('quartus', 'ToolQuartus'),
+             'diamond': ('diamond', 'ToolDiamond'),
+             'libero': ('libero', 'ToolLibero'),
+             'liberosoc': ('liberosoc', 'ToolLiberoSoC'),
+             'icestorm': ('icestorm', 'ToolIcestorm'),
+             'ghdl': ('ghdl_syn', 'GhdlSyn'),
+             'gowin': ('gowin', 'ToolGowin')}
+
+SIM_TOOLS = {'iverilog': ('iverilog', 'ToolIVerilog'),
+             'isim': ('isim', 'ToolISim'),
+             'modelsim': ('modelsim', 'ToolModelsim'),
+             'active_hdl': ('active_hdl', 'ToolActiveHDL'),
+             'riviera': ('riviera', 'ToolRiviera'),
+             'ghdl': ('ghdl', 'ToolGHDL'),
+             'nvc': ('nvc', 'ToolNVC'),
+             'vivado_sim': ('vivado_sim', 'ToolVivadoSim'),
+             'verilator': ('verilator', 'ToolVerilator'),
+             'qrun': ('qrun', 'ToolQrun')}
+
+
+def _import_tool(entry):
+    """Import the tool described by a registry :param entry: and return
+    its class"""
+    module_name, class_name = entry
+    module = importlib.import_module('.' + module_name, __package__)
+    return getattr(module, class_name)
+
 
 def load_syn_tool(tool_name):
     """Funtion that checks the provided module_pool and generate an
     initialized instance of the the appropriated synthesis tool"""
-    from .ise import ToolISE
-    from .planahead import ToolPlanAhead
-    from .vivado import ToolVivado
-    from .quartus import ToolQuartus
-    from .diamond import ToolDiamond
-    from .libero import ToolLibero
-    from .liberosoc import ToolLiberoSoC
-    from .icestorm import ToolIcestorm
-    from .ghdl_syn import GhdlSyn
-    from .gowin import ToolGowin
-    available_tools = {'ise': ToolISE,
-                       'planahead':  ToolPlanAhead,
-                       'vivado': ToolVivado,
-                       'quartus': ToolQuartus,
-                       'diamond': ToolDiamond,
-                       'libero': ToolLibero,
-                       'liberosoc': ToolLiberoSoC,
-                       'icestorm': ToolIcestorm,
-                       'ghdl': GhdlSyn,
-                       'gowin': ToolGowin}
-    if tool_name in available_tools:
+    if tool_name in SYN_TOOLS:
         logging.debug("Synthesis tool to be used found: %s", tool_name)
-        return available_tools[tool_name]()
+        return _import_tool(SYN_TOOLS[tool_name])()
     else:
         raise Exception("Unknown synthesis tool: " + tool_name
-                        + ", supported synthesis tools are: {}".format(', '.join(available_tools.keys())))
+                        + ", supported synthesis tools are: {}".format(', '.join(SYN_TOOLS.keys())))
 
 
 def load_sim_tool(tool_name):
     """Funtion that checks the provided module_pool and generate an
     initialized instance of the the appropriated simulation tool"""
-    from .iverilog import ToolIVerilog
-    from .isim import ToolISim
-    from .modelsim import ToolModelsim
-    from .active_hdl import ToolActiveHDL
-    from .riviera import ToolRiviera
-    from .ghdl import ToolGHDL
-    from .nvc import ToolNVC
-    from .vivado_sim import ToolVivadoSim
-    available_tools = {'iverilog': ToolIVerilog,
-                       'isim': ToolISim,
-                       'modelsim':  ToolModelsim,
-                       'active_hdl': ToolActiveHDL,
-                       'riviera':  ToolRiviera,
-                       'ghdl': ToolGHDL,
-                       'nvc': ToolNVC,
-                       'vivado_sim': ToolVivadoSim}
-    if tool_name in available_tools:
+    if tool_name in SIM_TOOLS:
         logging.debug("Simulation tool to be used found: %s", tool_name)
-        return available_tools[tool_name]()
+        return _import_tool(SIM_TOOLS[tool_name])()
     else:
         raise Exception("Unknown simulation tool: " + tool_name + '\n'
-                        + "Supported simulation tools are " + ' '.join(available_tools.keys()))
+                        + "Supported simulation tools are " + ' '.join(SIM_TOOLS.keys()))
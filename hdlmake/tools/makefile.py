@@ -88,9 +88,6 @@ class ToolMakefile(object):
 
     def _makefile_open(self):
         """Open the Makefile file and print a header"""
-        if os.path.exists(self._filename):
-            os.remove(self._filename)
-
         self.writeln("########################################")
         self.writeln("#  This file was generated by hdlmake  #")
         self.writeln("#  http://ohwr.org/projects/hdl-make/  #")
@@ -174,6 +171,13 @@ class ToolMakefile(object):
         self.writeln(tmp)
 
     def makefile_open_write_close(self):
+        # Do not touch an up-to-date Makefile, as make would consider
+        # that the targets depending on it are out of date.
+        if os.path.exists(self._filename):
+            with open(self._filename, "r") as mf:
+                if mf.read() == self._filestring:
+                    logging.debug("%s is up to date", self._filename)
+                    return
         with open(self._filename, "w") as mf:
             mf.write(self._filestring)
         self._file = None
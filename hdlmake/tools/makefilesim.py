@@ -2,12 +2,38 @@
 
 from __future__ import absolute_import
 import os
+import re
+import hashlib
+import logging
 
 from .makefile import ToolMakefile
 from ..util import shell
-from ..sourcefiles.srcfile import VerilogFile, VHDLFile
+from ..sourcefiles.srcfile import VerilogFile, VHDLFile, SVFile
+from ..sourcefiles.new_dep_solver import (make_dependency_sorted_list,
+                                          make_dependency_levels)
 from ..util import path as path_mod
 
+# Commands printing the version of the vendor tools whose simulation
+# libraries are compiled by the 'vendor-libs' command.  The output is
+# saved in VENDOR_VERSION_FILE, in the directory of the libraries.
+VENDOR_VERSION_FILE = "hdlmake-vendor-version"
+VENDOR_VERSION_COMMANDS = {'xilinx': ["vivado", "-version"],
+                           'altera': ["quartus_sh", "--version"]}
+
+
+def _get_command_output(cmd):
+    """Return the output of :param cmd:, or None if it fails"""
+    import subprocess
+    try:
+        proc = subprocess.Popen(cmd, stdout=subprocess.PIPE,
+                                stderr=subprocess.STDOUT)
+        output = proc.communicate()[0]
+    except OSError:
+        return None
+    if proc.returncode != 0:
+        return None
+    return output.decode('utf-8', 'replace').strip()
+
 def _check_simulation_manifest(top_manifest):
     """Check if the simulation keys are provided by the top manifest"""
     if top_manifest.manifest_dict.get("sim_top") is None:
@@ -21,11 +47,60 @@ class MakefileSim(ToolMakefile):
 
     SIMULATOR_CONTROLS = {}
 
+    # True if two files of the same library cannot be compiled at the same
+    # time: they are then compiled one after the other, also with make -j.
+    COMPILE_LIBRARY_LOCK = False
+
+    # True if the tool can compile the files by batches (sim_batch_compile).
+    BATCH_COMPILE = False
+
+    # Manifest variables a module can set for the compilation of its own
+    # files ('vhdl' and 'vlog' keys), added to the options of the top.
+    MODULE_OPTIONS = {}
+
+    # True if the tool can elaborate the tops of sim_tops.
+    SIM_TOPS = False
+
+    # True if the tool can save and restore a checkpoint of the simulation
+    # (sim_checkpoint).
+    SIM_CHECKPOINT = False
+
+    # True if the tool can take the compiled libraries from the cache of
+    # sim_lib_cache_dir.
+    LIB_CACHE = False
+
+    # Command printing the version of the compiler, part of the keys of
+    # the library cache.
+    VERSION_COMMAND = None
+
+    # Shell commands compiling the simulation libraries of a vendor (given
+    # by its system module) into {dir}.  {sim_path} is the directory of the
+    # simulator and {family} the syn_family variable.
+    VENDOR_LIBS_COMMANDS = {}
+
     def __init__(self):
         super(MakefileSim, self).__init__()
+        # Dict of the cacheable libraries to their directory in the cache.
+        self._lib_cache = None
+        # Dict of the cacheable libraries to the list of the sha256 sums
+        # and paths of their files, the inputs of their keys.
+        self._lib_cache_sums = None
+        # Output of VERSION_COMMAND, False if it fails.
+        self._tool_version = None
+        # Dict of the vendors to the directory of their libraries.
+        self._vendor_libs = None
+        # Same, for the libraries already compiled.
+        self._mapped_vendor_libs = None
+        # System modules used by the design (set by the action).
+        self.system_modules = set()
         
     def write_makefile(self, top_manifest, fileset, filename=None):
         """Execute the simulation action"""
+        self._lib_cache = None
+        self._lib_cache_sums = None
+        self._tool_version = None
+        self._vendor_libs = None
+        self._mapped_vendor_libs = None
         _check_simulation_manifest(top_manifest)
         self.makefile_setup(top_manifest, fileset, filename=filename)
         self.makefile_check_tool('sim_path')
@@ -35,6 +110,8 @@ class MakefileSim(ToolMakefile):
         self._makefile_sim_local()
         self._makefile_sim_sources()
         self._makefile_sim_compilation()
+        self._makefile_sim_tops()
+        self._makefile_sim_checkpoint()
         self._makefile_sim_command()
         self._makefile_sim_clean()
         self._makefile_sim_phony()
@@ -64,6 +141,98 @@ class MakefileSim(ToolMakefile):
     def get_stamp_library(self, lib):
         return lib + shell.makefile_slash_char() + "." + lib
 
+    def get_stamp_elaboration(self):
+        """Stamp file for the elaboration of the top module"""
+        return shell.makefile_slash_char().join(
+            ["$(TOP_LIBRARY)", ".$(TOP_MODULE)_elab"])
+
+    def _makefile_sim_elaboration(self):
+        """Print the simulation target.  The design is elaborated again only
+        if a file has been compiled since the last elaboration"""
+        stamp = self.get_stamp_elaboration()
+        self.writeln("simulation: " + stamp)
+        self.writeln()
+        self.writeln(stamp + ": $(VERILOG_OBJ) $(VHDL_OBJ)")
+        self.writeln("\t\t" + self.SIMULATOR_CONTROLS['compiler'])
+        self._makefile_touch_stamp_file()
+
+    def get_sim_tops(self):
+        """Return the (target, library, module) of each top of sim_tops.
+        The target is named after the module, and its library if two tops
+        have the same module"""
+        tops = []
+        for top in self.manifest_dict.get("sim_tops") or []:
+            library, module = top.split('.', 1)
+            if library == '?':
+                library = next((f.library for f in self.fileset
+                                if f.purename == module), self.default_library)
+            tops.append((library, module))
+        modules = [module for _, module in tops]
+        res = []
+        for library, module in tops:
+            if modules.count(module) > 1:
+                target = "sim_{}_{}".format(library, module)
+            else:
+                target = "sim_" + module
+            res.append((target, library, module))
+        return res
+
+    def _makefile_sim_tops(self):
+        """Print a target for each top of sim_tops, sharing the compilation
+        of the design, and the sim_tops target doing all of them"""
+        tops = self.get_sim_tops()
+        if not tops:
+            return
+        if not self.SIM_TOPS:
+            logging.warning("'sim_tops' is ignored for '%s' tool",
+                            self.TOOL_INFO['name'])
+            return
+        for target, library, module in tops:
+            self._makefile_sim_top_target(target, library, module)
+        self.writeln("sim_tops: " + " ".join(t[0] for t in tops))
+        self.writeln()
+
+    def _makefile_sim_top_variables(self, target, library, module):
+        """Set the top of the commands of :param target:"""
+        self.writeln("{}: TOP_LIBRARY := {}".format(target, library))
+        self.writeln("{}: TOP_MODULE := {}".format(target, module))
+
+    def _makefile_sim_top_target(self, target, library, module):
+        """Print the target elaborating a top of sim_tops.  As for the
+        simulation target, it is elaborated again only if a file has been
+        compiled since the last elaboration"""
+        stamp = self.get_stamp_elaboration().replace(
+            "$(TOP_LIBRARY)", library).replace("$(TOP_MODULE)", module)
+        self.writeln("{}: {}".format(target, stamp))
+        if (library, module) == (self.get_top_library(),
+                                 self.get_top_module()):
+            # Elaborated by the rule of the simulation target.
+            self.writeln()
+            return
+        self._makefile_sim_top_variables(stamp, library, module)
+        self.writeln(stamp + ": $(VERILOG_OBJ) $(VHDL_OBJ)")
+        self.writeln("\t\t" + self.SIMULATOR_CONTROLS['compiler'])
+        self._makefile_touch_stamp_file()
+
+    def get_sim_checkpoint(self):
+        """Return the simulator commands run before saving the checkpoint,
+        or None if there is no checkpoint.  A time is run"""
+        checkpoint = self.manifest_dict.get("sim_checkpoint")
+        if not checkpoint:
+            return None
+        if not self.SIM_CHECKPOINT:
+            logging.warning("'sim_checkpoint' is ignored for '%s' tool",
+                            self.TOOL_INFO['name'])
+            return None
+        if re.match(r"^\d+(\.\d+)?\s*[munpf]?s$", checkpoint.strip()):
+            return "run " + checkpoint.strip()
+        return checkpoint
+
+    def _makefile_sim_checkpoint(self):
+        """Warn if sim_checkpoint is set, the checkpoint and restore
+        targets being written by the tools supporting them"""
+        self.get_sim_checkpoint()
+
     def _makefile_touch_stamp_file(self):
         self.write("\t\t@" + shell.mkdir_command() + " $(dir $@)")
         self.writeln(" && " + shell.touch_command()  + " $@\n")
@@ -120,22 +289,464 @@ class MakefileSim(ToolMakefile):
         cmd = self.SIMULATOR_CONTROLS.get(key)
         if cmd is None:
             return None
-        return cmd.format(work=srcfile.library)
+        return self.add_module_options(srcfile, key,
+                                       cmd.format(work=srcfile.library))
+
+    def get_compile_command(self, srcfile):
+        """Return the command compiling :param srcfile:, or None if the file
+        is not compiled by the tool"""
+        return self._makefile_sim_compile_file(srcfile)
+
+    def is_compiled(self, srcfile):
+        """Return True if :param srcfile: is compiled by the tool"""
+        return self.get_compile_command(srcfile) is not None
+
+    def get_module_options(self, srcfile, key):
+        """Return the options set by the manifest of the module of
+        :param srcfile: for its compilation (:param key: is 'vhdl' or
+        'vlog').  The options of the top manifest are global"""
+        name = self.MODULE_OPTIONS.get(key)
+        module = srcfile.module
+        if name is None or module is None or module.parent is None:
+            return ''
+        return module.own_variables.get(name) or ''
+
+    def add_module_options(self, srcfile, key, cmd):
+        """Return :param cmd: with the module options of :param srcfile:
+        before the source file"""
+        options = self.get_module_options(srcfile, key)
+        if not options:
+            return cmd
+        return cmd.replace("$<", options + " $<")
 
     def _makefile_sim_dep_files(self):
         """Print dummy targets to handle file dependencies"""
+        if self.manifest_dict.get("sim_batch_compile"):
+            if self.BATCH_COMPILE:
+                self._makefile_sim_batches()
+                self._makefile_sim_lib_cache()
+                return
+            logging.warning("'sim_batch_compile' is ignored for '%s' tool",
+                            self.TOOL_INFO['name'])
+        cached = self.get_cached_libs()
         for file_aux in self.fileset.sort():
+            if file_aux.library in cached:
+                continue
             cmd = self._makefile_sim_compile_file(file_aux)
             if cmd is not None:
                 self._makefile_sim_file_rule(file_aux)
                 self.writeln("\t\t" + cmd)
                 self._makefile_touch_stamp_file()
                 self.writeln()
+        self._makefile_sim_library_order()
+        self._makefile_sim_lib_cache()
+
+    def get_library_order(self):
+        """Return the dict of the file compiled before each file of the
+        same library, if the files of a library cannot be compiled at the
+        same time.  The files are in dependency order"""
+        res = {}
+        if not self.COMPILE_LIBRARY_LOCK:
+            return res
+        last = {}
+        for file_aux in make_dependency_sorted_list(self.fileset):
+            if self._makefile_sim_compile_file(file_aux) is None:
+                continue
+            if file_aux.library in last:
+                res[file_aux] = last[file_aux.library]
+            last[file_aux.library] = file_aux
+        return res
+
+    def _makefile_sim_library_order(self):
+        """Print the order-only prerequisites chaining the files of each
+        library, so that make -j doesn't compile them at the same time"""
+        order = self.get_library_order()
+        if not order:
+            return
+        # Already a prerequisite of the stamp file.
+        files = [f for f in make_dependency_sorted_list(order)
+                 if order[f] not in f.depends_on]
+        if not files:
+            return
+        self.writeln("# The files of a library are compiled one at a time.")
+        for file_aux in files:
+            self.writeln("{}: | {}".format(self.get_stamp_file(file_aux),
+                                           self.get_stamp_file(order[file_aux])))
+        self.writeln()
+
+    def get_stamp_batch(self, lib, name):
+        """Stamp file for the batch :param name: of :param lib:"""
+        return shell.makefile_slash_char().join([lib, "." + name])
+
+    def get_compile_batches(self):
+        """Return the batches of files compiled by one command (see
+        sim_batch_compile), in dependency order.  Each batch is a tuple
+        (stamp file, library, command, files).  By default, a batch holds
+        the files of a library and of a dependency level with the same
+        compile command"""
+        batches = []
+        names = set()
+        for num, level in enumerate(make_dependency_levels(self.fileset)):
+            index = {}
+            for file_aux in level:
+                cmd = self._makefile_sim_compile_file(file_aux)
+                if cmd is None:
+                    continue
+                key = (file_aux.library, cmd)
+                if key not in index:
+                    kind = ("sv" if isinstance(file_aux, SVFile) else
+                            "v" if isinstance(file_aux, VerilogFile) else
+                            "vhdl")
+                    stamp = self._get_batch_stamp(
+                        names, file_aux.library, "batch{}_{}".format(num, kind))
+                    index[key] = len(batches)
+                    batches.append((stamp, file_aux.library, cmd, []))
+                batches[index[key]][3].append(file_aux)
+        return batches
+
+    def _get_batch_stamp(self, names, lib, name):
+        """Return the stamp of a new batch of :param lib:, made unique
+        among :param names: (the files of a module may have their own
+        options and so their own batch)"""
+        stamp = self.get_stamp_batch(lib, name)
+        num = 1
+        while stamp in names:
+            num += 1
+            stamp = self.get_stamp_batch(lib, "{}_{}".format(name, num))
+        names.add(stamp)
+        return stamp
+
+    def _makefile_sim_batch_command(self, batch):
+        """Print the command compiling the files of :param batch:"""
+        _, _, cmd, files = batch
+        sources = " \\\n\t\t\t".join(
+            shell.makefile_path(f.rel_path()) for f in files)
+        self.writeln("\t\t" + cmd.replace("$<", sources).rstrip())
+
+    def _makefile_sim_batches(self):
+        """Print the rules compiling the files by batches.  The stamp file
+        of a source depends on the stamp of its batch, which is compiled
+        again if one of its files or of the batches it depends on changes"""
+        cwd = os.getcwd()
+        cached = self.get_cached_libs()
+        batches = [b for b in self.get_compile_batches()
+                   if b[1] not in cached]
+        batch_of = {}
+        for stamp, _, _, files in batches:
+            for file_aux in files:
+                batch_of[file_aux] = stamp
+        self.writeln("BATCH_OBJ := " + " \\\n".join(b[0] for b in batches))
+        setup_targets = self.get_compile_setup_targets()
+        if setup_targets:
+            self.writeln("$(BATCH_OBJ): " + " ".join(setup_targets))
+        self.writeln()
+        last = {}
+        for batch in batches:
+            stamp, library, _, files = batch
+            deps = set()
+            for file_aux in files:
+                deps.update(batch_of[d] for d in file_aux.depends_on
+                            if d in batch_of)
+                deps.update(self.get_stamp_file(d) for d in file_aux.depends_on
+                            if d.library in cached and d in self.fileset)
+                deps.update(path_mod.relpath(inc, cwd)
+                            for inc in file_aux.included_files)
+            deps.discard(stamp)
+            self.writeln("{}: {}".format(stamp, " \\\n".join(
+                [shell.makefile_path(f.rel_path()) for f in files]
+                + sorted(deps))))
+            self._makefile_sim_batch_command(batch)
+            self._makefile_touch_stamp_file()
+            # The batches of a library are compiled one at a time.
+            if (self.COMPILE_LIBRARY_LOCK and library in last
+                    and last[library] not in deps):
+                self.writeln("{}: | {}".format(stamp, last[library]))
+            last[library] = stamp
+            self.writeln(" \\\n".join(self.get_stamp_file(f) for f in files)
+                         + ": " + stamp)
+            self._makefile_touch_stamp_file()
+            self.writeln()
+
+    def get_lib_cache_options(self):
+        """Return the list of the global compile options, part of the keys
+        of the library cache"""
+        return []
+
+    def _get_tool_version(self):
+        """Return the output of VERSION_COMMAND, or None if it fails.  The
+        command is run once per Makefile"""
+        if self.VERSION_COMMAND is None:
+            return None
+        if self._tool_version is None:
+            cmd = list(self.VERSION_COMMAND)
+            if self.manifest_dict.get("sim_path"):
+                cmd[0] = os.path.join(self.manifest_dict["sim_path"], cmd[0])
+            self._tool_version = _get_command_output(cmd) or False
+        return self._tool_version or None
+
+    def _get_vendor_libs_command(self, vendor, directory):
+        """Return the command compiling the libraries of :param vendor:
+        into :param directory:"""
+        family = self.manifest_dict.get("syn_family")
+        template = self.VENDOR_LIBS_COMMANDS[vendor]
+        if "{family}" in template and not family:
+            raise Exception("'syn_family' must be set to compile the "
+                            "simulation libraries of '{}'".format(vendor))
+        return template.format(dir=directory,
+                               sim_path=self.manifest_dict.get("sim_path"),
+                               family=(family or '').lower().replace(' ', ''))
+
+    def get_vendor_libs(self):
+        """Return the dict of the vendors of the system modules of the
+        design to the directory of their compiled simulation libraries in
+        sim_vendor_libs_dir.  The name of the directory is a hash of the
+        vendor, of the simulator, of its version and of the compile
+        command.  The version of the vendor tool is only checked by the
+        'vendor-libs' command (see build_vendor_libs)"""
+        if self._vendor_libs is not None:
+            return self._vendor_libs
+        self._vendor_libs = {}
+        libs_dir = self.manifest_dict.get("sim_vendor_libs_dir")
+        vendors = sorted(v for v in self.system_modules
+                         if v in self.VENDOR_LIBS_COMMANDS)
+        if not libs_dir or not vendors:
+            return self._vendor_libs
+        version = self._get_tool_version()
+        if version is None:
+            logging.warning("Cannot get the version of %s: the vendor "
+                            "libraries are not used", self.TOOL_INFO['name'])
+            return self._vendor_libs
+        for vendor in vendors:
+            digest = hashlib.sha256()
+            for item in [vendor, self.TOOL_INFO['id'], version,
+                         self._get_vendor_libs_command(vendor, '')]:
+                digest.update((item + "\n").encode('utf-8'))
+            self._vendor_libs[vendor] = os.path.join(
+                os.path.expanduser(libs_dir), "{}-{}-{}".format(
+                    vendor, self.TOOL_INFO['id'], digest.hexdigest()[:16]))
+        return self._vendor_libs
+
+    def get_mapped_vendor_libs(self):
+        """Return the dict of the vendors whose libraries are compiled to
+        their directory, to be mapped by the Makefile"""
+        if self._mapped_vendor_libs is not None:
+            return self._mapped_vendor_libs
+        self._mapped_vendor_libs = {}
+        for vendor, entry in self.get_vendor_libs().items():
+            if os.path.isdir(entry):
+                self._mapped_vendor_libs[vendor] = entry
+            else:
+                logging.warning("The simulation libraries of '%s' are not "
+                                "in %s: run 'hdlmake vendor-libs'",
+                                vendor, entry)
+        return self._mapped_vendor_libs
+
+    def build_vendor_libs(self, top_manifest):
+        """Compile the simulation libraries of the vendors of the system
+        modules, unless they are already in sim_vendor_libs_dir for the
+        version of the vendor tool.  A directory without VENDOR_VERSION_FILE
+        was not compiled by hdlmake and is kept"""
+        import subprocess
+        import shutil
+        self.manifest_dict = top_manifest.manifest_dict
+        self._tool_version = None
+        self._vendor_libs = None
+        if not self.manifest_dict.get("sim_vendor_libs_dir"):
+            raise Exception("'sim_vendor_libs_dir' must be set in the top "
+                            "manifest")
+        self.makefile_check_tool('sim_path')
+        if not self.manifest_dict.get("sim_path"):
+            raise Exception("{} cannot be found".format(
+                self.TOOL_INFO['name']))
+        vendor_libs = self.get_vendor_libs()
+        if not vendor_libs:
+            logging.warning("No vendor simulation libraries to compile for "
+                            "%s", self.TOOL_INFO['name'])
+        for vendor, entry in sorted(vendor_libs.items()):
+            vendor_version = _get_command_output(
+                VENDOR_VERSION_COMMANDS[vendor])
+            if vendor_version is None:
+                logging.warning("Cannot get the version of %s: the '%s' "
+                                "libraries are not compiled",
+                                VENDOR_VERSION_COMMANDS[vendor][0], vendor)
+                continue
+            version_file = os.path.join(entry, VENDOR_VERSION_FILE)
+            if os.path.isdir(entry):
+                if not os.path.isfile(version_file):
+                    logging.info("The simulation libraries of '%s' are in "
+                                 "%s", vendor, entry)
+                    continue
+                with open(version_file) as f:
+                    if f.read() == vendor_version:
+                        logging.info("The simulation libraries of '%s' are "
+                                     "in %s", vendor, entry)
+                        continue
+            # Compiled in a temporary directory, renamed once complete.
+            tmp = entry + ".tmp"
+            if os.path.exists(tmp):
+                shutil.rmtree(tmp)
+            os.makedirs(tmp)
+            cmd = self._get_vendor_libs_command(vendor, tmp)
+            logging.info("Compile the simulation libraries of '%s': %s",
+                         vendor, cmd)
+            if subprocess.call(cmd, shell=True) != 0:
+                raise Exception("Failed to compile the simulation libraries "
+                                "of '{}'".format(vendor))
+            with open(os.path.join(tmp, VENDOR_VERSION_FILE), "w") as f:
+                f.write(vendor_version)
+            # The libraries of the previous version of the vendor tool
+            # are replaced.
+            if os.path.isdir(entry):
+                os.rename(entry, entry + ".old")
+                os.rename(tmp, entry)
+                shutil.rmtree(entry + ".old")
+            else:
+                os.rename(tmp, entry)
+            logging.info("The simulation libraries of '%s' are in %s",
+                         vendor, entry)
+
+    def get_lib_cache(self):
+        """Return the dict of the libraries that can be kept in the cache
+        of compiled libraries (sim_lib_cache_dir) to their directory in the
+        cache.  The top library and the libraries depending on a library
+        that cannot be cached are compiled by the project.  The name of the
+        directory is a hash of the library name, of the tool and its
+        version, of the compile options, of the content of the files and
+        of the keys of the libraries it depends on"""
+        if self._lib_cache is not None:
+            return self._lib_cache
+        self._lib_cache = {}
+        self._lib_cache_sums = {}
+        cache_dir = self.manifest_dict.get("sim_lib_cache_dir")
+        if not cache_dir:
+            return self._lib_cache
+        if not self.LIB_CACHE:
+            logging.warning("'sim_lib_cache_dir' is ignored for '%s' tool",
+                            self.TOOL_INFO['name'])
+            return self._lib_cache
+        version = self._get_tool_version()
+        if version is None:
+            logging.warning("Cannot get the version of %s: the library "
+                            "cache is not used", self.TOOL_INFO['name'])
+            return self._lib_cache
+        from ..util.hashindex import hash_file
+        cache_dir = os.path.expanduser(cache_dir)
+        cwd = os.getcwd()
+        files = {}
+        deps = {}
+        for file_aux in self.fileset:
+            if self._makefile_sim_compile_file(file_aux) is None:
+                continue
+            files.setdefault(file_aux.library, []).append(file_aux)
+            deps.setdefault(file_aux.library, set()).update(
+                d.library for d in file_aux.depends_on
+                if d.library != file_aux.library)
+        keys = {}
+        pending = set(files) - set([self.get_top_library()])
+        progress = True
+        while progress:
+            progress = False
+            for lib in sorted(pending):
+                if not deps[lib] & set(files) <= set(keys):
+                    continue
+                digest = hashlib.sha256()
+                items = [lib, self.TOOL_INFO['id'], version]
+                items += self.get_lib_cache_options()
+                sums = []
+                for file_aux in sorted(files[lib],
+                                       key=lambda f: (f.purename, f.path)):
+                    sums.append((hash_file(file_aux.path),
+                                 path_mod.relpath(file_aux.path, cwd)))
+                    incs = sorted((hash_file(inc), path_mod.relpath(inc, cwd))
+                                  for inc in file_aux.included_files)
+                    items += [os.path.basename(file_aux.path), sums[-1][0],
+                              self._makefile_sim_compile_file(file_aux)]
+                    items += [inc[0] for inc in incs]
+                    sums += incs
+                self._lib_cache_sums[lib] = sorted(set(sums),
+                                                   key=lambda s: s[1])
+                items += sorted(keys[dep] for dep in deps[lib] & set(keys))
+                for item in items:
+                    digest.update((item + "\n").encode('utf-8'))
+                keys[lib] = digest.hexdigest()[:32]
+                pending.discard(lib)
+                progress = True
+        for lib in keys:
+            self._lib_cache[lib] = os.path.join(
+                cache_dir, "{}-{}".format(lib, keys[lib]))
+        return self._lib_cache
+
+    def get_cached_libs(self):
+        """Return the set of the libraries found in the library cache,
+        which are not compiled"""
+        return set(lib for lib, entry in self.get_lib_cache().items()
+                   if os.path.isdir(entry))
+
+    def get_lib_cache_marker(self, lib):
+        """Return the file recording where the cacheable :param lib: is
+        mapped.  Its name changes with the key of the library, or when the
+        library is found in the cache, so that the library is created
+        (and mapped) again"""
+        entry = os.path.basename(self.get_lib_cache()[lib])
+        prefix = "cached-" if lib in self.get_cached_libs() else "local-"
+        return self.get_stamp_batch(lib, prefix + entry)
+
+    def _makefile_sim_lib_cache(self):
+        """Print the rules of the library cache.  The stamp files of a
+        cached library only depend on the library (mapped to the cache),
+        and a library missing from the cache is copied into it once all
+        its files are compiled, unless they have changed since the key was
+        computed.  The entries of the cache are read-only"""
+        cached = self.get_cached_libs()
+        stores = []
+        for lib, entry in sorted(self.get_lib_cache().items()):
+            stamps = " \\\n".join(
+                self.get_stamp_file(f) for f in self.fileset.sort()
+                if f.library == lib
+                and self._makefile_sim_compile_file(f) is not None)
+            if lib in cached:
+                self.writeln("{}: {}".format(stamps,
+                                             self.get_stamp_library(lib)))
+                self._makefile_touch_stamp_file()
+                self.writeln()
+                continue
+            # Compiled again when the library is created again.
+            self.writeln("{}: {}".format(stamps, self.get_stamp_library(lib)))
+            self.writeln()
+            store = self.get_stamp_batch(lib, "lib_cache")
+            stores.append(store)
+            self.writeln("{}: {}".format(store, stamps))
+            self.writeln("\t\t@{} {}".format(shell.mkdir_command(),
+                                              os.path.dirname(entry)))
+            # Copied under a temporary name: another project may store the
+            # same library at the same time.  Not stored if the files are
+            # not the ones of the key, which would poison the cache.
+            sums = " ".join("{} {}".format(*s)
+                            for s in self._lib_cache_sums[lib])
+            self.writeln("\t\tif printf '%s  %s\\n' {sums} | sha256sum -c "
+                         "--status; then dir={entry}; {rm} $$dir.$$$$ && "
+                         "{cp} -r {lib} $$dir.$$$$ && (test -d $$dir || "
+                         "(mv $$dir.$$$$ $$dir && chmod -R a-w $$dir)); "
+                         "{rm} $$dir.$$$$; else echo \"The files of {lib} "
+                         "have changed since the Makefile was generated: "
+                         "{lib} is not stored in the cache\"; fi".format(
+                             sums=sums, rm=shell.del_command(),
+                             cp=shell.copy_command(), lib=lib, entry=entry))
+            self._makefile_touch_stamp_file()
+            self.writeln()
+        if stores:
+            self.writeln("simulation: " + " ".join(stores))
+            self.writeln()
 
     def get_all_libs(self):
         """Return a sorted list of all the libraries name"""
         return sorted(set(f.library for f in self.fileset))
 
+    def get_compile_setup_targets(self):
+        """Return the targets to be built before compiling the files one
+        by one (see the 'compile' command)"""
+        return []
+
     def _makefile_sim_libs_variables(self, libs):
         """Create variables for libraries name"""
         self.writeln('LIBS := ' + ' '.join(libs))
@@ -159,4 +770,16 @@ class MakefileSim(ToolMakefile):
     def _makefile_sim_phony(self):
         """Print simulation PHONY target list to the Makefile"""
         self.writeln(
-            ".PHONY: mrproper clean sim_pre_cmd sim_post_cmd simulation")
+            ".PHONY: mrproper clean sim_pre_cmd sim_post_cmd simulation"
+            + self.get_phony_targets())
+
+    def get_phony_targets(self):
+        """Return the optional targets to be added to .PHONY: the ones of
+        sim_tops and of the checkpoint"""
+        res = ""
+        tops = self.get_sim_tops()
+        if tops and self.SIM_TOPS:
+            res += "".join(" " + t[0] for t in tops) + " sim_tops"
+        if self.manifest_dict.get("sim_checkpoint") and self.SIM_CHECKPOINT:
+            res += " checkpoint restore"
+        return res
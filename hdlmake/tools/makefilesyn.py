@@ -16,9 +16,8 @@ def _check_synthesis_manifest(top_manifest):
                 "'{}' variable must be set in the top manifest.".format(v))
     # Tools with multithread support
     if "syn_jobs" in top_manifest.manifest_dict:
-        for v in ["vivado"]:
-            if v != top_manifest.manifest_dict["syn_tool"]:
-                logging.warning("'syn_jobs' is ignored for '{}' tool".format(top_manifest.manifest_dict["syn_tool"]))
+        if top_manifest.manifest_dict["syn_tool"] not in ["vivado", "vivado_np"]:
+            logging.warning("'syn_jobs' is ignored for '{}' tool".format(top_manifest.manifest_dict["syn_tool"]))
 
 
 class MakefileSyn(ToolMakefile):
@@ -44,9 +43,40 @@ class MakefileSyn(ToolMakefile):
 \t\t{4} $@
 """
 
+    """Makefile variables implementing the artifact cache (see
+    syn_cache_dir).  The key is computed by make from the content of the
+    Makefile (tool, options, commands) and of the sources, only if the
+    goals build a cached stage.  The cache is used if all of these stages
+    are in the cache.  An entry is stored in a temporary directory, then
+    renamed."""
+    MAKEFILE_SYN_CACHE = """\
+SYN_CACHE_DIR := {cache_dir}
+SYN_CACHE_FILES := {cache_files}
+SYN_CACHE_GOALS := $(patsubst all,bitstream,$(or $(MAKECMDGOALS),all))
+SYN_CACHE_BUILT := $(strip {built})
+SYN_CACHE_KEY = $(eval SYN_CACHE_KEY := $$(shell sha256sum $(MAKEFILE_LIST) {inputs} | sha256sum | cut -c1-64))$(SYN_CACHE_KEY)
+SYN_CACHE_ENTRY = $(SYN_CACHE_DIR)/$(SYN_CACHE_KEY)
+SYN_CACHE_HIT := $(if $(SYN_CACHE_BUILT),$(notdir $(wildcard {hit_dirs})))
+SYN_CACHE_USE := $(if $(SYN_CACHE_BUILT),$(if $(filter-out $(SYN_CACHE_HIT),$(SYN_CACHE_BUILT)),,yes))
+SYN_CACHE_RESTORE = cp -R $(SYN_CACHE_ENTRY)/$@/. .
+SYN_CACHE_STORE = tmp=$(SYN_CACHE_ENTRY)/.$@.$$$$; \\
+  rm -rf $$tmp && mkdir -p $$tmp && \\
+  for f in $(SYN_CACHE_FILES); do \\
+    if [ -e "$$f" ]; then mkdir -p "$$tmp/`dirname $$f`" && cp -R "$$f" "$$tmp/$$f"; fi; \\
+  done && rm -rf $(SYN_CACHE_ENTRY)/$@ && mv $$tmp $(SYN_CACHE_ENTRY)/$@
+"""
+
+    # Stages whose outputs are stored in the artifact cache.
+    SYN_CACHE_STAGES = ["bitstream", "prom"]
+
+    # Outputs of the tool stored in the cache, in addition to the files
+    # removed by mrproper.
+    SYN_CACHE_FILES = []
+
     def __init__(self):
         super(MakefileSyn, self).__init__()
         self._tcl_controls = {}
+        self._syn_cache = False
 
     def write_makefile(self, top_manifest, fileset, filename=None):
         """Generate a Makefile for the specific synthesis tool"""
@@ -59,6 +89,7 @@ class MakefileSyn(ToolMakefile):
         self._makefile_syn_local()
         self._makefile_syn_files()
         self._makefile_syn_command()
+        self._makefile_syn_cache()
         self._makefile_syn_build()
         self._makefile_syn_clean()
         self._makefile_syn_phony()
@@ -154,24 +185,80 @@ endif""")
         self.writeln("#target for performing local synthesis\n"
                      "all: bitstream\n")
 
+    def _makefile_syn_cache(self):
+        """Write the variables of the artifact cache, if enabled"""
+        cache_dir = self.manifest_dict.get("syn_cache_dir")
+        if not cache_dir:
+            return
+        if shell.check_windows_commands():
+            logging.warning("'syn_cache_dir' requires a POSIX shell, ignored")
+            return
+        stages = [s for s in self.SYN_CACHE_STAGES if s in self._tcl_controls]
+        if not stages:
+            logging.warning("'syn_cache_dir' is ignored for '%s' tool",
+                            self.manifest_dict["syn_tool"])
+            return
+        self._syn_cache = True
+        cache_files = (self.manifest_dict.get("syn_cache_files")
+                       or (self.CLEAN_TARGETS.get("mrproper", [])
+                           + self.SYN_CACHE_FILES))
+        # The included files are not listed as sources.
+        inputs = list(self._all_sources)
+        for srcfile in self.fileset:
+            for inc in sorted(getattr(srcfile, "included_files", ())):
+                inc = os.path.relpath(inc)
+                if inc not in inputs:
+                    inputs.append(inc)
+        # A cached stage is built if it, or a later stage, is a goal.
+        stage_list = ["project", "synthesize", "translate",
+                      "map", "par", "bitstream", "prom"]
+        stage_list = [s for s in stage_list if s in self._tcl_controls]
+        built = ["$(if $(filter {},$(SYN_CACHE_GOALS)),{})".format(
+            ' '.join(stage_list[stage_list.index(s):]), s) for s in stages]
+        self.writeln(self.MAKEFILE_SYN_CACHE.format(
+            cache_dir=cache_dir,
+            cache_files=' '.join(cache_files),
+            built=' '.join(built),
+            inputs=' '.join(shell.makefile_path(f) for f in inputs),
+            hit_dirs=' '.join("$(SYN_CACHE_ENTRY)/" + s for s in stages)))
+
     def _makefile_syn_build(self):
         """Generate the synthesis Makefile targets for handling design build"""
         stage_previous = "files.tcl"
         stage_list = ["project", "synthesize", "translate",
                       "map", "par", "bitstream", "prom"]
-        for stage in stage_list:
-            if stage in self._tcl_controls:
-                echo_command = '\t\techo {0} >> $@'
-                tcl_command = []
-                for command in self._tcl_controls[stage].split('\n'):
-                    tcl_command.append(echo_command.format(command))
-                command_string = "\n".join(tcl_command)
-                deps = " " + " ".join(shell.makefile_path(f) for f in self._all_sources) if stage == "synthesize" else ""
-                self.writeln(self.MAKEFILE_SYN_BUILD_CMD.format(
-                    stage, stage_previous, stage.upper(),
-                    command_string, shell.touch_command(),
-                    deps=deps))
-                stage_previous = stage
+        stage_list = [s for s in stage_list if s in self._tcl_controls]
+        for index, stage in enumerate(stage_list):
+            echo_command = '\t\techo {0} >> $@'
+            tcl_command = []
+            for command in self._tcl_controls[stage].split('\n'):
+                tcl_command.append(echo_command.format(command))
+            command_string = "\n".join(tcl_command)
+            deps = " " + " ".join(shell.makefile_path(f) for f in self._all_sources) if stage == "synthesize" else ""
+            rule = self.MAKEFILE_SYN_BUILD_CMD.format(
+                stage, stage_previous, stage.upper(),
+                command_string, shell.touch_command(),
+                deps=deps)
+            # With the cache, no stage is executed (not even the creation
+            # of the project) if the outputs of the cached stages to build
+            # are all in the cache.
+            cached = [s for s in stage_list[index:]
+                      if s in self.SYN_CACHE_STAGES]
+            if self._syn_cache and cached:
+                if stage in self.SYN_CACHE_STAGES:
+                    rule += "\t\t$(SYN_CACHE_STORE)\n"
+                self.writeln("ifneq ($(SYN_CACHE_USE),)")
+                self.writeln("{0}: {1}".format(stage, stage_previous))
+                if stage in self.SYN_CACHE_STAGES:
+                    self.writeln("\t\t$(SYN_CACHE_RESTORE)")
+                self.writeln("\t\t{} $@".format(shell.touch_command()))
+                self.writeln("else")
+                self.write(rule)
+                self.writeln("endif")
+                self.writeln()
+            else:
+                self.writeln(rule)
+            stage_previous = stage
 
     def _makefile_syn_command(self):
         """Create the Makefile targets for user defined commands"""
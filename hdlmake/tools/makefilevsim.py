@@ -24,6 +24,7 @@
 """Module providing common stuff for Modelsim, Vsim and riviera like simulators"""
 
 from __future__ import absolute_import
+import os
 
 from .makefilesim import MakefileSim
 from ..util import shell
@@ -42,6 +43,28 @@ class MakefileVsim(MakefileSim):
 
     HDL_FILES = {VerilogFile: '', VHDLFile: '', SVFile: ''}
 
+    # vcom and vlog update the library index.
+    COMPILE_LIBRARY_LOCK = True
+
+    BATCH_COMPILE = True
+
+    MODULE_OPTIONS = {'vlog': 'vlog_opt', 'vhdl': 'vcom_opt'}
+
+    LIB_CACHE = True
+
+    VERSION_COMMAND = ["vcom", "-version"]
+
+    SIM_TOPS = True
+
+    SIM_CHECKPOINT = True
+
+    # The vsim commands saving the checkpoint $@ and quitting, and the vsim
+    # options running $(RESTORE_DO) from $(CHECKPOINT).
+    CHECKPOINT_COMMANDS = {
+        'save': 'checkpoint $@',
+        'restore': '-restore $(CHECKPOINT) -do "$(RESTORE_DO)"',
+        'quit': 'quit -f'}
+
     def __init__(self):
         super(MakefileVsim, self).__init__()
         # These are variables that will be set in the makefile
@@ -80,10 +103,14 @@ class MakefileVsim(MakefileSim):
 
     def _makefile_sim_compile_file(self, srcfile):
         if isinstance(srcfile, VerilogFile):
-            return "vlog -work {library} $(VLOG_FLAGS) {sv_option} $(INCLUDE_DIRS) $<".format(
-                library=srcfile.library, sv_option="-sv" if isinstance(srcfile, SVFile) else "")
+            return self.add_module_options(
+                srcfile, 'vlog',
+                "vlog -work {library} $(VLOG_FLAGS) {sv_option} $(INCLUDE_DIRS) $<".format(
+                    library=srcfile.library, sv_option="-sv" if isinstance(srcfile, SVFile) else ""))
         elif isinstance(srcfile, VHDLFile):
-            return "vcom $(VCOM_FLAGS) -work {} $< ".format(srcfile.library)
+            return self.add_module_options(
+                srcfile, 'vhdl',
+                "vcom $(VCOM_FLAGS) -work {} $< ".format(srcfile.library))
         else:
             return None
 
@@ -104,11 +131,111 @@ class MakefileVsim(MakefileSim):
     def _makefile_touch_stamp_file(self):
         self.write("\t\t@" + shell.touch_command() + " $@\n")
 
+    def get_compile_setup_targets(self):
+        """The libraries and the additional dependencies are created before
+        the files are compiled"""
+        return self.get_additional_deps() + [self.get_stamp_library(lib)
+                                             for lib in self.get_all_libs()]
+
+    def get_vendor_libs_stamp(self, entry):
+        """Stamp file of the mapping of the vendor libraries of
+        :param entry:.  Its name changes with the libraries, so that the
+        files are compiled again"""
+        return "." + os.path.basename(entry)
+
+    def get_additional_deps(self):
+        """Return the additional dependencies and the stamps of the vendor
+        libraries, made before the files are compiled"""
+        return self.additional_deps + [
+            self.get_vendor_libs_stamp(entry)
+            for _, entry in sorted(self.get_mapped_vendor_libs().items())]
+
+    def _makefile_sim_vendor_libs(self):
+        """Print the rules mapping the compiled vendor libraries, one
+        library per directory"""
+        for _, entry in sorted(self.get_mapped_vendor_libs().items()):
+            self.writeln("{}: {}".format(self.get_vendor_libs_stamp(entry),
+                                         ' '.join(self.additional_deps)))
+            for lib in sorted(os.listdir(entry)):
+                if (not lib.startswith('.')
+                        and os.path.isdir(os.path.join(entry, lib))):
+                    self.writeln("\t\tvmap $(VMAP_FLAGS) {} {}".format(
+                        lib, os.path.join(entry, lib)))
+            self._makefile_touch_stamp_file()
+            self.writeln()
+
+    def _makefile_sim_top_target(self, target, library, module):
+        """Print the target running a top of sim_tops, with its own log"""
+        self._makefile_sim_top_variables(target, library, module)
+        self.writeln("{}: {} $(LIB_IND) $(VERILOG_OBJ) $(VHDL_OBJ)".format(
+            target, ' '.join(self.get_additional_deps())))
+        self.writeln("\t\tvsim $(VSIM_FLAGS) -l $(TOP_MODULE).log "
+                     "$(TOP_LIBRARY).$(TOP_MODULE)")
+        self.writeln()
+
+    def _makefile_sim_checkpoint(self):
+        """Print the checkpoint target, saving the simulation of the top
+        after the sim_checkpoint commands, and the restore target running
+        the simulation from there.  The checkpoint is saved again once a
+        file has been compiled"""
+        checkpoint = self.get_sim_checkpoint()
+        if checkpoint is None:
+            return
+        def escape(cmd):
+            return cmd.replace('$', '$$').replace('"', '\\"')
+        self.writeln("CHECKPOINT := " + shell.makefile_slash_char().join(
+            ["$(TOP_LIBRARY)", "$(TOP_MODULE).cpt"]))
+        self.writeln("CHECKPOINT_DO := " + escape(checkpoint))
+        self.writeln("RESTORE_DO := run -all; " +
+                     self.CHECKPOINT_COMMANDS['quit'])
+        self.writeln()
+        self.writeln("checkpoint: $(CHECKPOINT)")
+        self.writeln()
+        self.writeln("$(CHECKPOINT): {} $(LIB_IND) $(VERILOG_OBJ) "
+                     "$(VHDL_OBJ)".format(' '.join(self.get_additional_deps())))
+        self.writeln('\t\tvsim $(VSIM_FLAGS) -c -do "$(CHECKPOINT_DO); {save}; '
+                     '{quit}" $(TOP_LIBRARY).$(TOP_MODULE)'.format(
+                         **self.CHECKPOINT_COMMANDS))
+        self.writeln()
+        self.writeln("restore: $(CHECKPOINT)")
+        self.writeln('\t\tvsim $(VSIM_FLAGS) -c ' +
+                     self.CHECKPOINT_COMMANDS['restore'])
+        self.writeln()
+
+    def get_stamp_batch(self, lib, name):
+        """Stamp file for the batch :param name: of :param lib:"""
+        return self.get_stamp_library_dir(lib) + shell.makefile_slash_char() + name
+
+    def get_lib_cache_options(self):
+        """The vcom and vlog options and the include directories"""
+        return [self.manifest_dict.get("vcom_opt") or '',
+                self.manifest_dict.get("vlog_opt") or '',
+                ' '.join(self.manifest_dict.get("include_dirs") or [])]
+
     def _makefile_sim_libraries(self, libs):
+        cache = self.get_lib_cache()
+        cached = self.get_cached_libs()
         for lib in libs:
             stampdir = self.get_stamp_library_dir(lib)
             stamplib = self.get_stamp_library(lib)
-            self.writeln("{}:".format(stamplib))
+            if lib not in cache:
+                self.writeln("{}:".format(stamplib))
+            else:
+                marker = self.get_lib_cache_marker(lib)
+                self.writeln("{}:".format(marker))
+                self.writeln("\t@{} {} && {} $@".format(
+                    shell.mkdir_command(), stampdir, shell.touch_command()))
+                self.writeln()
+                self.writeln("{}: {}".format(stamplib, marker))
+            if lib in cached:
+                # The library is mapped to its compiled copy in the cache.
+                self.writeln("\t(vmap $(VMAP_FLAGS) {lib} {entry} "
+                             "&& {mkdir} {stampdir} && {touch} {stamplib}) || {rm} {lib}".format(
+                    lib=lib, entry=cache[lib], mkdir=shell.mkdir_command(),
+                    stampdir=stampdir, touch=shell.touch_command(),
+                    stamplib=stamplib, rm=shell.del_command()))
+                self.writeln()
+                continue
             self.writeln("\t(vlib {lib} && vmap $(VMAP_FLAGS) {lib} "
                          "&& {mkdir} {stampdir} && {touch} {stamplib}) || {rm} {lib}".format(
                 lib=lib, mkdir=shell.mkdir_command(), stampdir=stampdir,
@@ -128,15 +255,17 @@ class MakefileVsim(MakefileSim):
                 ('+'.join(self.manifest_dict.get("include_dirs"))))
         libs = self.get_all_libs()
         self._makefile_sim_libs_variables(libs)
+        additional_deps = self.get_additional_deps()
         self.writeln(
             "simulation: %s $(LIB_IND) $(VERILOG_OBJ) $(VHDL_OBJ)" %
-            (' '.join(self.additional_deps)),)
-        self.writeln("$(VERILOG_OBJ): " + ' '.join(self.additional_deps))
-        self.writeln("$(VHDL_OBJ): $(LIB_IND) " + ' '.join(self.additional_deps))
+            (' '.join(additional_deps)),)
+        self.writeln("$(VERILOG_OBJ): " + ' '.join(additional_deps))
+        self.writeln("$(VHDL_OBJ): $(LIB_IND) " + ' '.join(additional_deps))
         self.writeln()
         for filename, filesource in six.iteritems(self.copy_rules):
             self.writeln("{}: {}".format(filename, filesource))
             self.writeln("\t\t{} $< . 2>&1".format(shell.copy_command()))
             self.writeln()
+        self._makefile_sim_vendor_libs()
         self._makefile_sim_libraries(libs)
         self._makefile_sim_dep_files()
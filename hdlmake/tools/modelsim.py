@@ -44,6 +44,16 @@ class ToolModelsim(MakefileVsim):
     CLEAN_TARGETS = {'clean': ["modelsim.ini", "transcript"],
                      'mrproper': ["*.vcd", "*.wlf"]}
 
+    VENDOR_LIBS_COMMANDS = {
+        'xilinx': 'echo "compile_simlib -simulator modelsim '
+                  '-simulator_exec_path {sim_path} -directory {dir} '
+                  '-family all -language all -library all" | vivado -mode tcl',
+        'altera': 'quartus_sh --simlib_comp -tool modelsim '
+                  '-tool_path {sim_path} -family {family} -language vhdl '
+                  '-directory {dir} && quartus_sh --simlib_comp -tool modelsim '
+                  '-tool_path {sim_path} -family {family} -language verilog '
+                  '-directory {dir}'}
+
     def __init__(self):
         super(ToolModelsim, self).__init__()
         self.copy_rules["modelsim.ini"] = \
@@ -46,10 +46,22 @@ class ToolNVC(MakefileSim):
     CLEAN_TARGETS = {'clean': ["*.cf", "*.o", "$(TOP_MODULE)", "work"],
                      'mrproper': ["*.vcd"]}
 
+    BATCH_COMPILE = True
+
+    MODULE_OPTIONS = {'vhdl': 'nvc_analysis_opt'}
+
+    SIM_TOPS = True
+
     SIMULATOR_CONTROLS = {'vlog': None,
                           'vhdl': '$(NVC) --work={work} $(NVC_OPT) -a $(NVC_ANALYSIS_OPT)  $<',
                           'compiler': '$(NVC) $(NVC_OPT) -e $(NVC_ELAB_OPT) $(TOP_MODULE)'}
 
+    VERSION_COMMAND = ["nvc", "--version"]
+
+    VENDOR_LIBS_COMMANDS = {
+        'xilinx': 'NVC_INSTALL_DEST={dir} {sim_path}/nvc --install vivado',
+        'altera': 'NVC_INSTALL_DEST={dir} {sim_path}/nvc --install quartus'}
+
     def __init__(self):
         super(ToolNVC, self).__init__()
 
@@ -57,6 +69,8 @@ class ToolNVC(MakefileSim):
         """Print the NVC options to the Makefile"""
         self.writeln("NVC := nvc")
         nvc_opt = self.manifest_dict.get("nvc_opt", '')
+        for _, entry in sorted(self.get_mapped_vendor_libs().items()):
+            nvc_opt = "{} -L {}".format(nvc_opt, entry).lstrip()
         nvc_analysis_opt = self.manifest_dict.get("nvc_analysis_opt", '')
         nvc_elab_opt = self.manifest_dict.get("nvc_elab_opt", '')
         self.writeln("NVC_OPT := {nvc_opt}\n".format(nvc_opt=nvc_opt))
@@ -67,7 +81,6 @@ class ToolNVC(MakefileSim):
         """Print the NVC simulation compilation target"""
         libs = self.get_all_libs()
         self._makefile_sim_libs_variables(libs)
-        self.writeln("simulation: $(VERILOG_OBJ) $(VHDL_OBJ)")
-        self.writeln("\t\t" + self.SIMULATOR_CONTROLS['compiler'])
-        self.writeln('\n')
+        self._makefile_sim_elaboration()
+        self.writeln()
         self._makefile_sim_dep_files()
@@ -0,0 +1,151 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+#
+# Copyright (c) 2026 CERN
+#
+# This file is part of Hdlmake.
+#
+# Hdlmake is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Hdlmake is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with Hdlmake.  If not, see <http://www.gnu.org/licenses/>.
+#
+
+"""Module providing support for the Questa qrun flow"""
+
+from __future__ import absolute_import
+import os
+
+from .makefilesim import MakefileSim
+from .modelsim import ToolModelsim
+from ..sourcefiles.srcfile import VerilogFile, VHDLFile, SVFile
+from ..sourcefiles.new_dep_solver import make_dependency_groups
+from ..util import shell
+from ..util import path as path_mod
+
+
+class ToolQrun(MakefileSim):
+
+    """Class providing the interface for Questa qrun.  A single qrun
+    process compiles, optimizes and elaborates the design, using its own
+    incremental database"""
+
+    TOOL_INFO = {
+        'name': 'Questa qrun',
+        'id': 'qrun',
+        'windows_bin': 'qrun.exe',
+        'linux_bin': 'qrun'}
+
+    STANDARD_LIBS = ToolModelsim.STANDARD_LIBS
+
+    HDL_FILES = {VerilogFile: '', VHDLFile: '', SVFile: ''}
+
+    CLEAN_TARGETS = {'clean': ["qrun.out", "qrun.f", "transcript"],
+                     'mrproper': ["*.vcd", "*.wlf"]}
+
+    SIMULATOR_CONTROLS = {'vlog': None,
+                          'vhdl': None,
+                          'compiler': '$(QRUN) $(QRUN_FLAGS) -f qrun.f'}
+
+    def __init__(self):
+        super(ToolQrun, self).__init__()
+
+    def _makefile_sim_options(self):
+        """Print the qrun options to the Makefile"""
+        self.writeln("QRUN := qrun")
+        self.writeln("QRUN_FLAGS := -outdir qrun.out {}".format(
+            self.manifest_dict.get("qrun_opt", '')))
+        for var, key in [("VCOM_FLAGS", "vcom_opt"),
+                         ("VLOG_FLAGS", "vlog_opt"),
+                         ("VSIM_FLAGS", "vsim_opt")]:
+            self.writeln("{} := {}".format(var, self.manifest_dict.get(key, '')))
+        self.writeln()
+
+    def _makefile_sim_sources(self):
+        """Print the HDL sources of the design"""
+        for name, klass in [("VERILOG", VerilogFile), ("VHDL", VHDLFile)]:
+            self.write("{}_SRC := ".format(name))
+            for file_aux in self.fileset.filter(klass).sort():
+                self.writeln(shell.makefile_path(file_aux.rel_path()) + " \\")
+            self.writeln()
+
+    def _get_library(self, srcfile):
+        """Return the library of :param srcfile:, if qrun compiles it"""
+        if isinstance(srcfile, (VerilogFile, VHDLFile)):
+            return srcfile.library
+        return None
+
+    def _makefile_sim_compilation(self):
+        """Print the compile, optimize and simulate targets.  The compile
+        and optimize steps leave a stamp file, so that they are executed
+        again only if a source, an included file or the Makefile has
+        changed; qrun itself only does again what has changed"""
+        compiler = self.SIMULATOR_CONTROLS['compiler']
+        top = "-top $(TOP_LIBRARY).$(TOP_MODULE)"
+        cwd = os.getcwd()
+        included = set()
+        for file_aux in self.fileset:
+            included.update(path_mod.relpath(inc, cwd)
+                            for inc in file_aux.included_files)
+        slash = shell.makefile_slash_char()
+        compile_stamp = "qrun.out" + slash + ".qrun_compile"
+        optimize_stamp = "qrun.out" + slash + ".qrun_optimize"
+        self.writeln("simulation: qrun_optimize")
+        self.writeln()
+        self.writeln("qrun_compile: " + compile_stamp)
+        self.writeln()
+        self.writeln("qrun_optimize: " + optimize_stamp)
+        self.writeln()
+        self.writeln("{}: qrun.f $(VERILOG_SRC) $(VHDL_SRC){}".format(
+            compile_stamp, ''.join(" \\\n" + inc for inc in sorted(included))))
+        self.writeln("\t\t{} -compile -vcom.options $(VCOM_FLAGS) -end "
+                     "-vlog.options $(VLOG_FLAGS) -end".format(compiler))
+        self._makefile_touch_stamp_file()
+        self.writeln("{}: {}".format(optimize_stamp, compile_stamp))
+        self.writeln("\t\t{} -optimize {}".format(compiler, top))
+        self._makefile_touch_stamp_file()
+        self.writeln("qrun_simulate: qrun_optimize")
+        self.writeln("\t\t{} -simulate {} $(VSIM_FLAGS)".format(compiler, top))
+        self.writeln()
+        # The libraries in dependency order, a library being split where
+        # it depends on another one.  The list is written again if the
+        # Makefile has changed.
+        self.writeln("qrun.f: $(firstword $(MAKEFILE_LIST))")
+        redirect = ">"
+        for inc in self.manifest_dict.get("include_dirs") or []:
+            self.writeln("\t\t@echo +incdir+{} {} $@".format(inc, redirect))
+            redirect = ">>"
+        for _, library, files in make_dependency_groups(self.fileset,
+                                                        self._get_library):
+            self.writeln("\t\t@echo -makelib {} {} $@".format(library,
+                                                              redirect))
+            redirect = ">>"
+            for file_aux in files:
+                self.writeln("\t\t@echo {} >> $@".format(
+                    shell.makefile_path(file_aux.rel_path())))
+            self.writeln("\t\t@echo -endlib >> $@")
+        self.writeln()
+
+    def makefile_clean(self):
+        """Print the clean target.  The libraries are in qrun.out"""
+        self.writeln("CLEAN_TARGETS := " +
+                     ' '.join(self.CLEAN_TARGETS["clean"]) + "\n")
+        self.writeln("clean:")
+        self.writeln("\t\t" + shell.del_command() + " $(CLEAN_TARGETS)")
+        if shell.check_windows_commands():
+            self.writeln("\t\t@-" + shell.rmdir_command() +
+                         " $(CLEAN_TARGETS) >nul 2>&1")
+
+    def _makefile_sim_phony(self):
+        """Print simulation PHONY target list to the Makefile"""
+        self.writeln(
+            ".PHONY: mrproper clean sim_pre_cmd sim_post_cmd simulation "
+            "qrun_compile qrun_optimize qrun_simulate")
@@ -77,6 +77,22 @@ class ToolRiviera(MakefileVsim):
     CLEAN_TARGETS = {'clean': ["*.asdb"],
                      'mrproper': ["*.vcd"]}
 
+    VENDOR_LIBS_COMMANDS = {
+        'xilinx': 'echo "compile_simlib -simulator riviera '
+                  '-simulator_exec_path {sim_path} -directory {dir} '
+                  '-family all -language all -library all" | vivado -mode tcl',
+        'altera': 'quartus_sh --simlib_comp -tool riviera '
+                  '-tool_path {sim_path} -family {family} -language vhdl '
+                  '-directory {dir} && quartus_sh --simlib_comp -tool riviera '
+                  '-tool_path {sim_path} -family {family} -language verilog '
+                  '-directory {dir}'}
+
+    # The checkpoint is restored in the simulation started by vsim.
+    CHECKPOINT_COMMANDS = {
+        'save': 'checkpoint -file $@',
+        'restore': '-do "restore -file $(CHECKPOINT); $(RESTORE_DO)"',
+        'quit': 'quit -force'}
+
     def __init__(self):
         super(ToolRiviera, self).__init__()
 
@@ -0,0 +1,122 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+#
+# Copyright (c) 2026 CERN
+#
+# This file is part of Hdlmake.
+#
+# Hdlmake is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Hdlmake is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with Hdlmake.  If not, see <http://www.gnu.org/licenses/>.
+#
+
+"""Module providing support for Verilator simulator"""
+
+from __future__ import absolute_import
+import os
+
+from .makefilesim import MakefileSim
+from ..sourcefiles.srcfile import VerilogFile, SVFile
+from ..sourcefiles.new_dep_solver import make_dependency_sorted_list
+from ..util import shell
+from ..util import path as path_mod
+
+
+class ToolVerilator(MakefileSim):
+
+    """Class providing the interface for Verilator simulator.  The whole
+    design is verilated and built by a single verilator call, which
+    compiles the C++ model with parallel jobs"""
+
+    TOOL_INFO = {
+        'name': 'Verilator',
+        'id': 'verilator',
+        'windows_bin': None,
+        'linux_bin': 'verilator'}
+
+    STANDARD_LIBS = []
+
+    HDL_FILES = {VerilogFile: '', SVFile: ''}
+
+    CLEAN_TARGETS = {'clean': ["$(VERILATOR_OBJ_DIR)", "verilator.f"],
+                     'mrproper': ["*.vcd", "*.fst"]}
+
+    SIMULATOR_CONTROLS = {'vlog': None,
+                          'vhdl': None,
+                          'compiler': '$(VERILATOR) --binary $(VERILATOR_OPT) '
+                                      '--top-module $(TOP_MODULE) '
+                                      '--Mdir $(VERILATOR_OBJ_DIR) '
+                                      '$(VERILATOR_JOBS) -f verilator.f'}
+
+    def __init__(self):
+        super(ToolVerilator, self).__init__()
+
+    def _makefile_sim_options(self):
+        """Print the Verilator options to the Makefile"""
+        self.writeln("VERILATOR := verilator")
+        self.writeln("VERILATOR_OPT := {}".format(
+            self.manifest_dict.get("verilator_opt", '')))
+        jobs = []
+        for opt, key in [("--threads", "verilator_threads"),
+                         ("-j", "verilator_jobs"),
+                         ("--build-jobs", "verilator_build_jobs")]:
+            value = self.manifest_dict.get(key)
+            if value is not None:
+                jobs.append("{} {}".format(opt, value))
+        objcache = self.manifest_dict.get("verilator_objcache")
+        if objcache:
+            # Passed to the make building the C++ model.
+            jobs.append("-MAKEFLAGS OBJCACHE={}".format(objcache))
+        self.writeln("VERILATOR_JOBS := {}".format(' '.join(jobs)))
+        self.writeln("VERILATOR_OBJ_DIR := obj_dir")
+        self.writeln()
+
+    def _makefile_sim_sources(self):
+        """Print the Verilog sources of the design"""
+        self.write("VERILOG_SRC := ")
+        for file_aux in self.fileset.filter(VerilogFile).sort():
+            self.writeln(shell.makefile_path(file_aux.rel_path()) + " \\")
+        self.writeln()
+
+    def _makefile_sim_compilation(self):
+        """Print the targets building the model.  It is built again only
+        if a source, an included file or the list of the files has
+        changed; verilator and make only rebuild the modified parts"""
+        cwd = os.getcwd()
+        files = [f for f in make_dependency_sorted_list(self.fileset)
+                 if isinstance(f, VerilogFile)]
+        included = set()
+        for file_aux in files:
+            included.update(path_mod.relpath(inc, cwd)
+                            for inc in file_aux.included_files)
+        model = "$(VERILATOR_OBJ_DIR)" + shell.makefile_slash_char() + \
+            "V$(TOP_MODULE)"
+        self.writeln("simulation: " + model)
+        self.writeln()
+        self.writeln("{}: verilator.f $(VERILOG_SRC){}".format(
+            model, ''.join(" \\\n" + inc for inc in sorted(included))))
+        self.writeln("\t\t" + self.SIMULATOR_CONTROLS['compiler'])
+        # verilator doesn't update an identical model.
+        self.writeln("\t\t@" + shell.touch_command() + " $@")
+        self.writeln()
+        # The files in dependency order, the packages first.  The list is
+        # written again if the Makefile has changed.
+        self.writeln("verilator.f: $(firstword $(MAKEFILE_LIST))")
+        redirect = ">"
+        for inc in self.manifest_dict.get("include_dirs") or []:
+            self.writeln("\t\t@echo +incdir+{} {} $@".format(inc, redirect))
+            redirect = ">>"
+        for file_aux in files:
+            self.writeln("\t\t@echo {} {} $@".format(
+                shell.makefile_path(file_aux.rel_path()), redirect))
+            redirect = ">>"
+        self.writeln()
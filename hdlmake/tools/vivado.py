@@ -47,6 +47,8 @@ class ToolVivado(ToolXilinx):
     STANDARD_LIBS = ['ieee', 'std']
     SYSTEM_LIBS = ['xilinx']
 
+    INCREMENTAL = True
+
     SUPPORTED_FILES = {
          XDCFile: ToolXilinx._XILINX_ANY_SOURCE_PROPERTY,
          XCFFile: ToolXilinx._XILINX_ANY_SOURCE_PROPERTY,
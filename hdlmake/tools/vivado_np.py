@@ -0,0 +1,206 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+#
+# Copyright (c) 2026 CERN
+#
+# This file is part of Hdlmake.
+#
+# Hdlmake is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Hdlmake is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with Hdlmake.  If not, see <http://www.gnu.org/licenses/>.
+#
+
+"""Module providing support for the Xilinx Vivado non-project flow"""
+
+from __future__ import absolute_import
+import logging
+
+from .makefilesyn import MakefileSyn
+from ..sourcefiles.srcfile import (VHDLFile, VerilogFile, SVFile, XDCFile,
+                                   XCIFile, XCIXFile, TCLFile)
+from ..sourcefiles.new_dep_solver import make_dependency_sorted_list
+from ..sourcefiles.sourcefileset import SourceFileSet
+from ..util import shell
+
+
+class ToolVivadoNP(MakefileSyn):
+
+    """Class providing the interface for Xilinx Vivado in non-project mode.
+    The sources are read in dependency order and each stage writes a
+    checkpoint, opened by the next stage"""
+
+    TOOL_INFO = {
+        'name': 'vivado_np',
+        'id': 'vivado_np',
+        'windows_bin': 'vivado -mode batch -source',
+        'linux_bin': 'vivado -mode batch -source',
+        'project_ext': 'dcp'
+    }
+
+    STANDARD_LIBS = ['ieee', 'std']
+    SYSTEM_LIBS = ['xilinx']
+
+    HDL_FILES = {
+        VHDLFile: 'read_vhdl -library {library} {srcfile}',
+        VerilogFile: 'read_verilog -library {library} {srcfile}',
+        SVFile: 'read_verilog -sv -library {library} {srcfile}'}
+
+    SUPPORTED_FILES = {
+        XCIFile: 'read_ip {srcfile}',
+        XCIXFile: 'read_ip {srcfile}',
+        XDCFile: 'read_xdc {srcfile}',
+        TCLFile: 'source {srcfile}'}
+
+    CLEAN_TARGETS = {'clean': [".Xil", "*.jou", "*.log", "*.pb", "*.dmp",
+                               "*.rpt", "$(PROJECT)_*.dcp", "work"],
+                     'mrproper': ["*.bit", "*.bin"]}
+
+    # Stages of the flow: the Vivado command of each stage and the
+    # checkpoint it writes.
+    STAGES = [('synthesize', 'synth_design', 'synth'),
+              ('translate', 'opt_design', 'opt'),
+              ('map', 'place_design', 'place'),
+              ('par', 'route_design', 'route')]
+
+    TCL_CONTROLS = {'close': 'exit',
+                    'install_source': '$(TOP_MODULE).bit'}
+
+    def __init__(self):
+        super(ToolVivadoNP, self).__init__()
+        self._tcl_controls.update(ToolVivadoNP.TCL_CONTROLS)
+
+    def _get_stage_properties(self):
+        """Return the dict of the Vivado commands to the options and the
+        Tcl scripts sourced before and after them, set by the steps.*
+        syn_properties (as for project runs)"""
+        res = dict((cmd, {'args': [], 'pre': [], 'post': [],
+                          'enabled': None})
+                   for cmd in ['synth_design', 'opt_design', 'place_design',
+                               'phys_opt_design', 'route_design',
+                               'write_bitstream'])
+        for prop in self.manifest_dict.get("syn_properties") or []:
+            names = prop[0].split('.')
+            if (len(prop) != 2 or len(names) < 3 or names[0] != "steps"
+                    or names[1] not in res):
+                logging.warning("Property ignored in non-project mode: %s",
+                                prop[0])
+                continue
+            step = res[names[1]]
+            value = prop[1]
+            if names[2] == "args" and len(names) == 4:
+                if names[3] == "more options":
+                    step['args'].append(value)
+                elif str(value).lower() in ["true", "1"]:
+                    step['args'].append("-" + names[3])
+                elif str(value).lower() not in ["false", "0"]:
+                    step['args'].append("-{} {}".format(names[3], value))
+            elif names[2:] == ["tcl", "pre"]:
+                step['pre'].append("source " + value)
+            elif names[2:] == ["tcl", "post"]:
+                step['post'].append("source " + value)
+            elif names[2:] == ["is_enabled"]:
+                step['enabled'] = str(value).lower() in ["true", "1"]
+            else:
+                logging.warning("Property ignored in non-project mode: %s",
+                                prop[0])
+        return res
+
+    def _get_stage_command(self, props, cmd, extra=''):
+        """Return the Tcl lines executing the Vivado command :param cmd:"""
+        step = props[cmd]
+        return step['pre'] + [' '.join([cmd + extra] + step['args'])] \
+            + step['post']
+
+    def _makefile_syn_tcl(self):
+        """Create the Tcl script of each stage"""
+        props = self._get_stage_properties()
+        fail_on_timing = int(self.manifest_dict.get("syn_fail_on_timing",
+                                                    True))
+        header = []
+        if "syn_jobs" in self.manifest_dict:
+            header.append("set_param general.maxThreads {}".format(
+                int(self.manifest_dict.get("syn_jobs", 2))))
+        part = "$(SYN_DEVICE)$(SYN_PACKAGE)$(SYN_GRADE)"
+        previous = None
+        for stage, cmd, checkpoint in self.STAGES:
+            lines = list(header)
+            if previous is None:
+                lines.append("create_project -in_memory -part " + part)
+                fetchto = self.manifest_dict.get("fetchto")
+                if fetchto is not None:
+                    lines.append("set_property ip_repo_paths {} "
+                                 "[current_project]".format(fetchto))
+                lines.append("source files.tcl")
+                lines.extend(self._get_stage_command(
+                    props, cmd, " -top $(TOP_MODULE) -part " + part))
+            else:
+                lines.append("open_checkpoint $(PROJECT)_{}.dcp".format(
+                    previous))
+                lines.extend(self._get_stage_command(props, cmd))
+            if cmd == 'place_design' and props['phys_opt_design']['enabled']:
+                lines.extend(self._get_stage_command(props,
+                                                     'phys_opt_design'))
+            lines.append("write_checkpoint -force $(PROJECT)_{}.dcp".format(
+                checkpoint))
+            if cmd == 'route_design':
+                lines.append("report_timing_summary -file "
+                             "$(PROJECT)_timing.rpt")
+                for delay in ["max", "min"]:
+                    lines.extend([
+                        "if {{ '(' [get_property SLACK [get_timing_paths "
+                        "-delay_type {}]] '<' 0 ')' '&&' {} }} {{".format(
+                            delay, fail_on_timing),
+                        "    exit 1",
+                        "}"])
+            lines.append("$(TCL_CLOSE)")
+            self._tcl_controls[stage] = "\n".join(lines)
+            previous = checkpoint
+        lines = list(header)
+        lines.append("open_checkpoint $(PROJECT)_{}.dcp".format(previous))
+        lines.extend(self._get_stage_command(
+            props, 'write_bitstream', " -force $(TOP_MODULE).bit"))
+        lines.append("$(TCL_CLOSE)")
+        self._tcl_controls["bitstream"] = "\n".join(lines)
+        self._makefile_syn_prj_tcl_cmd()
+        self.writeln()
+
+    def _makefile_syn_files(self):
+        """Write the files.tcl target reading the sources: the IP cores,
+        the HDL files in dependency order, then the constraints and the
+        scripts"""
+        self.writeln('files.tcl:')
+        ips = [f for f in self.fileset.sort()
+               if isinstance(f, (XCIFile, XCIXFile))]
+        hdl = SourceFileSet()
+        hdl.add(set(f for f in self.fileset if type(f) in self.HDL_FILES))
+        hdl = make_dependency_sorted_list(hdl)
+        others = [f for f in self.fileset.sort()
+                  if type(f) in self.SUPPORTED_FILES and f not in ips]
+        self._makefile_syn_read_files(ips)
+        if ips:
+            # The output products of the IP cores.
+            self.writeln("\t@echo 'generate_target all [get_ips]' >> $@")
+            self.writeln("\t@echo 'synth_ip [get_ips]' >> $@")
+        self._makefile_syn_read_files(hdl + others)
+        self.writeln()
+
+    def _makefile_syn_read_files(self, files):
+        """Write the commands reading :param files: to files.tcl"""
+        commands = {}
+        commands.update(self.HDL_FILES)
+        commands.update(self.SUPPORTED_FILES)
+        for srcfile in files:
+            self._all_sources.append(srcfile.rel_path())
+            self.writeln("\t@echo '{}' >> $@".format(
+                commands[type(srcfile)].format(
+                    srcfile=shell.tclpath(srcfile.rel_path()),
+                    library=getattr(srcfile, "library", None))))
@@ -28,6 +28,8 @@ from __future__ import absolute_import
 from .makefilesim import MakefileSim
 from .xilinx_prj import ToolXilinxProject
 from ..util import shell
+from ..sourcefiles.srcfile import VerilogFile, VHDLFile, SVFile
+from ..sourcefiles.new_dep_solver import make_dependency_groups
 
 
 class ToolVivadoSim(ToolXilinxProject, MakefileSim):
@@ -48,6 +50,15 @@ class ToolVivadoSim(ToolXilinxProject, MakefileSim):
                                "work", "xsim.dir"],
                      'mrproper': ["*.wdb", "*.vcd"]}
 
+    # The compilers update the library index.
+    COMPILE_LIBRARY_LOCK = True
+
+    BATCH_COMPILE = True
+
+    MODULE_OPTIONS = {'vlog': 'xvlog_opt', 'vhdl': 'xvhdl_opt'}
+
+    SIM_TOPS = True
+
     SIMULATOR_CONTROLS = {'vlog': 'xvlog $(XVLOG_OPT) $<',
                           'vhdl': 'xvhdl --work {work} $(XVHDL_OPT) $<',
                           'compiler': 'xelab -debug all $(TOP_MODULE) '
@@ -56,6 +67,62 @@ class ToolVivadoSim(ToolXilinxProject, MakefileSim):
     def __init__(self):
         super(ToolVivadoSim, self).__init__()
 
+    def _get_prj_kind(self, srcfile):
+        """Return the kind of :param srcfile: in a .prj file"""
+        if isinstance(srcfile, SVFile):
+            return "sv"
+        elif isinstance(srcfile, VerilogFile):
+            return "verilog"
+        elif isinstance(srcfile, VHDLFile):
+            return "vhdl"
+        return None
+
+    def _get_prj_key(self, srcfile):
+        """Return the library, the kind and the module options of
+        :param srcfile:"""
+        kind = self._get_prj_kind(srcfile)
+        if kind is None:
+            return None
+        options = self.get_module_options(
+            srcfile, 'vhdl' if kind == "vhdl" else 'vlog')
+        return (srcfile.library, kind, options)
+
+    def get_compile_batches(self):
+        """Return the batches of files compiled by one xvhdl or xvlog call
+        from a .prj file: the files of a library, of a language and with
+        the same module options.  A library is split where it depends on
+        another batch, so that the batches don't depend on each other"""
+        batches = []
+        names = set()
+        for level, (library, kind, options), files in make_dependency_groups(
+                self.fileset, self._get_prj_key):
+            stamp = self._get_batch_stamp(
+                names, library, "batch{}_{}".format(level, kind))
+            batches.append((stamp, library, (kind, options), files))
+        return batches
+
+    def _makefile_sim_batch_command(self, batch):
+        """Print the commands writing the .prj file of :param batch: and
+        compiling it"""
+        stamp, library, (kind, options), files = batch
+        head, name = stamp.rsplit(shell.makefile_slash_char(), 1)
+        prj = shell.makefile_slash_char().join([head, name[1:] + ".prj"])
+        self.writeln("\t\t@" + shell.mkdir_command() + " $(dir $@)")
+        redirect = ">"
+        for file_aux in files:
+            self.writeln("\t\t@echo {} {} {} {} {}".format(
+                kind, library, shell.makefile_path(file_aux.rel_path()),
+                redirect, prj))
+            redirect = ">>"
+        if options:
+            options += " "
+        if kind == "vhdl":
+            self.writeln("\t\txvhdl --incr $(XVHDL_OPT) {}-prj {}".format(
+                options, prj))
+        else:
+            self.writeln("\t\txvlog --incr $(XVLOG_OPT) {}-prj {}".format(
+                options, prj))
+
     def _makefile_sim_project(self):
         """Generate a project file (to be used by vivado)"""
         self.writeln("project.tcl: Makefile")
@@ -84,3 +151,11 @@ class ToolVivadoSim(ToolXilinxProject, MakefileSim):
         self.writeln()
         self._makefile_sim_dep_files()
         self._makefile_sim_project()
+
+    def _makefile_sim_top_target(self, target, library, module):
+        """Print the target elaborating a top of sim_tops into its own
+        snapshot"""
+        self._makefile_sim_top_variables(target, library, module)
+        self.writeln("{}: $(VERILOG_OBJ) $(VHDL_OBJ)".format(target))
+        self.writeln("\t\t" + self.SIMULATOR_CONTROLS['compiler'])
+        self.writeln()
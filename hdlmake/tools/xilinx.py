@@ -27,6 +27,7 @@
 from __future__ import absolute_import
 from .makefilesyn import MakefileSyn
 from .xilinx_prj import ToolXilinxProject
+from ..util import shell
 import logging
 
 
@@ -36,6 +37,9 @@ class ToolXilinx(ToolXilinxProject, MakefileSyn):
 
     CLEAN_TARGETS = {'mrproper': ["*.bit", "*.bin", "*.xsa"]}
 
+    SYN_CACHE_FILES = ["$(PROJECT).runs/impl_1/*.bit",
+                       "$(PROJECT).runs/impl_1/*.bin"]
+
     _XILINX_RUN_BODY = '''\
 {1}
 reset_run {0}
@@ -67,9 +71,22 @@ if {{ '$$'timing '&&' {fail_on_timing} }} {{
                     'par': _XILINX_RUN,
                     'install_source': '$(PROJECT).runs/impl_1/$(SYN_TOP).bit'}
 
+    # True if the runs can start from the reference checkpoints of the last
+    # successful run (syn_incremental).
+    INCREMENTAL = False
+
+    # Reference checkpoint of each run: its stage, the checkpoint written
+    # by the run and the name of the reference.
+    INCREMENTAL_RUNS = [
+        ("synth_1", "synthesize", "$(PROJECT).runs/synth_1/$(TOP_MODULE).dcp",
+         "synth"),
+        ("impl_1", "par", "$(PROJECT).runs/impl_1/$(TOP_MODULE)_routed.dcp",
+         "route")]
+
     def __init__(self):
         super(ToolXilinx, self).__init__()
         self._tcl_controls.update(ToolXilinx.TCL_CONTROLS)
+        self._incremental = False
 
     def _get_properties(self):
         """Create the property list"""
@@ -132,6 +149,12 @@ if {{ '$$'timing '&&' {fail_on_timing} }} {{
                     project_new.append(tmp.format(prop[0], prop[1], prop[2]))
                 else:
                     logging.error('Unknown project property: %s', prop[0])
+        self._incremental = self._get_incremental()
+        if self._incremental:
+            synthesize_new.extend(self._get_incremental_setup(
+                *self.INCREMENTAL_RUNS[0]))
+            par_new.extend(self._get_incremental_setup(
+                *self.INCREMENTAL_RUNS[1]))
         fail_on_timing = int(self.manifest_dict.get("syn_fail_on_timing", True))
         njobs_string = ""
         if "syn_jobs" in self.manifest_dict:
@@ -152,4 +175,60 @@ if {{ '$$'timing '&&' {fail_on_timing} }} {{
             "\n".join(par_new),
             njobs_string=njobs_string,
             fail_on_timing=fail_on_timing)
+        if self._incremental:
+            for run in self.INCREMENTAL_RUNS:
+                self._add_incremental_save(*run)
         super(ToolXilinx, self)._makefile_syn_tcl()
+        if self._incremental:
+            self.writeln("SYN_INCR_DIR := incremental/"
+                         "$(SYN_DEVICE)$(SYN_PACKAGE)$(SYN_GRADE)")
+            self.writeln()
+
+    def _get_incremental(self):
+        """Return True if the reference checkpoints are used"""
+        if not self.manifest_dict.get("syn_incremental"):
+            return False
+        if not self.INCREMENTAL:
+            logging.warning("'syn_incremental' is ignored for '%s' tool",
+                            self.manifest_dict["syn_tool"])
+            return False
+        return True
+
+    def _get_incremental_setup(self, run, stage, dcp, name):
+        """Return the commands starting :param run: from its reference
+        checkpoint, if any.  The references are kept per part"""
+        ref = "$(SYN_INCR_DIR)/{}.dcp".format(name)
+        return ["if {{ [file exists {}] }} {{".format(ref),
+                "    set_property incremental_checkpoint "
+                "[file normalize {}] [get_runs {}]".format(ref, run),
+                "} else {",
+                "    set_property incremental_checkpoint {{}} "
+                "[get_runs {}]".format(run),
+                "}"]
+
+    def _add_incremental_save(self, run, stage, dcp, name):
+        """Copy the checkpoint :param dcp: of :param run: to the references
+        once the :param stage: has succeeded"""
+        close = '$(TCL_CLOSE)'
+        control = self._tcl_controls[stage]
+        assert control.endswith(close)
+        self._tcl_controls[stage] = control[:-len(close)] + (
+            "file mkdir $(SYN_INCR_DIR)\n"
+            "file copy -force {} $(SYN_INCR_DIR)/{}.dcp\n".format(dcp, name)) \
+            + close
+
+    def _makefile_syn_clean(self):
+        """Print the clean targets, and the one removing the reference
+        checkpoints (kept by clean and mrproper)"""
+        super(ToolXilinx, self)._makefile_syn_clean()
+        if self._incremental:
+            self.writeln("incremental_reset:")
+            self.writeln("\t\t" + shell.del_command() + " $(SYN_INCR_DIR)")
+            self.writeln()
+
+    def _makefile_syn_phony(self):
+        """Print synthesis PHONY target list to the Makefile"""
+        if self._incremental:
+            self.writeln(".PHONY: mrproper clean all incremental_reset")
+        else:
+            super(ToolXilinx, self)._makefile_syn_phony()
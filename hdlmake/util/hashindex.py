@@ -0,0 +1,105 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+#
+# Copyright (c) 2026 CERN
+#
+# This file is part of Hdlmake.
+#
+# Hdlmake is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Hdlmake is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with Hdlmake.  If not, see <http://www.gnu.org/licenses/>.
+
+"""This module provides a persistent index of the hash of files"""
+
+from __future__ import print_function
+from __future__ import absolute_import
+import os
+import json
+import time
+import logging
+import hashlib
+
+from . import path as path_mod
+
+# Name of the index, created in the directory of the top manifest.
+INDEX_NAME = ".hdlmake_hashes.json"
+
+# Files modified less than this number of seconds before being hashed are
+# not trusted on their stamp, as they may be modified again within the
+# resolution of the modification time.
+RACY_DELAY = 2
+
+
+def hash_file(path):
+    """Return the sha256 hex digest of the content of :param path:"""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 16), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class HashIndex(object):
+
+    """Hashes of files, saved in a JSON file.  A file is hashed again only
+    if its stamp (modification time and size) has changed"""
+
+    def __init__(self, filename):
+        self.filename = filename
+        # Dict of absolute path to [mtime_ns, size, digest]
+        self.entries = {}
+        self.modified = False
+        self.hits = 0
+        self.misses = 0
+        self.load()
+
+    def load(self):
+        """Read the index file, if any.  An unreadable index is ignored"""
+        if not os.path.exists(self.filename):
+            return
+        try:
+            with open(self.filename, "r") as f:
+                self.entries = json.load(f)
+        except (IOError, ValueError) as e:
+            logging.warning("Ignoring the hash index %s: %s",
+                            self.filename, e)
+            self.entries = {}
+
+    def save(self):
+        """Write the index file, if it has been modified"""
+        if not self.modified:
+            return
+        tmp = self.filename + ".tmp"
+        with open(tmp, "w") as f:
+            json.dump(self.entries, f, sort_keys=True)
+        os.rename(tmp, self.filename)
+        self.modified = False
+
+    def get(self, path):
+        """Return the hash of the file :param path:"""
+        path = os.path.abspath(path)
+        stamp = path_mod.file_stamp(path)
+        if stamp is None:
+            raise Exception("Cannot hash {}: no such file".format(path))
+        entry = self.entries.get(path)
+        if entry is not None and tuple(entry[:2]) == stamp:
+            self.hits += 1
+            return entry[2]
+        self.misses += 1
+        digest = hash_file(path)
+        if stamp[0] < (time.time() - RACY_DELAY) * 1e9:
+            self.entries[path] = [stamp[0], stamp[1], digest]
+            self.modified = True
+        elif path in self.entries:
+            del self.entries[path]
+            self.modified = True
+        return digest
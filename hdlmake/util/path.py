@@ -83,6 +83,44 @@ def svn_basename(url):
         return None
 
 
+def url_key(url, source):
+    """
+    Get the normalised form of a module url, used to identify the module.
+    Local paths are canonicalised, while the trailing slash and the '.git'
+    suffix are removed from remote urls.  The revision/branch is kept, so
+    that the references to different revisions are distinct modules
+    """
+    if source is None or source == 'local':
+        return os.path.normcase(os.path.realpath(url))
+    if source == 'svn':
+        url_clean, rev = svn_parse(url)
+        suffix = "@" + rev if rev is not None else ""
+    else:
+        url_clean, branch, rev = url_parse(url)
+        if branch is not None:
+            suffix = "::" + branch
+        elif rev is not None:
+            suffix = "@@" + rev
+        else:
+            suffix = ""
+    url_clean = url_clean.rstrip('/')
+    if source in ('git', 'gitsm') and url_clean.endswith('.git'):
+        url_clean = url_clean[:-4]
+    return url_clean + suffix
+
+
+def file_stamp(path):
+    """
+    Get a cheap signature of the file content: (modification time, size).
+    None is returned if the file doesn't exist
+    """
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    return (stat.st_mtime_ns, stat.st_size)
+
+
 def is_abs_path(path):
     """Check if the given path is absolute"""
     return os.path.isabs(path)
@@ -28,7 +28,6 @@ import os
 import sys
 import platform
 import logging
-from subprocess import PIPE, Popen, CalledProcessError
 
 
 commands_os = 'auto'
@@ -44,6 +43,7 @@ def set_commands_os(name):
 
 def run(command):
     """Execute a command in the shell and print the output lines as a list"""
+    from subprocess import PIPE, Popen, CalledProcessError
     try:
         logging.debug("run: {}".format(command))
         command_out = Popen(command,
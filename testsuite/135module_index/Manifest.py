@@ -0,0 +1,8 @@
+action = "simulation"
+
+sim_tool="modelsim"
+
+top_module = "gate"
+
+# The same module, spelled differently.
+modules = { 'local': ['sub1', './sub1/', 'sub2']}
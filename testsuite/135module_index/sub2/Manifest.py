@@ -0,0 +1 @@
+modules = { 'local': ['../sub1']}
@@ -0,0 +1,5 @@
+action = "simulation"
+sim_tool = "modelsim"
+sim_top = "gate_tb"
+
+files = [ "../files/gate_tb.v", "../files/gate.vhdl", "../files/gate2.v" ]
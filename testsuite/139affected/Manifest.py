@@ -0,0 +1,7 @@
+action = "simulation"
+sim_tool = "modelsim"
+sim_top = "gate_tb"
+
+files = [ "../files/gate.vhdl", "../files/gate_tb.v", "../files/gate2.v",
+          "../files/gate3.vhd", "../files/gate3_tb.v",
+          "split_top.vhd", "split_top_arch.vhd" ]
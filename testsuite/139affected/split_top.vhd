@@ -0,0 +1,2 @@
+entity split_top is
+end split_top;
@@ -0,0 +1,3 @@
+architecture behav of split_top is
+begin
+end behav;
@@ -0,0 +1,14 @@
+action = "synthesis"
+language = "vhdl"
+
+syn_device = "xc7z030"
+syn_grade = "-2"
+syn_package = "ffg676"
+
+syn_top = "gate"
+syn_project = "gate.xpr"
+
+syn_tool = "vivado"
+syn_cache_dir = "syn_cache"
+
+files = [ "../files/gate.vhdl" ]
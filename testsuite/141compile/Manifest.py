@@ -0,0 +1,5 @@
+action = "simulation"
+sim_tool = "ghdl"
+sim_top = "top"
+
+files = [ "pkg.vhd", "a.vhd", "b.vhd", "top.vhd" ]
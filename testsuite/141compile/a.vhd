@@ -0,0 +1,9 @@
+use work.pkg.all;
+
+entity a is
+  port (d : in bit_vector(WIDTH - 1 downto 0));
+end a;
+
+architecture arch of a is
+begin
+end arch;
@@ -0,0 +1,9 @@
+use work.pkg.all;
+
+entity b is
+  port (d : in bit_vector(WIDTH - 1 downto 0));
+end b;
+
+architecture arch of b is
+begin
+end arch;
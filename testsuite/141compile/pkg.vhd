@@ -0,0 +1,3 @@
+package pkg is
+  constant WIDTH : natural := 8;
+end pkg;
@@ -0,0 +1,9 @@
+entity top is
+end top;
+
+architecture arch of top is
+  signal d : bit_vector(7 downto 0);
+begin
+  inst_a: entity work.a port map (d => d);
+  inst_b: entity work.b port map (d => d);
+end arch;
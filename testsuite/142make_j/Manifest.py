@@ -0,0 +1,7 @@
+action = "simulation"
+sim_tool = "ghdl"
+sim_top = "top"
+
+files = [ "x.vhd", "y.vhd", "z.vhd", "top.vhd" ]
+
+modules = { "local" : [ "sub" ] }
@@ -0,0 +1,3 @@
+library = "lib2"
+
+files = [ "u.vhd", "v.vhd" ]
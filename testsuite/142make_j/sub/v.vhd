@@ -0,0 +1,7 @@
+entity v is
+  port (d : in bit);
+end v;
+
+architecture arch of v is
+begin
+end arch;
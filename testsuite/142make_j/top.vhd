@@ -0,0 +1,14 @@
+library lib2;
+
+entity top is
+end top;
+
+architecture arch of top is
+  signal d : bit;
+begin
+  inst_x: entity work.x port map (d => d);
+  inst_y: entity work.y port map (d => d);
+  inst_z: entity work.z port map (d => d);
+  inst_u: entity lib2.u port map (d => d);
+  inst_v: entity lib2.v port map (d => d);
+end arch;
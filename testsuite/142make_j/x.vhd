@@ -0,0 +1,7 @@
+entity x is
+  port (d : in bit);
+end x;
+
+architecture arch of x is
+begin
+end arch;
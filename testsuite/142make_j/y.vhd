@@ -0,0 +1,7 @@
+entity y is
+  port (d : in bit);
+end y;
+
+architecture arch of y is
+begin
+end arch;
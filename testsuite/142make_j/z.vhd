@@ -0,0 +1,7 @@
+entity z is
+  port (d : in bit);
+end z;
+
+architecture arch of z is
+begin
+end arch;
@@ -0,0 +1,8 @@
+action = "simulation"
+
+sim_tool = "modelsim"
+sim_top = "tb"
+sim_batch_compile = True
+
+files = [ "../files/gate.vhdl", "../files/gate3.vhd", "../files/gate5.vhdl",
+          "../files/pkg5.vhdl", "../files/gate2.v", "tb.v" ]
@@ -0,0 +1,10 @@
+action = "simulation"
+
+sim_tool = "vivado_sim"
+sim_top = "tb"
+sim_batch_compile = True
+
+files = [ "../files/gate.vhdl", "../files/gate3.vhd", "../files/gate5.vhdl",
+          "../files/pkg5.vhdl", "../files/gate2.v", "gate7.vhd", "tb.v" ]
+
+modules = { "local" : [ "sub" ] }
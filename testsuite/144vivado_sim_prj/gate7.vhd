@@ -0,0 +1,12 @@
+library lib2;
+
+entity gate7 is
+  port (i : in bit;
+        o : out bit);
+end gate7;
+
+architecture behav of gate7 is
+begin
+  inst: entity lib2.inv
+    port map (i, o);
+end behav;
@@ -0,0 +1,9 @@
+entity inv is
+  port (i : in bit;
+        o : out bit);
+end inv;
+
+architecture behav of inv is
+begin
+  o <= not i;
+end behav;
@@ -0,0 +1,8 @@
+module tb;
+  reg i;
+  wire o3, o5, o2, o7;
+  gate3 dut3(.i(i), .o(o3));
+  gate5 dut5(.i(i), .o(o5));
+  gate2 dut2(.i(i), .o(o2));
+  gate7 dut7(.i(i), .o(o7));
+endmodule
@@ -0,0 +1,12 @@
+action = "simulation"
+
+sim_tool = "verilator"
+sim_top = "tb"
+
+verilator_opt = "--timing"
+verilator_threads = 4
+verilator_build_jobs = 8
+verilator_objcache = "ccache"
+
+include_dirs = [ "inc" ]
+files = [ "tb.sv", "dut.sv", "pkg.sv" ]
@@ -0,0 +1,6 @@
+`include "defs.vh"
+import pkg::*;
+
+module dut(input logic [`WIDTH-1:0] d, output logic [`WIDTH-1:0] q);
+  assign q = d;
+endmodule
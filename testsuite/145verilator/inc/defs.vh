@@ -0,0 +1 @@
+`define WIDTH 8
@@ -0,0 +1,3 @@
+package pkg;
+  localparam int DEPTH = 4;
+endpackage
@@ -0,0 +1,8 @@
+module tb;
+  logic [7:0] d, q;
+  dut inst (.d(d), .q(q));
+  initial begin
+    d = 8'h5a;
+    #1 $finish;
+  end
+endmodule
@@ -0,0 +1,12 @@
+action = "simulation"
+
+sim_tool = "qrun"
+sim_top = "top"
+
+vcom_opt = "-2008"
+vsim_opt = "-c -do 'run -all'"
+qrun_opt = "-parallel"
+
+files = [ "top.vhd", "x.vhd", "pkg.vhd" ]
+
+modules = { "local" : [ "sub" ] }
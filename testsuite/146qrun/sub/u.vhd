@@ -0,0 +1,7 @@
+entity u is
+  port (d : in bit);
+end u;
+
+architecture arch of u is
+begin
+end arch;
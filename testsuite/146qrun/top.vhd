@@ -0,0 +1,11 @@
+library lib2;
+
+entity top is
+end top;
+
+architecture arch of top is
+  signal d : bit_vector(7 downto 0);
+begin
+  inst_x: entity work.x port map (d => d);
+  inst_u: entity lib2.u port map (d => d(0));
+end arch;
@@ -0,0 +1,9 @@
+use work.pkg.all;
+
+entity x is
+  port (d : in bit_vector(WIDTH - 1 downto 0));
+end x;
+
+architecture arch of x is
+begin
+end arch;
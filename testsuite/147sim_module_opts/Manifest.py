@@ -0,0 +1,11 @@
+action = "simulation"
+
+sim_tool = "modelsim"
+sim_top = "tb"
+
+vcom_opt = "+acc"
+vlog_opt = "+acc"
+
+files = [ "tb.vhd", "counter.vhd" ]
+
+modules = { "local" : [ "ip" ] }
@@ -0,0 +1,10 @@
+library ieee;
+use ieee.std_logic_1164.all;
+
+entity counter is
+  port (clk : in std_logic);
+end counter;
+
+architecture rtl of counter is
+begin
+end rtl;
@@ -0,0 +1,5 @@
+# Stable vendor IP: optimised, without debug visibility.
+vcom_opt = "-O5 -nodebug"
+ghdl_opt = "-O3"
+
+files = [ "ip_core.vhd" ]
@@ -0,0 +1,10 @@
+library ieee;
+use ieee.std_logic_1164.all;
+
+entity ip_core is
+  port (clk : in std_logic);
+end ip_core;
+
+architecture rtl of ip_core is
+begin
+end rtl;
@@ -0,0 +1,12 @@
+library ieee;
+use ieee.std_logic_1164.all;
+
+entity tb is
+end tb;
+
+architecture sim of tb is
+  signal clk : std_logic := '0';
+begin
+  u_counter : entity work.counter port map (clk => clk);
+  u_ip : entity work.ip_core port map (clk => clk);
+end sim;
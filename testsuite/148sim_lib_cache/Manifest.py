@@ -0,0 +1,9 @@
+action = "simulation"
+
+sim_tool = "modelsim"
+sim_top = "tb"
+sim_lib_cache_dir = "../cache"
+
+files = [ "tb.vhd" ]
+
+modules = { "local" : [ "ip" ] }
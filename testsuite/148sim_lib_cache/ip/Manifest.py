@@ -0,0 +1,3 @@
+library = "iplib"
+
+files = [ "ip_core.vhd" ]
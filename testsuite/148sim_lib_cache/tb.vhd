@@ -0,0 +1,13 @@
+library ieee;
+use ieee.std_logic_1164.all;
+
+library iplib;
+
+entity tb is
+end tb;
+
+architecture sim of tb is
+  signal clk : std_logic := '0';
+begin
+  u_ip : entity iplib.ip_core port map (clk => clk);
+end sim;
@@ -0,0 +1,9 @@
+action = "simulation"
+
+sim_tool = "modelsim"
+sim_top = "tb"
+sim_vendor_libs_dir = "../vendor"
+
+files = [ "tb.vhd" ]
+
+modules = { "system" : [ "xilinx" ] }
@@ -0,0 +1,14 @@
+library ieee;
+use ieee.std_logic_1164.all;
+
+library unisim;
+use unisim.vcomponents.all;
+
+entity tb is
+end tb;
+
+architecture sim of tb is
+  signal i, o : std_logic;
+begin
+  u_buf : ibuf port map (i => i, o => o);
+end sim;
@@ -0,0 +1,5 @@
+action = "simulation"
+sim_tool = "ghdl"
+sim_tops = [ "tb_a", "tb_b" ]
+
+files = [ "counter.vhd", "tb_a.vhd", "tb_b.vhd", "unused.vhd" ]
@@ -0,0 +1,7 @@
+entity counter is
+  port (clk : in bit);
+end counter;
+
+architecture arch of counter is
+begin
+end arch;
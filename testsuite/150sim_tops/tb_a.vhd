@@ -0,0 +1,8 @@
+entity tb_a is
+end tb_a;
+
+architecture arch of tb_a is
+  signal clk : bit;
+begin
+  inst: entity work.counter port map (clk => clk);
+end arch;
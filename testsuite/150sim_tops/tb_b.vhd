@@ -0,0 +1,8 @@
+entity tb_b is
+end tb_b;
+
+architecture arch of tb_b is
+  signal clk : bit;
+begin
+  inst: entity work.counter port map (clk => clk);
+end arch;
@@ -0,0 +1,6 @@
+entity unused is
+end unused;
+
+architecture arch of unused is
+begin
+end arch;
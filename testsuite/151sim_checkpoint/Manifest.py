@@ -0,0 +1,7 @@
+action = "simulation"
+sim_tool = "modelsim"
+sim_top = "tb"
+
+sim_checkpoint = 'when {/tb/link_up == "1"} {stop}; run -all'
+
+files = [ "tb.vhd", "dut.vhd" ]
@@ -0,0 +1,8 @@
+entity dut is
+  port (link_up : out bit);
+end dut;
+
+architecture arch of dut is
+begin
+  link_up <= '1' after 20 ms;
+end arch;
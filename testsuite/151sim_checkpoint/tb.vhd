@@ -0,0 +1,8 @@
+entity tb is
+end tb;
+
+architecture sim of tb is
+  signal link_up : bit;
+begin
+  u_dut : entity work.dut port map (link_up => link_up);
+end sim;
@@ -0,0 +1,16 @@
+action = "synthesis"
+
+syn_device = "xc7a200t"
+syn_grade = "-2"
+syn_package = "ffg1156"
+syn_top = "gate3"
+syn_project = "gate3"
+syn_tool = "vivado_np"
+syn_jobs = "8"
+syn_properties = [["steps.synth_design.args.flatten_hierarchy", "none"],
+                  ["steps.opt_design.args.directive", "Explore"],
+                  ["steps.phys_opt_design.is_enabled", "1"],
+                  ["steps.route_design.tcl.post", "post_route.tcl"],
+                  ["steps.impl", "3"]]
+
+files = [ "../files/gate3.vhd", "../files/gate.vhdl", "top.xdc", "ip.xci" ]
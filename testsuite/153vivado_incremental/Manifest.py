@@ -0,0 +1,12 @@
+target = "xilinx"
+action = "synthesis"
+
+syn_device = "xc7a200t"
+syn_grade = "-2"
+syn_package = "ffg1156"
+syn_top = "incremental_test"
+syn_project = "incremental_test"
+syn_tool = "vivado"
+syn_incremental = True
+
+files = [ "../files/gate3.vhd", "../files/gate.vhdl" ]
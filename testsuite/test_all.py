@@ -7,6 +7,7 @@ import os
 import os.path
 import pytest
 import shutil
+import time
 
 class Config(object):
     def __init__(self, path=None, my_os='unx', fakebin="linux_fakebin"):
@@ -621,9 +622,1025 @@ def test_specify_top_library_explict_130():
 def test_vivado_jobs_133():
     run_compare(path="133vivado_jobs")
 
+def test_vivado_np_152():
+    run_compare(path="152vivado_np")
+
+def test_vivado_incremental_153():
+    run_compare(path="153vivado_incremental")
+
 def test_gowin_134():
     run_compare(path="134gowin")
 
+def test_module_index_135():
+    run_compare(path="135module_index")
+
+def test_url_key():
+    from hdlmake.util.path import url_key
+    key = url_key("https://host/foo", "git")
+    assert url_key("https://host/foo.git", "git") == key
+    assert url_key("https://host/foo/", "git") == key
+    assert url_key("https://host/foo.git::branch", "git") == \
+        url_key("https://host/foo/::branch", "git") != key
+    assert url_key("https://host/foo@@1234", "gitsm") != \
+        url_key("https://host/foo@@5678", "gitsm")
+    assert url_key("svn://host/foo/@12", "svn") == "svn://host/foo@12"
+    assert url_key("svn://host/foo/", "svn") == "svn://host/foo"
+    assert url_key("files/../files", "local") == url_key("files", None)
+
+def _python_subprocess(args):
+    """Run python with hdlmake importable, return the process"""
+    import subprocess
+    import sys
+    env = dict(os.environ)
+    env['PYTHONPATH'] = os.path.dirname(
+        os.path.dirname(os.path.abspath(hdlmake.__file__)))
+    return subprocess.run([sys.executable] + args, env=env,
+                          stdout=subprocess.PIPE, stderr=subprocess.PIPE,
+                          universal_newlines=True, check=True)
+
+def test_import_time():
+    """Importing the entry point must not load the whole program"""
+    # Budget (in us) for the import of hdlmake.main, generous enough for
+    # slow machines but well below the time needed to load everything.
+    budget = 250000
+    proc = _python_subprocess(['-X', 'importtime', '-c', 'import hdlmake.main'])
+    times = {}
+    for line in proc.stderr.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        _, cumulative, name = line[len('import time:'):].split('|')
+        times[name.strip()] = int(cumulative)
+    for name in ('hdlmake.action.commands',
+                 'hdlmake.manifest_parser.manifestparser',
+                 'hdlmake.action.gen_edalize',
+                 'hdlmake.fetch.git',
+                 'six',
+                 'subprocess'):
+        assert name not in times
+    assert times['hdlmake.main'] < budget
+
+def test_load_one_tool():
+    """Only the selected tool is imported"""
+    proc = _python_subprocess(['-c',
+        'import sys; from hdlmake.tools.load_tool import load_sim_tool; '
+        'load_sim_tool("ghdl"); '
+        'print(" ".join(m for m in sys.modules if m.startswith("hdlmake.tools.")))'])
+    mods = proc.stdout.split()
+    assert 'hdlmake.tools.ghdl' in mods
+    assert 'hdlmake.tools.modelsim' not in mods
+    assert 'hdlmake.tools.vivado_sim' not in mods
+
+def test_parse_cache(tmp_path):
+    from hdlmake.sourcefiles.new_dep_solver import AllRelations, ParseCache
+    from hdlmake.sourcefiles.srcfile import VHDLFile
+
+    class FakeModule(object):
+        library = 'work'
+
+    src = tmp_path / "ent.vhd"
+    src.write_text("entity ent_a is\nend;\n")
+    f = VHDLFile(path=str(src), module=FakeModule())
+    cache = ParseCache()
+    for _ in range(2):
+        f.clear_dependencies()
+        cache.parse(f, AllRelations())
+        assert [r.obj_name for r in f.provides] == ['ent_a']
+    assert (cache.misses, cache.hits) == (1, 1)
+    # A modified file is parsed again.
+    src.write_text("entity ent_bb is\nend;\n")
+    f.clear_dependencies()
+    cache.parse(f, AllRelations())
+    assert [r.obj_name for r in f.provides] == ['ent_bb']
+    assert cache.misses == 2
+    # The included files are found again by the next parse.
+    f.included_files.add(str(tmp_path / "stale.vh"))
+    f.clear_dependencies()
+    assert f.included_files == set()
+
+def test_serve_136(caplog):
+    import logging
+    import subprocess
+    import sys
+    import time
+    env = dict(os.environ)
+    env['PYTHONPATH'] = os.path.dirname(
+        os.path.dirname(os.path.abspath(hdlmake.__file__)))
+    with Config(path="136serve"):
+        env['PATH'] = os.environ['PATH']
+        proc = subprocess.Popen([sys.executable, '-m', 'hdlmake', 'serve'],
+                                env=env, stdout=subprocess.DEVNULL,
+                                stderr=subprocess.DEVNULL)
+        try:
+            for _ in range(100):
+                if os.path.exists('.hdlmake.sock'):
+                    break
+                time.sleep(0.1)
+            caplog.set_level(logging.DEBUG)
+            hdlmake.main.hdlmake(['makefile'])
+            assert "Command executed by the hdlmake daemon" in caplog.text
+            compare_makefile()
+            # A second request is answered from the same state.
+            hdlmake.main.hdlmake(['makefile'])
+            compare_makefile()
+            # From a directory without a manifest, the daemon of the
+            # enclosing design answers.
+            os.mkdir('sub')
+            os.chdir('sub')
+            caplog.clear()
+            try:
+                hdlmake.main.hdlmake(['list-files'])
+            finally:
+                os.chdir('..')
+                os.rmdir('sub')
+            assert "Command executed by the hdlmake daemon" in caplog.text
+        finally:
+            hdlmake.main.hdlmake(['serve', '--stop'])
+            proc.wait(timeout=10)
+        assert not os.path.exists('.hdlmake.sock')
+
+def test_watch(tmp_path):
+    from hdlmake.action.watch import Watcher
+    (tmp_path / "Manifest.py").write_text(
+        'action = "simulation"\nsim_tool = "modelsim"\n'
+        'top_module = "top"\nfiles = ["top.vhd", "sub.vhd"]\n')
+    (tmp_path / "sub.vhd").write_text("entity sub is\nend;\n")
+    top = tmp_path / "top.vhd"
+    top.write_text("entity top is\nend;\narchitecture a of top is\nbegin\n"
+                   "  u: entity work.sub port map (a => open);\nend;\n")
+    out = tmp_path / "out.txt"
+    parser = hdlmake.main._get_parser()
+    options = parser.parse_args(['watch', '--output', str(out), 'list-files'])
+    cwd = os.getcwd()
+    os.chdir(str(tmp_path))
+    try:
+        watcher = Watcher(options, parser.parse_args(['list-files']))
+        assert watcher.step()
+        assert out.read_text().split() == [str(tmp_path / "sub.vhd"),
+                                           str(top)]
+        # Nothing has changed
+        assert not watcher.step()
+        misses = watcher.parse_cache.misses
+        # Only the modified file is parsed again.
+        top.write_text("entity top is\nend;\n")
+        assert watcher.step()
+        assert watcher.parse_cache.misses == misses + 1
+        assert out.read_text().split() == [str(top)]
+        # And the dependency comes back.
+        top.write_text("entity top is\nend;\narchitecture a of top is\n"
+                       "begin\n  inst: entity work.sub port map (a => b);\n"
+                       "end;\n")
+        assert watcher.step()
+        assert out.read_text().split() == [str(tmp_path / "sub.vhd"),
+                                           str(top)]
+    finally:
+        os.chdir(cwd)
+
+def test_run_137():
+    with Config(path="137run"):
+        hdlmake.main.hdlmake(['run', 'list-files:files.txt',
+                              'list-files --reverse:rev.txt', 'makefile'])
+        compare_makefile()
+        files = open('files.txt').read().split()
+        assert [os.path.basename(f) for f in files] == ['gate.vhdl', 'gate_tb.v']
+        assert open('rev.txt').read().split() == files[::-1]
+        os.remove('files.txt')
+        os.remove('rev.txt')
+
+def test_run_split_137():
+    from hdlmake.action.run import split_command
+    assert split_command("list-files:out.txt") == (['list-files'], 'out.txt')
+    assert split_command("list-files --reverse:rev.txt") == \
+        (['list-files', '--reverse'], 'rev.txt')
+    assert split_command("list-files --delimiter :") == \
+        (['list-files', '--delimiter', ':'], None)
+    assert split_command("list-files --top lib:tb -o -") == \
+        (['list-files', '--top', 'lib:tb'], None)
+    assert split_command("list-files:'C:\\out.txt'") == \
+        (['list-files'], 'C:\\out.txt')
+    with Config(path="137run"):
+        hdlmake.main.hdlmake(['run', 'list-files --delimiter : -o files.txt'])
+        files = open('files.txt').read().strip().split(':')
+        assert [os.path.basename(f) for f in files] == ['gate.vhdl', 'gate_tb.v']
+        os.remove('files.txt')
+
+def test_run_err_137():
+    with pytest.raises(SystemExit) as _:
+        run(['run', 'fetch'], path="137run")
+
+def test_multi_top_138(capsys):
+    run(['list-files', '--top', 'gate_tb', '--top', 'gate3_tb'],
+        path="138multi_top")
+    out = [os.path.basename(l) for l in capsys.readouterr().out.split('\n')]
+    assert out == ['# top: gate_tb', 'gate.vhdl', 'gate_tb.v',
+                   '# top: gate3_tb', 'gate.vhdl', 'gate3.vhd', 'gate3_tb.v',
+                   '']
+
+def test_levels_138(capsys):
+    run(['-a', 'list-files', '--levels', '--delimiter', ' '],
+        path="138multi_top")
+    out = capsys.readouterr().out.split('\n')
+    assert [' '.join(os.path.basename(f) for f in l.split()) for l in out] == [
+        '# level 0: 2 files', 'gate.vhdl gate2.v',
+        '# level 1: 2 files', 'gate3.vhd gate_tb.v',
+        '# level 2: 1 files', 'gate3_tb.v',
+        '# critical path: 3 levels', '']
+
+def test_levels_json_138(capsys):
+    import json
+    run(['list-json', '--levels'], path="138multi_top")
+    res = json.loads(capsys.readouterr().out)
+    assert [f['file'] for f in res['files']] == ['../files/gate.vhdl',
+                                                 '../files/gate_tb.v']
+    assert res['levels'] == [
+        {'level': 0, 'count': 1, 'files': ['../files/gate.vhdl']},
+        {'level': 1, 'count': 1, 'files': ['../files/gate_tb.v']}]
+    assert res['critical_path'] == 2
+
+def test_reachability_index():
+    from hdlmake.sourcefiles.dep_file import DepFile
+    from hdlmake.sourcefiles.sourcefileset import SourceFileSet
+    from hdlmake.sourcefiles.new_dep_solver import ReachabilityIndex
+    files = {}
+    fileset = SourceFileSet()
+    for name in "abcde":
+        files[name] = DepFile("/" + name, None)
+        fileset.add(files[name])
+    # a -> b -> c -> b (cycle), c -> d; e is alone
+    files['a'].depends_on.add(files['b'])
+    files['b'].depends_on.add(files['c'])
+    files['c'].depends_on.add(files['b'])
+    files['c'].top_depends_on.add(files['d'])
+    index = ReachabilityIndex(fileset)
+    def names(tops):
+        return sorted(f.path[1:] for f in
+                      index.to_fileset(index.reachable([files[t] for t in tops])))
+    assert names('a') == ['a', 'b', 'c', 'd']
+    assert names('b') == ['b', 'c', 'd']
+    assert names('d') == ['d']
+    assert names('de') == ['d', 'e']
+
+def _affected(changed, args, path, monkeypatch, capsys):
+    import io
+    monkeypatch.setattr('sys.stdin', io.StringIO(changed))
+    run(['affected', '--changed-from', '-'] + args, path=path)
+    return [os.path.basename(l) for l in capsys.readouterr().out.split()]
+
+def test_affected_139(monkeypatch, capsys):
+    assert _affected("../files/gate.vhdl\n", [], "139affected",
+                     monkeypatch, capsys) == [
+        '#', 'top:', 'gate3_tb', 'gate.vhdl', 'gate3.vhd', 'gate3_tb.v',
+        '#', 'top:', 'gate_tb', 'gate.vhdl', 'gate_tb.v']
+    assert _affected("../files/gate2.v\n", ['--tops-only'], "139affected",
+                     monkeypatch, capsys) == ['gate2']
+    assert _affected("../files/gate3.vhd\n",
+                     ['--tops-only', '--top', 'gate_tb'], "139affected",
+                     monkeypatch, capsys) == []
+    # The architecture of a top in its own file.
+    assert _affected("split_top_arch.vhd\n", [], "139affected",
+                     monkeypatch, capsys) == [
+        '#', 'top:', 'split_top', 'split_top.vhd', 'split_top_arch.vhd']
+
+def test_affected_include_083(monkeypatch, capsys):
+    assert _affected("inc/macros.v\n", ['--tops-only'], "083icarus_include",
+                     monkeypatch, capsys) == ['gate']
+
+def test_fingerprint(tmp_path, capsys):
+    from hdlmake.util.hashindex import INDEX_NAME
+    manifest = tmp_path / "Manifest.py"
+    manifest.write_text(
+        'action = "simulation"\nsim_tool = "modelsim"\n'
+        'top_module = "top"\nfiles = ["top.vhd", "sub.vhd", "unused.vhd"]\n')
+    (tmp_path / "sub.vhd").write_text("entity sub is\nend;\n")
+    (tmp_path / "unused.vhd").write_text("entity unused is\nend;\n")
+    (tmp_path / "top.vhd").write_text(
+        "entity top is\nend;\narchitecture a of top is\nbegin\n"
+        "  u: entity work.sub port map (a => open);\nend;\n")
+    old = time.time() - 10
+    for name in ("sub.vhd", "unused.vhd", "top.vhd"):
+        os.utime(str(tmp_path / name), (old, old))
+
+    def fingerprint():
+        hdlmake.main.hdlmake(['--no-daemon', 'fingerprint'])
+        return capsys.readouterr().out.strip()
+
+    cwd = os.getcwd()
+    os.chdir(str(tmp_path))
+    try:
+        first = fingerprint()
+        assert len(first) == 64
+        assert (tmp_path / INDEX_NAME).exists()
+        assert fingerprint() == first
+        # A file not required by the top does not change the hash.
+        (tmp_path / "unused.vhd").write_text("entity unused is\nend;\n--\n")
+        assert fingerprint() == first
+        (tmp_path / "sub.vhd").write_text("entity sub is\nend;\n--\n")
+        second = fingerprint()
+        assert second != first
+        manifest.write_text(manifest.read_text() + 'vcom_opt = "-2008"\n')
+        assert fingerprint() not in (first, second)
+        # The options of the manifest of a sub-module.
+        (tmp_path / "lib").mkdir()
+        (tmp_path / "lib" / "Manifest.py").write_text('files = ["sub.vhd"]\n')
+        shutil.move(str(tmp_path / "sub.vhd"), str(tmp_path / "lib"))
+        manifest.write_text(manifest.read_text().replace(
+            '"sub.vhd", ', '') + 'modules = {"local": ["lib"]}\n')
+        third = fingerprint()
+        (tmp_path / "lib" / "Manifest.py").write_text(
+            'files = ["sub.vhd"]\nvcom_opt = "-93"\n')
+        assert fingerprint() != third
+        (tmp_path / "lib" / "Manifest.py").write_text(
+            'files = ["sub.vhd"]\nlibrary = "lib"\n')
+        assert fingerprint() != third
+    finally:
+        os.chdir(cwd)
+
+def test_fingerprint_empty_fileset(tmp_path):
+    from hdlmake.action.commands import Commands
+    from hdlmake.sourcefiles.sourcefileset import SourceFileSet
+    from hdlmake.util.hashindex import HashIndex
+    with Config(path="150sim_tops"):
+        options = hdlmake.main._get_parser().parse_args(['fingerprint'])
+        action = Commands(options)
+        action.load_all_manifests()
+        action.setup()
+        action.build_file_set()
+        action.solve_file_set()
+        index = HashIndex(str(tmp_path / "index.json"))
+        # A top without files is not the whole design.
+        entries = action._fingerprint_entries(index, SourceFileSet())
+        assert [e for e in entries if e[0] == "file"] == []
+
+def test_hash_index(tmp_path):
+    from hdlmake.util.hashindex import HashIndex, hash_file
+    src = tmp_path / "a.v"
+    src.write_text("module a; endmodule\n")
+    index = HashIndex(str(tmp_path / "index.json"))
+    digest = index.get(str(src))
+    assert digest == hash_file(str(src))
+    # Just modified: not trusted on its stamp, so not saved.
+    assert index.entries == {}
+    old = time.time() - 10
+    os.utime(str(src), (old, old))
+    index.get(str(src))
+    index.save()
+    index = HashIndex(str(tmp_path / "index.json"))
+    assert index.get(str(src)) == digest
+    assert (index.hits, index.misses) == (1, 0)
+
+def test_syn_cache_140():
+    run_compare(path="140syn_cache")
+
+@pytest.mark.skipif(shutil.which("make") is None, reason="make is required")
+def test_syn_cache_make(tmp_path):
+    import subprocess
+    for name in ("Manifest.py", "fakebin/vivado"):
+        dest = tmp_path / name
+        if not dest.parent.exists():
+            dest.parent.mkdir()
+        shutil.copy(os.path.join("140syn_cache", name), str(dest))
+    manifest = tmp_path / "Manifest.py"
+    manifest.write_text(manifest.read_text().replace(
+        "../files/gate.vhdl", "gate.vhdl"))
+    src = tmp_path / "gate.vhdl"
+    shutil.copy("files/gate.vhdl", str(src))
+    env = dict(os.environ)
+    env['PATH'] = str(tmp_path / "fakebin") + ':' + env['PATH']
+    log = tmp_path / "vivado.log"
+
+    def make(*targets):
+        if log.exists():
+            log.unlink()
+        subprocess.check_call(["make", "-s"] + list(targets),
+                              cwd=str(tmp_path), env=env,
+                              stdout=subprocess.DEVNULL)
+        return log.read_text().split() if log.exists() else []
+
+    cwd = os.getcwd()
+    os.chdir(str(tmp_path))
+    try:
+        hdlmake.main.hdlmake(['--no-daemon', 'makefile'])
+    finally:
+        os.chdir(cwd)
+    assert make() == ["project.tcl", "synthesize.tcl", "par.tcl",
+                      "bitstream.tcl"]
+    # Only the bitstream is in the cache: prom requires the full run.
+    make("mrproper")
+    assert make("prom") == ["project.tcl", "synthesize.tcl", "par.tcl",
+                            "bitstream.tcl", "prom.tcl"]
+    # Cache hit: the tool is not executed, the outputs are restored.
+    make("mrproper")
+    assert make("prom") == []
+    assert (tmp_path / "gate.bit").read_text() == "bitstream\n"
+    assert (tmp_path / "gate.xsa").read_text() == "platform\n"
+    assert make("prom") == []
+    make("mrproper")
+    assert make() == []
+    assert (tmp_path / "gate.bit").exists()
+    # A modified source is a miss.
+    make("mrproper")
+    src.write_text(src.read_text() + "-- modified\n")
+    assert make() == ["project.tcl", "synthesize.tcl", "par.tcl",
+                      "bitstream.tcl"]
+    # The sources are not hashed for the goals not building a stage.
+    sha256sum = tmp_path / "fakebin" / "sha256sum"
+    sha256sum.write_text("#!/bin/sh\ntouch sha256sum.called\nexit 1\n")
+    sha256sum.chmod(0o755)
+    make("clean")
+    assert not (tmp_path / "sha256sum.called").exists()
+
+def test_schedule():
+    from hdlmake.action.scheduler import schedule
+    # a -> c is the longest chain, it is started first.
+    deps = {'a': [], 'b': [], 'c': ['a']}
+    costs = {'a': 1, 'b': 2, 'c': 5}
+    done = []
+    assert schedule(['a', 'b', 'c'], deps, costs,
+                    lambda t: done.append(t) or True, 1) == []
+    assert done == ['a', 'c', 'b']
+    # Nothing is started after a failure.
+    done = []
+    assert schedule(['a', 'b', 'c'], deps, costs,
+                    lambda t: done.append(t) or t != 'a', 1) == ['a']
+    assert done == ['a']
+
+@pytest.mark.skipif(shutil.which("make") is None, reason="make is required")
+def test_compile_141(tmp_path, monkeypatch):
+    import json
+    import subprocess
+    design = tmp_path / "design"
+    shutil.copytree("141compile", str(design))
+    monkeypatch.setenv('PATH', str(design / "fakebin") + ':'
+                       + os.environ['PATH'])
+    log = design / "ghdl.log"
+
+    def compile_design():
+        if log.exists():
+            log.unlink()
+        hdlmake.main.hdlmake(['--no-daemon', 'compile', '-j', '4'])
+        if not log.exists():
+            return []
+        return [l.split() for l in log.read_text().splitlines()]
+
+    cwd = os.getcwd()
+    os.chdir(str(design))
+    try:
+        res = compile_design()
+        # pkg first and top last; a and b are in the same library, so they
+        # are not analysed at the same time by ghdl.
+        assert res[:2] == [['start', 'pkg.vhd'], ['end', 'pkg.vhd']]
+        assert res[-2:] == [['start', 'top.vhd'], ['end', 'top.vhd']]
+        assert res[2][1] == res[3][1] and res[4][1] == res[5][1]
+        assert sorted(r[1] for r in res[2:6:2]) == ['a.vhd', 'b.vhd']
+        with open(".hdlmake_compile_times.json") as f:
+            assert len(json.load(f)) == 4
+        # Nothing to do.
+        assert compile_design() == []
+        # Same content: nothing to do, even if touched.
+        os.utime("b.vhd", None)
+        assert compile_design() == []
+        # b and its dependent are compiled again.
+        with open("b.vhd", "a") as f:
+            f.write("-- modified\n")
+        assert [r[1] for r in compile_design() if r[0] == 'start'] == [
+            'b.vhd', 'top.vhd']
+        # The stamps are up to date for make.
+        assert subprocess.call(["make", "-q", "work/top/.top_vhd"]) == 0
+        # A truncated file of times: everything is compiled again.
+        with open(".hdlmake_compile_times.json", "w") as f:
+            f.write('{"work')
+        assert len([r for r in compile_design() if r[0] == 'start']) == 4
+    finally:
+        os.chdir(cwd)
+
+def test_make_j_142(tmp_path, monkeypatch):
+    import subprocess
+    design = tmp_path / "design"
+    shutil.copytree("142make_j", str(design))
+    monkeypatch.setenv('PATH', str(design / "fakebin") + ':'
+                       + os.environ['PATH'])
+    cwd = os.getcwd()
+    os.chdir(str(design))
+    try:
+        hdlmake.main.hdlmake(['--no-daemon', 'makefile'])
+        with open("Makefile") as f:
+            out = f.read()
+        assert "work/y/.y_vhd: | work/x/.x_vhd\n" in out
+        assert "lib2/v/.v_vhd: | lib2/u/.u_vhd\n" in out
+        # The fake ghdl fails if a library is analysed twice at a time.
+        assert subprocess.call(["make", "-j8"]) == 0
+        with open("ghdl.log") as f:
+            res = f.read().split()
+        assert "overlap" not in res
+        assert res[-4:] == ["analyse", "top.vhd", "elaborate", "work.top"]
+    finally:
+        os.chdir(cwd)
+
+def test_ghdl_elab(tmp_path, monkeypatch):
+    import subprocess
+    design = tmp_path / "design"
+    shutil.copytree("142make_j", str(design))
+    monkeypatch.setenv('PATH', str(design / "fakebin") + ':'
+                       + os.environ['PATH'])
+    cwd = os.getcwd()
+    os.chdir(str(design))
+    try:
+        hdlmake.main.hdlmake(['--no-daemon', 'makefile'])
+
+        def make():
+            if os.path.exists("ghdl.log"):
+                os.remove("ghdl.log")
+            assert subprocess.call(["make", "-j8"]) == 0
+            if not os.path.exists("ghdl.log"):
+                return []
+            with open("ghdl.log") as f:
+                return f.read().splitlines()
+
+        res = make()
+        assert res[-2:] == ["analyse top.vhd", "elaborate work.top"]
+        # Nothing analysed: no elaboration.
+        assert make() == []
+        time.sleep(0.01)
+        os.utime("y.vhd", None)
+        assert make() == ["analyse y.vhd", "analyse top.vhd",
+                          "elaborate work.top"]
+    finally:
+        os.chdir(cwd)
+
+def test_nvc_batch():
+    with Config(path="128nvc") as _:
+        hdlmake.main.hdlmake(['--suffix', 'sim_batch_compile = True',
+                              'makefile'])
+        with open("Makefile") as f:
+            out = f.read().splitlines()
+        os.remove("Makefile")
+    # One analysis per library and level, the levels in order.
+    assert out.count("work/.batch1_vhdl: ../files/gate3.vhd \\") == 1
+    assert out[out.index("work/.batch1_vhdl: ../files/gate3.vhd \\") + 1] \
+        == "work/.batch0_vhdl"
+    assert ("\t\t$(NVC) --work=work $(NVC_OPT) -a $(NVC_ANALYSIS_OPT)  "
+            "../files/gate.vhdl" in out)
+
+def test_vsim_batch_143():
+    run_compare(path="143vsim_batch")
+
+def test_vsim_batch_make(tmp_path, monkeypatch):
+    import subprocess
+    design = tmp_path / "design"
+    shutil.copytree("143vsim_batch", str(design / "143vsim_batch"))
+    shutil.copytree("files", str(design / "files"))
+    monkeypatch.setenv('PATH', str(design / "143vsim_batch" / "fakebin")
+                       + ':' + os.environ['PATH'])
+    cwd = os.getcwd()
+    os.chdir(str(design / "143vsim_batch"))
+    try:
+        hdlmake.main.hdlmake(['--no-daemon', 'makefile'])
+        os.mkdir("ini")
+        open("ini/modelsim.ini", "w").close()
+
+        def make():
+            if os.path.exists("tools.log"):
+                os.remove("tools.log")
+            assert subprocess.call(["make", "-j4", "MODELSIM_INI_PATH=ini"]) == 0
+            if not os.path.exists("tools.log"):
+                return []
+            with open("tools.log") as f:
+                return sorted(" ".join([l.split()[0]] + [
+                    os.path.basename(a) for a in l.split()
+                    if a.endswith((".v", ".vhd", ".vhdl"))])
+                              for l in f.read().splitlines())
+
+        # One call per library, dependency level and language.
+        assert make() == ["vcom gate.vhdl pkg5.vhdl",
+                          "vcom gate3.vhd gate5.vhdl",
+                          "vlog gate2.v", "vlog tb.v"]
+        assert make() == []
+        # The batch of the file and the batches depending on it.
+        time.sleep(0.01)
+        os.utime("../files/gate5.vhdl", None)
+        assert make() == ["vcom gate3.vhd gate5.vhdl", "vlog tb.v"]
+        with pytest.raises(SystemExit):
+            hdlmake.main.hdlmake(['--no-daemon', 'compile'])
+    finally:
+        os.chdir(cwd)
+
+def test_vivado_sim_prj_144():
+    run_compare(path="144vivado_sim_prj")
+
+def test_vivado_sim_prj_make(tmp_path, monkeypatch):
+    import subprocess
+    design = tmp_path / "design"
+    shutil.copytree("144vivado_sim_prj", str(design / "144vivado_sim_prj"))
+    shutil.copytree("files", str(design / "files"))
+    monkeypatch.setenv('PATH', str(design / "144vivado_sim_prj" / "fakebin")
+                       + ':' + os.environ['PATH'])
+    cwd = os.getcwd()
+    os.chdir(str(design / "144vivado_sim_prj"))
+    try:
+        hdlmake.main.hdlmake(['--no-daemon', 'makefile'])
+
+        def make():
+            if os.path.exists("tools.log"):
+                os.remove("tools.log")
+            # The files are compiled without elaborating.
+            assert subprocess.call(["make", "-j4", "work/tb/.tb_v"]) == 0
+            if not os.path.exists("tools.log"):
+                return []
+            with open("tools.log") as f:
+                return f.read().splitlines()
+
+        # One call per library and language, in dependency order.
+        res = make()
+        assert sorted(res[:3]) == [
+            "xvhdl ../files/gate.vhdl ../files/pkg5.vhdl ../files/gate3.vhd "
+            "../files/gate5.vhdl",
+            "xvhdl sub/inv.vhd", "xvlog ../files/gate2.v"]
+        assert res[3:] == ["xvhdl gate7.vhd", "xvlog tb.v"]
+        assert make() == []
+        # Only the batch of the library and the batches depending on it.
+        time.sleep(0.01)
+        os.utime("sub/inv.vhd", None)
+        assert make() == ["xvhdl sub/inv.vhd", "xvhdl gate7.vhd",
+                          "xvlog tb.v"]
+    finally:
+        os.chdir(cwd)
+
+def test_verilator_145():
+    run_compare(path="145verilator")
+
+def test_verilator_make(tmp_path, monkeypatch):
+    import subprocess
+    design = tmp_path / "design"
+    shutil.copytree("145verilator", str(design))
+    monkeypatch.setenv('PATH', str(design / "fakebin") + ':'
+                       + os.environ['PATH'])
+    cwd = os.getcwd()
+    os.chdir(str(design))
+    try:
+        hdlmake.main.hdlmake(['--no-daemon', 'makefile'])
+
+        def make():
+            if os.path.exists("verilator.log"):
+                os.remove("verilator.log")
+            assert subprocess.call(["make"]) == 0
+            if not os.path.exists("verilator.log"):
+                return []
+            with open("verilator.log") as f:
+                return f.read().splitlines()
+
+        assert make() == [
+            "--binary --timing --top-module tb --Mdir obj_dir --threads 4 "
+            "--build-jobs 8 -MAKEFLAGS OBJCACHE=ccache -f verilator.f",
+            "+incdir+inc", "pkg.sv", "dut.sv", "tb.sv"]
+        assert make() == []
+        # The model is built again if an included file changes.
+        time.sleep(0.01)
+        os.utime("inc/defs.vh", None)
+        assert len(make()) == 5
+    finally:
+        os.chdir(cwd)
+
+def test_qrun_146():
+    run_compare(path="146qrun")
+
+def test_qrun_make(tmp_path, monkeypatch):
+    import subprocess
+    design = tmp_path / "design"
+    shutil.copytree("146qrun", str(design))
+    monkeypatch.setenv('PATH', str(design / "fakebin") + ':'
+                       + os.environ['PATH'])
+    cwd = os.getcwd()
+    os.chdir(str(design))
+    try:
+        hdlmake.main.hdlmake(['--no-daemon', 'makefile'])
+        assert subprocess.call(["make", "qrun_simulate"]) == 0
+        with open("qrun.log") as f:
+            res = f.read().splitlines()
+        calls = [l.split() for l in res if l.startswith("qrun ")]
+        assert [c[6] for c in calls] == ["-compile", "-optimize", "-simulate"]
+        assert calls[2][7:] == ["-top", "work.top", "-c", "-do", "run", "-all"]
+        # The units of lib2 are compiled before top, which uses them.
+        assert res[1:11] == ["-makelib work", "pkg.vhd", "x.vhd", "-endlib",
+                             "-makelib lib2", "sub/u.vhd", "-endlib",
+                             "-makelib work", "top.vhd", "-endlib"]
+        # Nothing has changed: only the simulation is run again.
+        os.remove("qrun.log")
+        assert subprocess.call(["make", "qrun_simulate"]) == 0
+        with open("qrun.log") as f:
+            calls = [l.split() for l in f if l.startswith("qrun ")]
+        assert [c[6] for c in calls] == ["-simulate"]
+    finally:
+        os.chdir(cwd)
+
+def test_sim_module_opts_147():
+    run_compare(path="147sim_module_opts")
+
+def test_sim_module_opts_batch():
+    with Config(path="147sim_module_opts") as _:
+        hdlmake.main.hdlmake(['--suffix', 'sim_batch_compile = True',
+                              'makefile'])
+        with open("Makefile") as f:
+            out = f.read().splitlines()
+        os.remove("Makefile")
+    # The files of the module have their own batch.
+    assert "\t\tvcom $(VCOM_FLAGS) -work work counter.vhd" in out
+    assert ("\t\tvcom $(VCOM_FLAGS) -work work -O5 -nodebug ip/ip_core.vhd"
+            in out)
+    assert "work/hdlmake/batch0_vhdl_2: ip/ip_core.vhd" in out
+
+def test_sim_module_opts_ghdl():
+    with Config(path="147sim_module_opts") as _:
+        hdlmake.main.hdlmake(['--suffix', 'sim_tool = "ghdl"', 'makefile'])
+        with open("Makefile") as f:
+            out = f.read().splitlines()
+        os.remove("Makefile")
+    cmds = [l for l in out if l.startswith("\t\t$(GHDL) -a")]
+    assert cmds == ["\t\t$(GHDL) -a --work=work $(GHDL_OPT) $<",
+                    "\t\t$(GHDL) -a --work=work $(GHDL_OPT) -O3 $<",
+                    "\t\t$(GHDL) -a --work=work $(GHDL_OPT) $<"]
+
+def test_sim_lib_cache_148():
+    run_compare(path="148sim_lib_cache", fakebin="148sim_lib_cache/fakebin")
+
+def test_sim_lib_cache_make(tmp_path, monkeypatch):
+    import subprocess
+    design = tmp_path / "design"
+    shutil.copytree("148sim_lib_cache", str(design / "proj1"))
+    shutil.copytree("148sim_lib_cache", str(design / "proj2"))
+    monkeypatch.setenv('PATH', str(design / "proj1" / "fakebin")
+                       + ':' + os.environ['PATH'])
+    cwd = os.getcwd()
+
+    def build(proj):
+        os.chdir(str(design / proj))
+        hdlmake.main.hdlmake(['--no-daemon', 'makefile'])
+        if not os.path.isdir("ini"):
+            os.mkdir("ini")
+            open("ini/modelsim.ini", "w").close()
+        if os.path.exists("tools.log"):
+            os.remove("tools.log")
+        assert subprocess.call(["make", "MODELSIM_INI_PATH=ini"]) == 0
+        with open("tools.log") as f:
+            return [" ".join([l.split()[0], l.split()[-1]])
+                    for l in f.read().splitlines()]
+
+    try:
+        # iplib is compiled, then stored in the cache.
+        assert build("proj1") == ["vmap iplib", "vmap work",
+                                  "vcom ip/ip_core.vhd", "vcom tb.vhd"]
+        entries = os.listdir(str(design / "cache"))
+        assert len(entries) == 1 and entries[0].startswith("iplib-")
+        assert os.listdir(str(design / "cache" / entries[0] / "hdlmake"))
+        # The entries of the cache are read-only.
+        assert not os.stat(str(design / "cache" / entries[0])).st_mode & 0o222
+        # Another project maps iplib to the cache.
+        entry = "../cache/" + entries[0]
+        assert build("proj2") == ["vmap " + entry, "vmap work",
+                                  "vcom tb.vhd"]
+        # A modified library has another key.
+        with open("ip/ip_core.vhd", "a") as f:
+            f.write("-- modified\n")
+        assert build("proj2") == ["vmap iplib", "vcom ip/ip_core.vhd",
+                                  "vcom tb.vhd"]
+        assert len(os.listdir(str(design / "cache"))) == 2
+        # A library modified after the Makefile was generated is not
+        # stored under the key of its previous content.
+        shutil.copytree(str(design / "proj1"), str(design / "proj3"))
+        os.chdir(str(design / "proj3"))
+        with open("ip/ip_core.vhd", "a") as f:
+            f.write("-- other\n")
+        hdlmake.main.hdlmake(['--no-daemon', 'makefile'])
+        with open("ip/ip_core.vhd", "a") as f:
+            f.write("-- late\n")
+        assert subprocess.call(["make", "MODELSIM_INI_PATH=ini"]) == 0
+        assert len(os.listdir(str(design / "cache"))) == 2
+    finally:
+        os.chdir(cwd)
+
+def test_vendor_libs_149(tmp_path, monkeypatch, caplog):
+    import subprocess
+    design = tmp_path / "design"
+    shutil.copytree("149vendor_libs", str(design))
+    monkeypatch.setenv('PATH', str(design / "fakebin") + ':'
+                       + os.environ['PATH'])
+    cwd = os.getcwd()
+    os.chdir(str(design))
+    try:
+        # The missing libraries are reported once.
+        hdlmake.main.hdlmake(['--no-daemon', 'makefile'])
+        assert caplog.text.count("run 'hdlmake vendor-libs'") == 1
+        # The libraries are compiled once.
+        hdlmake.main.hdlmake(['--no-daemon', 'vendor-libs'])
+        hdlmake.main.hdlmake(['--no-daemon', 'vendor-libs'])
+        with open("vendor.log") as f:
+            log = f.read().splitlines()
+        assert len(log) == 1 and "-simulator modelsim" in log[0]
+        entries = os.listdir(str(tmp_path / "vendor"))
+        assert len(entries) == 1 and entries[0].startswith("xilinx-modelsim-")
+        entry = "../vendor/" + entries[0]
+        # The Makefile maps them before compiling.
+        hdlmake.main.hdlmake(['--no-daemon', 'makefile'])
+        os.mkdir("ini")
+        open("ini/modelsim.ini", "w").close()
+        assert subprocess.call(["make", "MODELSIM_INI_PATH=ini"]) == 0
+        with open("tools.log") as f:
+            log = [l.split() for l in f.read().splitlines()]
+        assert [l[-2:] for l in log[:2]] == [["unimacro", entry + "/unimacro"],
+                                             ["unisim", entry + "/unisim"]]
+        assert log[-1][0] == "vcom" and log[-1][-1] == "tb.vhd"
+        # Only the 'vendor-libs' command checks the version of Vivado.
+        with open("version.log") as f:
+            assert len(f.read().splitlines()) == 2
+        # Other libraries for GHDL.
+        hdlmake.main.hdlmake(['--no-daemon', '--suffix', 'sim_tool = "ghdl"',
+                              'vendor-libs'])
+        with open("vendor.log") as f:
+            assert len(f.read().splitlines()) == 2
+        entries = [e for e in os.listdir(str(tmp_path / "vendor"))
+                   if e.startswith("xilinx-ghdl-")]
+        hdlmake.main.hdlmake(['--no-daemon', '--suffix', 'sim_tool = "ghdl"',
+                              'makefile'])
+        with open("Makefile") as f:
+            assert ("GHDL_OPT := -P../vendor/" + entries[0]
+                    in f.read().splitlines())
+    finally:
+        os.chdir(cwd)
+
+def test_sim_tops_150():
+    run_compare(path="150sim_tops")
+
+@pytest.mark.skipif(shutil.which("make") is None, reason="make is required")
+def test_sim_tops_make(tmp_path, monkeypatch):
+    import subprocess
+    design = tmp_path / "design"
+    shutil.copytree("150sim_tops", str(design))
+    monkeypatch.setenv('PATH', str(design / "fakebin") + ':'
+                       + os.environ['PATH'])
+    cwd = os.getcwd()
+    os.chdir(str(design))
+    try:
+        hdlmake.main.hdlmake(['--no-daemon', 'makefile'])
+
+        def make(target):
+            if os.path.exists("ghdl.log"):
+                os.remove("ghdl.log")
+            assert subprocess.call(["make", "-j4", target]) == 0
+            if not os.path.exists("ghdl.log"):
+                return []
+            with open("ghdl.log") as f:
+                return f.read().splitlines()
+
+        # The shared files are analysed once, each top elaborated.
+        res = make("sim_tops")
+        assert res[:3] == ["analyse counter.vhd", "analyse tb_a.vhd",
+                           "analyse tb_b.vhd"]
+        assert sorted(res[3:]) == ["elaborate work.tb_a",
+                                   "elaborate work.tb_b"]
+        assert make("sim_tops") == []
+        time.sleep(0.01)
+        os.utime("tb_b.vhd", None)
+        res = make("sim_tops")
+        assert res[0] == "analyse tb_b.vhd"
+        assert sorted(res[1:]) == ["elaborate work.tb_a",
+                                   "elaborate work.tb_b"]
+        assert make("sim_tb_a") == []
+        # The vsim based tools run each top with its own log.
+        hdlmake.main.hdlmake(['--no-daemon', '--suffix',
+                              'sim_tool = "modelsim"', 'makefile'])
+        with open("Makefile") as f:
+            out = f.read()
+        assert "sim_tb_b: TOP_MODULE := tb_b\n" in out
+        assert "\t\tvsim $(VSIM_FLAGS) -l $(TOP_MODULE).log " \
+            "$(TOP_LIBRARY).$(TOP_MODULE)\n" in out
+    finally:
+        os.chdir(cwd)
+
+@pytest.mark.skipif(shutil.which("make") is None, reason="make is required")
+def test_regress(tmp_path, monkeypatch):
+    import json
+    from xml.etree import ElementTree as ET
+    design = tmp_path / "design"
+    shutil.copytree("150sim_tops", str(design))
+    monkeypatch.setenv('PATH', str(design / "fakebin") + ':'
+                       + os.environ['PATH'])
+    cwd = os.getcwd()
+    os.chdir(str(design))
+
+    def regress(*args):
+        if os.path.exists("ghdl.log"):
+            os.remove("ghdl.log")
+        hdlmake.main.hdlmake(['--no-daemon', 'regress', '-j', '2',
+                              '--json', 'res.json', '--junit', 'res.xml']
+                             + list(args))
+        with open("res.json") as f:
+            return dict((r['name'], r['status'])
+                        for r in json.load(f)['tests'])
+
+    try:
+        assert regress() == {'work.tb_a': 'passed', 'work.tb_b': 'passed'}
+        with open("ghdl.log") as f:
+            log = f.read().splitlines()
+        assert [l for l in log if l.startswith("analyse")] == [
+            "analyse counter.vhd", "analyse tb_a.vhd", "analyse tb_b.vhd"]
+        assert os.path.exists("regress_logs/work.tb_a.log")
+        # Unchanged since their last passing run.
+        assert regress() == {'work.tb_a': 'skipped', 'work.tb_b': 'skipped'}
+        assert not os.path.exists("ghdl.log")
+        # Only tb_b depends on tb_b.vhd; a failed test is run again.
+        with open("tb_b.vhd", "a") as f:
+            f.write("-- modified\n")
+        monkeypatch.setenv('GHDL_FAIL', 'work.tb_b')
+        with pytest.raises(SystemExit):
+            regress()
+        with open("res.json") as f:
+            res = dict((r['name'], r['status'])
+                       for r in json.load(f)['tests'])
+        assert res == {'work.tb_a': 'skipped', 'work.tb_b': 'failed'}
+        suite = ET.parse("res.xml").getroot()
+        assert suite.get('failures') == "1" and suite.get('skipped') == "1"
+        failure = suite.find("testcase[@name='work.tb_b']/failure")
+        assert "cannot elaborate work.tb_b" in failure.text
+        monkeypatch.delenv('GHDL_FAIL')
+        monkeypatch.setenv('GHDL_HANG', 'work.tb_b')
+        with pytest.raises(SystemExit):
+            regress('--timeout', '1', 'tb_b')
+        with open("res.json") as f:
+            assert json.load(f)['tests'][0]['status'] == 'timeout'
+        monkeypatch.delenv('GHDL_HANG')
+        assert regress('tb_b') == {'work.tb_b': 'passed'}
+        # The key of a test does not depend on the other tops.
+        assert regress('tb_a', 'tb_b') == {'work.tb_a': 'skipped',
+                                           'work.tb_b': 'skipped'}
+        assert regress('tb_b') == {'work.tb_b': 'skipped'}
+    finally:
+        os.chdir(cwd)
+
+def test_sim_checkpoint_151():
+    run_compare(path="151sim_checkpoint")
+
+@pytest.mark.skipif(shutil.which("make") is None, reason="make is required")
+def test_sim_checkpoint_make(tmp_path, monkeypatch):
+    import subprocess
+    design = tmp_path / "design"
+    shutil.copytree("151sim_checkpoint", str(design))
+    monkeypatch.setenv('PATH', str(design / "fakebin") + ':'
+                       + os.environ['PATH'])
+    cwd = os.getcwd()
+    os.chdir(str(design))
+
+    def make(target):
+        if os.path.exists("tools.log"):
+            os.remove("tools.log")
+        assert subprocess.call(["make", "MODELSIM_INI_PATH=ini",
+                                target]) == 0
+        with open("tools.log") as f:
+            return [l.split()[0] + " " + l.split()[-1]
+                    if l.startswith("vcom") else l
+                    for l in f.read().splitlines()]
+
+    try:
+        hdlmake.main.hdlmake(['--no-daemon', 'makefile'])
+        os.mkdir("ini")
+        open("ini/modelsim.ini", "w").close()
+        save = ('do when {/tb/link_up == "1"} {stop}; run -all; '
+                'checkpoint work/tb.cpt; quit -f')
+        assert make("checkpoint") == ["vcom dut.vhd", "vcom tb.vhd", save]
+        # The early phase is not simulated again.
+        restore = ["restore work/tb.cpt", "do run -all; quit -f"]
+        assert make("restore") == restore
+        # A compiled file invalidates the checkpoint.
+        time.sleep(0.01)
+        os.utime("dut.vhd", None)
+        assert make("restore") == ["vcom dut.vhd", "vcom tb.vhd", save] \
+            + restore
+        hdlmake.main.hdlmake(['--no-daemon', '--suffix',
+                              'sim_checkpoint = "20 ms"', 'makefile'])
+        with open("Makefile") as f:
+            assert "CHECKPOINT_DO := run 20 ms\n" in f.read()
+    finally:
+        os.chdir(cwd)
+
+@pytest.mark.skipif(shutil.which("make") is None, reason="make is required")
+def test_sim_checkpoint_riviera(tmp_path, monkeypatch):
+    import subprocess
+    design = tmp_path / "design"
+    shutil.copytree("151sim_checkpoint", str(design))
+    monkeypatch.setenv('PATH', str(design / "fakebin") + ':'
+                       + os.environ['PATH'])
+    cwd = os.getcwd()
+    os.chdir(str(design))
+    try:
+        hdlmake.main.hdlmake(['--no-daemon', '--suffix',
+                              'sim_tool = "riviera"', 'makefile'])
+        assert subprocess.call(["make", "checkpoint"]) == 0
+        os.remove("tools.log")
+        # The checkpoint is restored by a command of Riviera.
+        assert subprocess.call(["make", "restore"]) == 0
+        with open("tools.log") as f:
+            assert f.read().splitlines() == [
+                "do restore -file work/tb.cpt; run -all; quit -force"]
+    finally:
+        os.chdir(cwd)
+
 @pytest.mark.xfail
 def test_xfail():
     """This is a self-consistency test: the test is known to fail"""